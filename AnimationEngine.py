@@ -0,0 +1,362 @@
+from enum import Enum
+import math
+import threading
+import time
+
+from Control import Control, DEFAULT_FRAME_RATE
+from OscOutput import OscBatch, logger
+
+
+class Arbitration(Enum):
+    """Policy of the animation engine when several fades target the same address of a destination"""
+
+    LAST = "last"  # The last fade started replaces the others
+    BLEND = "blend"  # The values of the fades are averaged
+
+
+class Fade:
+    """
+    A running animation: the control of an event being played from start_time
+    """
+
+    __slots__ = (
+        "event",
+        "client",
+        "address",
+        "curve",
+        "start_time",
+        "end_time",
+        "last_index",
+        "value",
+        "group",
+        "added_time",
+    )
+
+    def __init__(self, event, curve, start_time: float, group=None) -> None:
+        self.event = event
+        # Identifier of the fades paused, resumed and stopped together, e.g. the timeline of the event
+        self.group = group
+        self.client = event.client
+        # Output stream of the fade, shared by the fades sent to the same address of the same destination
+        self.address = (event.client, event.command)
+        self.curve = curve
+        self.start_time = start_time
+        self.end_time = start_time + curve.duration
+        # Time at which the fade was added, not shifted by the pauses unlike start_time
+        self.added_time = time.perf_counter()
+        # Last frame played, and its value
+        self.last_index = -1
+        self.value = None
+
+
+class AnimationEngine:
+    """
+    The AnimationEngine class plays the animated controls of the timeline.
+    Instead of blocking the caller during the whole duration of a fade, the fades are registered
+    in the engine and a single thread advances all of them on each tick.
+    The frames of a tick are sent as one OSC bundle per destination.
+    The values of the frames are read from the curves precompiled by the controls (see Curve.py).
+    Each fade is played at the frame rate of its control, or at the frame rate of the engine by default,
+    and a frame is skipped when its value differs by min_delta or less from the last value sent.
+
+    The output keeps a single stream per address (destination and command): each address receives
+    at most one message per tick, however many fades target it. With the LAST arbitration, a fade
+    or a unique control replaces the fades running on its address. With BLEND, the fades on an
+    address are averaged.
+    The thread sleeps on a condition variable while there is no active fade.
+
+    Examples of use:
+    - Playing the animated control of an event:
+        engine = AnimationEngine()
+        engine.add(event)
+
+    - Waiting for the end of every active fade:
+        engine.join()
+
+    - Averaging the overlapping fades sent to the same address:
+        engine = AnimationEngine(arbitration=Arbitration.BLEND)
+
+    - Pausing, resuming and stopping every active fade:
+        engine.pause()
+        engine.resume()
+        engine.stop()
+
+    - Pausing, resuming and stopping only the fades of a group, e.g. the fades of one timeline:
+        engine.add(event, group=1)
+        engine.pause(group=1)
+        engine.resume(group=1)
+        engine.stop(group=1)
+    """
+
+    def __init__(
+        self,
+        frame_rate: float = DEFAULT_FRAME_RATE,
+        min_delta: float = 0,
+        arbitration: Arbitration = Arbitration.LAST,
+    ) -> None:
+        """
+        Initialize the AnimationEngine object.
+
+        Args:
+            frame_rate (float): Number of frames sent per second by the fades whose control has no frame rate.
+            min_delta (float): A frame is only sent if its value differs by more than min_delta
+                               from the last value sent. The last frame is sent unless it is equal.
+            arbitration (Arbitration): Policy applied to the fades sent to the same address.
+        """
+        self.frame_rate = frame_rate
+        self.min_delta = min_delta
+        self.arbitration = arbitration
+        self._fades: list[Fade] = []
+        # Last value sent to each address with an active fade
+        self._sent_values: dict[tuple, float] = {}
+        # Pause time of each paused group of fades
+        self._paused_groups: dict[object, float] = {}
+        # (time, address) of the releases of the unique controls sent ahead, see release()
+        self._releases: list[tuple[float, tuple]] = []
+        self._condition = threading.Condition()
+        self._pause_time = None
+        self._thread = None
+
+    @property
+    def active_fades(self) -> int:
+        return len(self._fades)
+
+    def get_curve(self, control: Control):
+        """Returns the curve of an animated control, compiled at its frame rate or the one of the engine"""
+        frame_rate = self.frame_rate if control.frame_rate is None else control.frame_rate
+        return control.get_curve(frame_rate)
+
+    def add(self, event, offset: float = 0, group=None):
+        """
+        Registers the animated control of an event and returns immediately.
+
+        Args:
+            event (Event): The event whose control is played.
+            offset (float): Time already elapsed in the fade, in seconds.
+            group (optional): Hashable identifier of the group of the fade, see pause(), resume() and stop().
+        """
+        with self._condition:
+            fade = Fade(
+                event=event,
+                curve=self.get_curve(event.control),
+                start_time=time.perf_counter() - offset,
+                group=group,
+            )
+            if self.arbitration == Arbitration.LAST:
+                self._drop_fades(fade.address)
+            self._fades.append(fade)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def release(self, event, delay: float = 0):
+        """
+        Called when a unique control of event is sent: with the LAST arbitration,
+        the fades running on its address are dropped so that they do not overwrite it.
+
+        Args:
+            event (Event): The event of the unique control.
+            delay (float): Time until the unique control takes effect, in seconds, when it is sent ahead
+                           in a timetagged bundle. The fades added before are dropped then,
+                           whether the engine is paused or not: the receiver executes the bundle at its timetag.
+        """
+        if self.arbitration != Arbitration.LAST:
+            return
+        address = (event.client, event.command)
+        with self._condition:
+            if delay > 0:
+                self._releases.append((time.perf_counter() + delay, address))
+            else:
+                self._drop_fades(address)
+                self._sent_values.pop(address, None)
+            self._condition.notify_all()
+
+    def _apply_releases(self, now: float) -> float:
+        """
+        Drops the fades added before the releases due at now, called with the lock of the condition held.
+        Returns the time of the next release, math.inf if there is none.
+        """
+        pending_releases = []
+        for release_time, address in self._releases:
+            if release_time > now:
+                pending_releases.append((release_time, address))
+                continue
+            self._fades = [
+                fade
+                for fade in self._fades
+                if fade.address != address or fade.added_time >= release_time
+            ]
+            self._sent_values.pop(address, None)
+        self._releases = pending_releases
+        return min((release_time for release_time, _ in pending_releases), default=math.inf)
+
+    def _drop_fades(self, address: tuple):
+        """Removes the fades sent to address, called with the lock of the condition held"""
+        self._fades = [fade for fade in self._fades if fade.address != address]
+
+    def pause(self, group=None):
+        """
+        Freezes every active fade at its current value.
+
+        Args:
+            group (optional): If provided, only the fades of this group are paused.
+        """
+        with self._condition:
+            if group is not None:
+                self._paused_groups.setdefault(group, time.perf_counter())
+                self._condition.notify_all()
+            elif self._pause_time is None:
+                self._pause_time = time.perf_counter()
+
+    def resume(self, group=None):
+        """
+        Continues every active fade from the value at which it was paused.
+
+        Args:
+            group (optional): If provided, only the fades of this group are resumed.
+        """
+        with self._condition:
+            if group is not None:
+                pause_time = self._paused_groups.pop(group, None)
+                if pause_time is not None:
+                    self._shift_fades(time.perf_counter() - pause_time, group)
+                    self._condition.notify_all()
+            elif self._pause_time is not None:
+                paused_time = time.perf_counter() - self._pause_time
+                self._shift_fades(paused_time)
+                # The paused groups are resumed later for the time elapsed since their own pause
+                for paused_group in self._paused_groups:
+                    self._paused_groups[paused_group] += paused_time
+                self._pause_time = None
+                self._condition.notify_all()
+
+    def _shift_fades(self, paused_time: float, group=None):
+        """Delays the fades, or the fades of a group, by paused_time seconds"""
+        for fade in self._fades:
+            if group is None or fade.group == group:
+                fade.start_time += paused_time
+                fade.end_time += paused_time
+
+    def stop(self, group=None):
+        """
+        Drops every active fade without sending its final value.
+
+        Args:
+            group (optional): If provided, only the fades of this group are dropped.
+        """
+        with self._condition:
+            if group is not None:
+                for fade in self._fades:
+                    if fade.group == group:
+                        # The next fade on this address must send its first frame
+                        self._sent_values.pop(fade.address, None)
+                self._fades = [fade for fade in self._fades if fade.group != group]
+                self._paused_groups.pop(group, None)
+            else:
+                self._fades = []
+                self._sent_values = {}
+                self._paused_groups = {}
+                self._releases = []
+                self._pause_time = None
+            self._condition.notify_all()
+
+    def join(self):
+        """Blocks until every active fade is finished or the engine is stopped"""
+        with self._condition:
+            while self._fades:
+                self._condition.wait()
+
+    def _run(self):
+        """
+        Tick loop of the engine thread: advances every active fade, sends one value
+        to each address with a new frame, then sleeps until the next frame of any fade
+        """
+        with self._condition:
+            while True:
+                if not self._fades or self._pause_time is not None:
+                    self._condition.wait()
+                    continue
+
+                next_release_time = math.inf
+                if self._releases:
+                    next_release_time = self._apply_releases(time.perf_counter())
+                    if not self._fades:
+                        self._condition.notify_all()
+                        continue
+
+                # Frames due within half a frame of the engine are sent in this tick,
+                # so that the fades started at close times share their bundles
+                tick_time = time.perf_counter() + 0.5 / self.frame_rate
+                next_frame_time = next_release_time
+                # Fades of each address, in start order, and the addresses with a new frame
+                address_fades: dict[tuple, list[Fade]] = {}
+                changed_addresses = set()
+                active_fades = []
+                for fade in self._fades:
+                    if fade.group in self._paused_groups:
+                        active_fades.append(fade)
+                        continue
+                    curve = fade.curve
+                    last_frame = len(curve) - 1
+                    index = curve.frame_index(tick_time - fade.start_time)
+                    if index != fade.last_index:
+                        fade.last_index = index
+                        fade.value = curve.frame_value(index)
+                        changed_addresses.add(fade.address)
+                    address_fades.setdefault(fade.address, []).append(fade)
+
+                    if fade.last_index < last_frame:
+                        active_fades.append(fade)
+                        frame_time = fade.start_time + (fade.last_index + 1) / curve.frame_rate
+                        next_frame_time = min(next_frame_time, frame_time, fade.end_time)
+
+                batch = OscBatch()
+                for address, fades in address_fades.items():
+                    finished = all(
+                        fade.last_index == len(fade.curve) - 1 for fade in fades
+                    )
+                    if address in changed_addresses:
+                        self._send_address(batch, address, fades, finished)
+                    if finished:
+                        self._sent_values.pop(address, None)
+                try:
+                    batch.flush()
+                except Exception:
+                    # A failed send must not stop the engine, whose thread plays every fade
+                    logger.exception("Animation frames not sent")
+                self._fades = active_fades
+                if not self._fades:
+                    self._condition.notify_all()
+                    continue
+
+                # Woken up earlier by add(), resume() or stop()
+                if next_frame_time == math.inf:
+                    # Only paused groups are left
+                    self._condition.wait()
+                else:
+                    self._condition.wait(max(next_frame_time - time.perf_counter(), 0))
+
+    def _send_address(self, batch: OscBatch, address: tuple, fades: list[Fade], finished: bool):
+        """
+        Adds the value of an address to the batch, unless it differs by min_delta or less from the last value sent.
+
+        Args:
+            batch (OscBatch): The batch of the tick.
+            address (tuple): The client and the command of the fades.
+            fades (list[Fade]): The fades sent to the address, in start order.
+            finished (bool): True if every fade of the address reached its last frame.
+        """
+        if len(fades) == 1:
+            value = fades[0].value
+        else:
+            value = sum(fade.value for fade in fades) / len(fades)
+
+        last_value = self._sent_values.get(address)
+        if (
+            last_value is None
+            or abs(value - last_value) > self.min_delta
+            or (finished and value != last_value)
+        ):
+            batch.add(address[0], fades[-1].event.encode(value), coalesce=True)
+            self._sent_values[address] = value
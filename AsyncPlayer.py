@@ -0,0 +1,333 @@
+import asyncio
+import bisect
+import itertools
+import math
+import time
+
+from Event import Event
+from OscOutput import encode_bundles, logger
+from Scheduler import LatencyStats
+from TimelineCore import TimelineCore, State
+
+
+class AsyncPlayer:
+    """
+    The AsyncPlayer class plays a timeline on an asyncio event loop instead of threads.
+    The schedule of the events is a single coroutine, and every fade is a lightweight task sleeping
+    between its frames, so a dense show with thousands of concurrent animations runs on one thread.
+    The messages are sent through non-blocking datagram endpoints, one per destination.
+
+    The events are read from the timeline when play() is called: edits made during the run are not followed.
+    The settings of the timeline are honoured: look-ahead of the destinations, frame rate and min_delta
+    of its animation engine. A fade or a unique control replaces the fade running on its address
+    (last-writer-wins). The state, progress and log_message signals of the timeline are emitted
+    from the thread of the loop.
+
+    Examples of use:
+    - Playing a timeline until its end:
+        player = AsyncPlayer(TimelineCore("show.json"))
+        asyncio.run(player.play())
+
+    - Starting from 3 seconds, and pausing, resuming or stopping from another coroutine of the loop:
+        task = asyncio.create_task(player.play(start_at=3))
+        player.pause()
+        player.resume()
+        player.stop()
+
+    - Driving the player from another thread, e.g. the Qt GUI:
+        loop.call_soon_threadsafe(player.pause)
+    """
+
+    def __init__(self, timeline: TimelineCore) -> None:
+        """
+        Initialize the AsyncPlayer object.
+
+        Args:
+            timeline (TimelineCore): The timeline played.
+        """
+        self.timeline = timeline
+        self.stats = LatencyStats()
+        # Datagram transport of each destination (ip, port), opened on first use
+        self._transports: dict[tuple[str, int], asyncio.DatagramTransport] = {}
+        # Endpoint being created for each new destination, awaited by every concurrent send to it
+        self._connecting: dict[tuple[str, int], asyncio.Task] = {}
+        # Fade task running on each address (destination, command)
+        self._fades: dict[tuple, asyncio.Task] = {}
+        # Time of the event of each fade task, see _release_fade
+        self._fade_times: dict[tuple, float] = {}
+        # Releases of the fades by the unique controls sent ahead, waiting for the time of their cue
+        self._releases: list[asyncio.TimerHandle] = []
+        self._start_time = 0
+        self._pause_time = None
+        self._resumed = None
+        self._schedule_task = None
+        self._stopped = False
+
+    @property
+    def active_fades(self) -> int:
+        return len(self._fades)
+
+    def elapsed(self) -> float:
+        """Returns the elapsed time of the run in seconds, paused time excluded"""
+        if self._pause_time is not None:
+            return self._pause_time - self._start_time
+        return time.perf_counter() - self._start_time
+
+    async def play(self, start_at: float | int = 0):
+        """
+        Plays the timeline and returns at its end, once the last fade is finished.
+
+        Args:
+            start_at (float | int): The time from which the timeline starts, in seconds.
+                                    The state of the animated controls at this time is chased.
+        """
+        start_at = max(start_at, 0)
+        times, sorted_events = self.timeline.get_sorted_events()
+        first_index = bisect.bisect_left(times, start_at)
+        max_time = self.timeline.get_max_time()
+
+        self.stats = LatencyStats()
+        self._resumed = asyncio.Event()
+        self._resumed.set()
+        self._pause_time = None
+        self._start_time = time.perf_counter() - start_at
+        self._stopped = False
+        self._schedule_task = asyncio.current_task()
+        self.timeline.log_message.emit("Timeline started")
+        self.timeline.state = State.RUNNING
+
+        try:
+            await self._chase_state(
+                [event for _, event in sorted_events[:first_index]], start_at
+            )
+            await self._play_events(
+                [event for _, event in sorted_events[first_index:]], start_at, max_time
+            )
+            while self._fades:
+                await asyncio.gather(*self._fades.values(), return_exceptions=True)
+            if max_time > 0:
+                self.timeline.progress.emit(100)
+        except asyncio.CancelledError:
+            # Only the cancellation requested by stop() ends the run normally
+            if not self._stopped:
+                raise
+        finally:
+            self._schedule_task = None
+            for task in list(self._fades.values()):
+                task.cancel()
+            self._fades = {}
+            self._fade_times = {}
+            for handle in self._releases:
+                handle.cancel()
+            self._releases = []
+            self._close_transports()
+            self.timeline.log_message.emit(self.stats.to_string())
+            self.timeline.state = State.NOT_RUNNING
+
+    async def _play_events(
+        self, events: list[Event], start_at: float | int, max_time: float | int
+    ):
+        """Sends the events at their deadline, the co-timed unique controls in one bundle per destination"""
+        timeline = self.timeline
+        # The look-ahead moves the deadlines of some events earlier than their time
+        scheduled_events = sorted(
+            ((max(timeline.get_deadline(event), start_at), event) for event in events),
+            key=lambda item: item[0],
+        )
+        for deadline, group in itertools.groupby(scheduled_events, key=lambda item: item[0]):
+            group = [event for _, event in group]
+            if deadline > self.elapsed():
+                # The curves are compiled while waiting for their fades instead of when they start
+                for event in group:
+                    if event.control.is_animated:
+                        timeline.animation_engine.get_curve(event.control)
+            await self._sleep_until(deadline)
+            self.stats.record(self.elapsed() - deadline)
+
+            messages: dict[tuple, list[bytes]] = {}
+            for event in group:
+                destination = timeline.get_destination(event)
+                if event.control.is_animated:
+                    self._start_fade(event, destination, offset=0)
+                    continue
+
+                address = (destination, event.command)
+                lookahead = timeline.get_lookahead(event)
+                timetag = None
+                if lookahead is None:
+                    self._cancel_fade(address)
+                else:
+                    remaining_time = event.time - self.elapsed()
+                    timetag = lookahead.timetag(remaining_time)
+                    # The fades keep running until the receiver executes the bundle, at its timetag
+                    loop = asyncio.get_running_loop()
+                    self._releases = [
+                        handle for handle in self._releases if handle.when() > loop.time()
+                    ]
+                    self._releases.append(
+                        loop.call_later(remaining_time, self._release_fade, address, event.time)
+                    )
+                messages.setdefault((destination, timetag), []).append(
+                    event.encode(event.control.value)
+                )
+            for (destination, timetag), dgrams in messages.items():
+                await self._send(destination, dgrams, timetag)
+
+            timeline.elapsed_time = self.elapsed()
+            if max_time > 0:
+                timeline.progress.emit(min(int(timeline.elapsed_time / max_time * 100), 100))
+
+    async def _chase_state(self, past_events: list[Event], start_at: float | int):
+        """
+        Sends the state of the animated controls at start_at, like TimelineCore.chase_state:
+        only the last event of each address is chased, and a fade still running keeps playing.
+        """
+        chased_addresses = set()
+        for event in reversed(past_events):
+            destination = self.timeline.get_destination(event)
+            address = (destination, event.command)
+            if address in chased_addresses:
+                continue
+            chased_addresses.add(address)
+
+            if event.control.is_animated:
+                offset = start_at - event.time
+                if offset < event.control.duration:
+                    self._start_fade(event, destination, offset=offset)
+                else:
+                    await self._send(
+                        destination, [event.encode(event.control.value_at(offset))]
+                    )
+
+    def _start_fade(self, event: Event, destination: tuple[str, int], offset: float):
+        """Starts the task of a fade, replacing the fade running on the same address"""
+        address = (destination, event.command)
+        self._cancel_fade(address)
+        # A curve not compiled yet is compiled before the clock of the fade starts
+        self.timeline.animation_engine.get_curve(event.control)
+        start_time = self.elapsed() - offset
+        task = asyncio.create_task(self._play_fade(event, destination, start_time))
+        self._fades[address] = task
+        self._fade_times[address] = event.time
+
+        def forget_fade(task: asyncio.Task):
+            if self._fades.get(address) is task:
+                del self._fades[address]
+                del self._fade_times[address]
+
+        task.add_done_callback(forget_fade)
+
+    def _cancel_fade(self, address: tuple):
+        task = self._fades.pop(address, None)
+        self._fade_times.pop(address, None)
+        if task is not None:
+            task.cancel()
+
+    def _release_fade(self, address: tuple, cue_time: float):
+        """Cancels the fade of address started by an event earlier than a unique control sent ahead at cue_time"""
+        if self._fade_times.get(address, math.inf) < cue_time:
+            self._cancel_fade(address)
+
+    async def _play_fade(self, event: Event, destination: tuple[str, int], start_time: float):
+        """
+        Task of a fade: sends each new frame of the compiled curve, then sleeps until the next frame.
+        A frame is skipped when its value differs by min_delta or less from the last value sent.
+
+        Args:
+            event (Event): The event whose control is played.
+            destination (tuple[str, int]): The destination (ip, port) of the event.
+            start_time (float): Elapsed time of the run at which the fade started, in seconds.
+        """
+        engine = self.timeline.animation_engine
+        curve = engine.get_curve(event.control)
+        last_frame = len(curve) - 1
+        last_value = None
+        index = -1
+        while index < last_frame:
+            index = curve.frame_index(self.elapsed() - start_time)
+            value = curve.frame_value(index)
+            if (
+                last_value is None
+                or abs(value - last_value) > engine.min_delta
+                or (index == last_frame and value != last_value)
+            ):
+                await self._send(destination, [event.encode(value)])
+                last_value = value
+            if index < last_frame:
+                await self._sleep_until(start_time + (index + 1) / curve.frame_rate)
+
+    async def _sleep_until(self, deadline: float):
+        """Sleeps until the elapsed time of the run reaches deadline, paused time excluded"""
+        while True:
+            if self._pause_time is not None:
+                await self._resumed.wait()
+                continue
+            remaining_time = deadline - self.elapsed()
+            if remaining_time <= 0:
+                return
+            await asyncio.sleep(remaining_time)
+
+    async def _send(self, destination: tuple[str, int], dgrams: list[bytes], timetag: float = None):
+        """Sends encoded messages to a destination, in bundles if there are several or a timetag"""
+        transport = self._transports.get(destination)
+        if transport is None or transport.is_closing():
+            connecting = self._connecting.get(destination)
+            if connecting is None:
+                connecting = asyncio.ensure_future(self._connect(destination))
+                self._connecting[destination] = connecting
+            # Shielded: a fade cancelled while waiting does not cancel the endpoint of the other sends
+            transport = await asyncio.shield(connecting)
+
+        if len(dgrams) == 1 and timetag is None:
+            dgrams_sent = dgrams
+        else:
+            dgrams_sent = encode_bundles(dgrams, timetag)
+        for dgram in dgrams_sent:
+            try:
+                transport.sendto(dgram)
+            except OSError as error:
+                logger.warning("OSC message to %s:%s not sent: %s", *destination, error)
+
+    async def _connect(self, destination: tuple[str, int]) -> asyncio.DatagramTransport:
+        """Opens the datagram transport of a destination"""
+        try:
+            loop = asyncio.get_running_loop()
+            transport, _ = await loop.create_datagram_endpoint(
+                asyncio.DatagramProtocol, remote_addr=destination
+            )
+            self._transports[destination] = transport
+            return transport
+        finally:
+            self._connecting.pop(destination, None)
+
+    def _close_transports(self):
+        for connecting in self._connecting.values():
+            connecting.cancel()
+        self._connecting = {}
+        for transport in self._transports.values():
+            transport.close()
+        self._transports = {}
+
+    def pause(self):
+        """Freezes the clock of the run: the schedule and every fade wait until resume() or stop()"""
+        if self._pause_time is None and self._resumed is not None:
+            self._pause_time = time.perf_counter()
+            self._resumed.clear()
+            self.timeline.log_message.emit("Timeline paused")
+            self.timeline.state = State.PAUSED
+
+    def resume(self):
+        """Restarts the clock from the elapsed time at which it was paused"""
+        if self._pause_time is not None:
+            self._start_time += time.perf_counter() - self._pause_time
+            self._pause_time = None
+            self._resumed.set()
+            self.timeline.log_message.emit("Timeline resumed")
+            self.timeline.state = State.RUNNING
+
+    def stop(self):
+        """Stops the run: the schedule and every fade are cancelled"""
+        if self._schedule_task is not None:
+            self.timeline.log_message.emit("Timeline stopped")
+            self._stopped = True
+            self._schedule_task.cancel()
@@ -0,0 +1,371 @@
+"""
+Binary show format of the OSC Timeline, an alternative to JSON for the largest shows.
+It is read through mmap without parsing: the events are materialized lazily, when they are accessed.
+
+Layout (little-endian):
+    header      HEADER: magic, version, record size, name, ip and port of the timeline,
+                counts and offsets of the other sections
+    records     one fixed-width RECORD per event: time, interned command id, control mode, flags,
+                unique value, reference and count of the list values, duration, easing, frame rate
+                and destination
+    values      float64 array holding the lists: values of the animated controls,
+                flattened keyframes of the envelopes and Bezier easings
+    strings     string table: (string count + 1) uint32 offsets, then the UTF-8 strings.
+                Each string (command, ip, name...) is stored once and referenced by its index.
+
+The numbers of the lists are stored as floats: they are sent as floats by the animations anyway.
+"""
+import mmap
+import os
+import struct
+
+from Control import Control
+from EditJournal import replace_file
+from Event import Event
+from JsonBackend import dump_timeline
+from JsonStream import JsonStreamReader
+from Model import ControlMode, JsonModel
+from Validation import validate_event, validate_json
+
+MAGIC = b"OSCTLBIN"
+VERSION = 1
+BINARY_EXTENSION = ".oscb"
+
+# magic, version, record size, name, ip, port, record count, string count, values offset, strings offset
+HEADER = struct.Struct("<8sHHIIIIIQQ")
+# time, command, mode, flags, number, reference, count, duration, easing, frame rate, destination ip and port
+RECORD = struct.Struct("<dIBBxxdIIdIdII4x")
+STRING_OFFSET = struct.Struct("<I")
+
+MODES = [ControlMode.UNIQUE, ControlMode.ANIMATED, ControlMode.ENVELOPE]
+MODE_CODES = {mode: code for code, mode in enumerate(MODES)}
+
+# Flags of a record
+TIME_INT = 1 << 0
+NUMBER_INT = 1 << 1  # The unique value is an int
+STRING = 1 << 2  # The unique value is the string of reference
+DURATION_INT = 1 << 3
+BEZIER = 1 << 4  # The easing is an offset in the values instead of a string
+FRAME_RATE = 1 << 5
+FRAME_RATE_INT = 1 << 6
+DESTINATION = 1 << 7
+
+
+def is_binary_path(path: str) -> bool:
+    return str(path).endswith(BINARY_EXTENSION)
+
+
+class BinaryShowWriter:
+    """
+    The BinaryShowWriter class writes a binary show event by event: each record is written as soon
+    as its event is added, and the header, values and strings are written by close().
+
+    Examples of use:
+        writer = BinaryShowWriter("show.oscb")
+        for event in events:
+            writer.add(event)
+        writer.close(name="Show", ip="127.0.0.1", port=7000)
+    """
+
+    def __init__(self, path: str) -> None:
+        self.file = open(path, "wb")
+        # Room for the header, written last
+        self.file.write(bytes(HEADER.size))
+        self.record_count = 0
+        self._strings: dict[str, int] = {}
+        self._values: list[float] = []
+
+    def intern(self, string: str) -> int:
+        """Returns the index of a string in the string table, added on first use"""
+        index = self._strings.get(string)
+        if index is None:
+            index = self._strings[string] = len(self._strings)
+        return index
+
+    def _add_values(self, values: list) -> int:
+        """Appends numbers to the values, and returns their offset"""
+        offset = len(self._values)
+        self._values.extend(values)
+        return offset
+
+    def add(self, event: Event):
+        """Writes the record of an event"""
+        control = event.control
+        flags = TIME_INT if isinstance(event.time, int) else 0
+        number = duration = frame_rate = 0
+        reference = count = easing = 0
+
+        if control.mode == ControlMode.UNIQUE:
+            if isinstance(control.value, str):
+                flags |= STRING
+                reference = self.intern(control.value)
+            else:
+                if isinstance(control.value, int):
+                    flags |= NUMBER_INT
+                number = control.value
+        else:
+            if control.mode == ControlMode.ENVELOPE:
+                values = [v for keyframe in control.value for v in keyframe]
+            else:
+                values = control.value
+                duration = control.duration
+                if isinstance(duration, int):
+                    flags |= DURATION_INT
+                if isinstance(control.easing, str):
+                    easing = self.intern(control.easing)
+                else:
+                    flags |= BEZIER
+                    easing = self._add_values(control.easing)
+            reference = self._add_values(values)
+            count = len(values)
+            if control.frame_rate is not None:
+                flags |= FRAME_RATE
+                if isinstance(control.frame_rate, int):
+                    flags |= FRAME_RATE_INT
+                frame_rate = control.frame_rate
+
+        destination_ip = destination_port = 0
+        if event.destination is not None:
+            flags |= DESTINATION
+            destination_ip = self.intern(event.destination[0])
+            destination_port = event.destination[1]
+
+        self.file.write(
+            RECORD.pack(
+                event.time,
+                self.intern(event.command),
+                MODE_CODES[control.mode],
+                flags,
+                number,
+                reference,
+                count,
+                duration,
+                easing,
+                frame_rate,
+                destination_ip,
+                destination_port,
+            )
+        )
+        self.record_count += 1
+
+    def close(self, name: str, ip: str, port: int):
+        """Writes the values, the strings and the header, then closes the file"""
+        header_strings = self.intern(name), self.intern(ip)
+        values_offset = self.file.tell()
+        self.file.write(struct.pack(f"<{len(self._values)}d", *self._values))
+
+        strings_offset = self.file.tell()
+        encoded_strings = [string.encode("utf-8") for string in self._strings]
+        offsets = [0]
+        for encoded in encoded_strings:
+            offsets.append(offsets[-1] + len(encoded))
+        self.file.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        self.file.write(b"".join(encoded_strings))
+
+        self.file.seek(0)
+        self.file.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                RECORD.size,
+                *header_strings,
+                port,
+                self.record_count,
+                len(self._strings),
+                values_offset,
+                strings_offset,
+            )
+        )
+        self.file.close()
+
+
+class BinaryShow:
+    """
+    The BinaryShow class reads a binary show through mmap. Nothing is parsed when it is opened:
+    each event is materialized from its record when it is accessed, and the strings are decoded on first use.
+
+    Examples of use:
+        with BinaryShow("show.oscb") as show:
+            show.name, show.ip, show.port
+            len(show)
+            show.time(12)   # Time of the 13th event, without materializing it
+            event = show[12]
+            for event in show:
+                ...
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (
+                magic,
+                version,
+                record_size,
+                name,
+                ip,
+                self.port,
+                self._record_count,
+                self._string_count,
+                self._values_offset,
+                self._strings_offset,
+            ) = HEADER.unpack_from(self._mmap)
+        except struct.error:
+            self.close()
+            raise ValueError(f"{path} is not a binary show")
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a binary show of version {VERSION}")
+        self._strings_data_offset = self._strings_offset + STRING_OFFSET.size * (
+            self._string_count + 1
+        )
+        # Strings already decoded, by index
+        self._strings: dict[int, str] = {}
+        self.name = self.string(name)
+        self.ip = self.string(ip)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._mmap.close()
+
+    def __len__(self):
+        return self._record_count
+
+    def string(self, index: int) -> str:
+        """Returns a string of the string table"""
+        string = self._strings.get(index)
+        if string is None:
+            offset = self._strings_offset + STRING_OFFSET.size * index
+            start, end = struct.unpack_from("<2I", self._mmap, offset)
+            string = self._mmap[
+                self._strings_data_offset + start : self._strings_data_offset + end
+            ].decode("utf-8")
+            self._strings[index] = string
+        return string
+
+    def _values(self, offset: int, count: int) -> list[float]:
+        return list(struct.unpack_from(f"<{count}d", self._mmap, self._values_offset + 8 * offset))
+
+    def _record_offset(self, index: int) -> int:
+        if not 0 <= index < self._record_count:
+            raise IndexError("event index out of range")
+        return HEADER.size + RECORD.size * index
+
+    def time(self, index: int) -> float | int:
+        """Returns the time of an event, without materializing it"""
+        offset = self._record_offset(index)
+        time = struct.unpack_from("<d", self._mmap, offset)[0]
+        if self._mmap[offset + 13] & TIME_INT:
+            return int(time)
+        return time
+
+    def __getitem__(self, index: int) -> Event:
+        if index < 0:
+            index += self._record_count
+        (
+            time,
+            command,
+            mode_code,
+            flags,
+            number,
+            reference,
+            count,
+            duration,
+            easing,
+            frame_rate,
+            destination_ip,
+            destination_port,
+        ) = RECORD.unpack_from(self._mmap, self._record_offset(index))
+
+        mode = MODES[mode_code]
+        if mode == ControlMode.UNIQUE:
+            if flags & STRING:
+                value = self.string(reference)
+            else:
+                value = int(number) if flags & NUMBER_INT else number
+            control = Control(mode=mode, value=value)
+        else:
+            values = self._values(reference, count)
+            if flags & FRAME_RATE:
+                frame_rate = int(frame_rate) if flags & FRAME_RATE_INT else frame_rate
+            else:
+                frame_rate = None
+            if mode == ControlMode.ENVELOPE:
+                keyframes = [values[i : i + 2] for i in range(0, count, 2)]
+                control = Control(mode=mode, value=keyframes, frame_rate=frame_rate)
+            else:
+                control = Control(
+                    mode=mode,
+                    value=values,
+                    duration=int(duration) if flags & DURATION_INT else duration,
+                    easing=self._values(easing, 4) if flags & BEZIER else self.string(easing),
+                    frame_rate=frame_rate,
+                )
+
+        destination = None
+        if flags & DESTINATION:
+            destination = (self.string(destination_ip), destination_port)
+        return Event(
+            time=int(time) if flags & TIME_INT else time,
+            command=self.string(command),
+            control=control,
+            destination=destination,
+        )
+
+    def __iter__(self):
+        for index in range(self._record_count):
+            yield self[index]
+
+
+def json_to_binary(json_path: str, binary_path: str):
+    """
+    Converts a JSON timeline into a binary show, in a single streaming pass:
+    each event is validated and written as soon as it is read.
+    The show is written to a temporary file, which replaces binary_path once the conversion succeeded.
+    """
+    tmp_path = f"{binary_path}.tmp"
+    writer = BinaryShowWriter(tmp_path)
+    try:
+        with open(json_path, "r", encoding="utf-8") as json_file:
+            reader = JsonStreamReader(json_file, JsonModel.TIMELINE.value["name"])
+            for event_index, event_dict in enumerate(reader.iter_items()):
+                validate_event(event_dict, event_index)
+                writer.add(Event.from_dict(event_dict))
+        json_dict = reader.header
+        if reader.streamed:
+            json_dict[JsonModel.TIMELINE.value["name"]] = []
+        validate_json(json_dict)
+        writer.close(
+            json_dict[JsonModel.NAME.value["name"]],
+            json_dict[JsonModel.IP.value["name"]],
+            json_dict[JsonModel.PORT.value["name"]],
+        )
+    except Exception:
+        writer.file.close()
+        os.remove(tmp_path)
+        raise
+    replace_file(tmp_path, binary_path)
+
+
+def binary_to_json(binary_path: str, json_path: str):
+    """
+    Converts a binary show into a JSON timeline, in the format of TimelineCore.to_json.
+    The events are materialized and written one chunk at a time.
+    """
+    with BinaryShow(binary_path) as show, open(json_path, "wb") as json_file:
+        header = {
+            JsonModel.NAME.value["name"]: show.name,
+            JsonModel.IP.value["name"]: show.ip,
+            JsonModel.PORT.value["name"]: show.port,
+        }
+        dump_timeline(
+            json_file,
+            header,
+            JsonModel.TIMELINE.value["name"],
+            (event.to_dict() for event in show),
+        )
@@ -1,13 +1,25 @@
+import bisect
 from enum import Enum, auto
 import time
 from typing import Union
 
-from Model import ControlMode, ControlModel, ControlModelAnimated, ControlModelUnique
+from Model import (
+    ControlMode,
+    ControlModel,
+    ControlModelAnimated,
+    ControlModelEnvelope,
+    ControlModelUnique,
+    Easing,
+)
+from Curve import Curve, ease
 from pythonosc.udp_client import SimpleUDPClient
 
 DEFAULT_VALUE_UNIQUE = 1
 DEFAULT_VALUE_ANIMATED = [0, 1]
 DEFAULT_DURATION_ANIMATED = 2
+DEFAULT_VALUE_ENVELOPE = [[0, 0], [1, 1], [2, 0]]
+DEFAULT_FRAME_RATE = 100  # frames per second
+DEFAULT_EASING = Easing.LINEAR.value
 
 
 class Control:
@@ -17,6 +29,8 @@ class Control:
     - Unique: only one value is sent
     - Animated: an interpolation of the first value and the second value will be sent during a specified duration,
                 to mimic a fader.
+    - Envelope: a linear interpolation between any number of [time, value] keyframes, like an automation lane.
+                The duration is the time of the last keyframe.
 
     Examples of use:
     - Creating a unique control with a value of 0.5:
@@ -27,14 +41,32 @@ class Control:
 
     - Running a control by sending the OSC command over a network:
         control.run(client, "/some/command")
+
+    - Creating an animated control with an easing curve, named or cubic Bezier [x1, y1, x2, y2]:
+        control = Control(mode=ControlMode.ANIMATED, value=[0, 1], duration=3, easing="ease_in_out")
+        control = Control(mode=ControlMode.ANIMATED, value=[0, 1], duration=3, easing=[0.42, 0, 0.58, 1])
+
+    - Creating an animated control sent at 25 frames per second instead of the rate of the animation engine:
+        control = Control(mode=ControlMode.ANIMATED, value=[0, 1], duration=3, frame_rate=25)
+
+    - Creating an envelope rising to 1 in 2 seconds, holding for 3 seconds, then falling to 0 in 1 second:
+        control = Control(mode=ControlMode.ENVELOPE, value=[[0, 0], [2, 1], [5, 1], [6, 0]])
+
+    - Getting the animated control compiled into frames (see Curve.py):
+        curve = control.get_curve(frame_rate=50)
     """
     def __init__(
         self,
         mode: ControlMode = ControlMode.UNIQUE,
         value: float | int | str | list = 1,
         duration: float | int = None,
+        easing: str | list = DEFAULT_EASING,
+        frame_rate: float | int = None,
     ) -> None:
         self._mode = mode
+        self._change_callback = None
+        # Compiled curves of the animated control by frame rate, dropped on each edit
+        self._curves = {}
 
         if self._mode == ControlMode.ANIMATED:
             if isinstance(value, (float, int)):
@@ -59,6 +91,18 @@ class Control:
                     "For animated control, duration must be a positive numeric value."
                 )
             self._duration = duration
+
+            Control.check_easing(easing)
+            self._easing = easing
+
+            Control.check_frame_rate(frame_rate)
+            self._frame_rate = frame_rate
+        elif self._mode == ControlMode.ENVELOPE:
+            self._easing = DEFAULT_EASING
+            self.value = value
+
+            Control.check_frame_rate(frame_rate)
+            self._frame_rate = frame_rate
         else:
             if not isinstance(value, (float, int, str)):
                 raise ValueError(
@@ -66,6 +110,8 @@ class Control:
                 )
             self._value = value
             self._duration = None
+            self._easing = DEFAULT_EASING
+            self._frame_rate = None
 
     # Setter / getter
     @property
@@ -75,14 +121,25 @@ class Control:
     @mode.setter
     def mode(self, new_mode: ControlMode):
         self._mode = new_mode
-
-        if new_mode == ControlMode.UNIQUE:
-            self.value = DEFAULT_VALUE_UNIQUE
-        elif new_mode == ControlMode.ANIMATED:
-            self.value = DEFAULT_VALUE_ANIMATED
-            self.duration = DEFAULT_DURATION_ANIMATED
-        else:
-            raise Exception("Unknown mode")
+        self._curves = {}
+
+        # The default values of the mode are a single edit
+        change_callback, self._change_callback = self._change_callback, None
+        try:
+            if new_mode == ControlMode.UNIQUE:
+                self.value = DEFAULT_VALUE_UNIQUE
+            elif new_mode == ControlMode.ANIMATED:
+                self.value = DEFAULT_VALUE_ANIMATED
+                self.duration = DEFAULT_DURATION_ANIMATED
+                self.easing = DEFAULT_EASING
+            elif new_mode == ControlMode.ENVELOPE:
+                self.value = DEFAULT_VALUE_ENVELOPE
+                self._easing = DEFAULT_EASING
+            else:
+                raise Exception("Unknown mode")
+        finally:
+            self._change_callback = change_callback
+        self._notify_change()
         
     @property
     def value(self):
@@ -90,7 +147,19 @@ class Control:
 
     @value.setter
     def value(self, new_value):
+        if self._mode == ControlMode.ENVELOPE:
+            Control.check_keyframes(new_value)
+            # Sorted times of the keyframes, searched by value_at()
+            self._keyframe_times = [keyframe[0] for keyframe in new_value]
+            self._duration = new_value[-1][0]
         self._value = new_value
+        self._curves = {}
+        self._notify_change()
+
+    @property
+    def is_animated(self):
+        """True if the control sends a series of values (animated or envelope mode)"""
+        return self._mode in (ControlMode.ANIMATED, ControlMode.ENVELOPE)
 
     @property
     def duration(self):
@@ -103,13 +172,161 @@ class Control:
                 "For animated control, duration must be a positive numeric value."
             )
         self._duration = new_duration
+        self._curves = {}
+        self._notify_change()
+
+    @property
+    def easing(self):
+        return self._easing
+
+    @easing.setter
+    def easing(self, new_easing: str | list):
+        Control.check_easing(new_easing)
+        self._easing = new_easing
+        self._curves = {}
+        self._notify_change()
+
+    @property
+    def frame_rate(self):
+        return self._frame_rate
+
+    @frame_rate.setter
+    def frame_rate(self, new_frame_rate: float | int | None):
+        Control.check_frame_rate(new_frame_rate)
+        self._frame_rate = new_frame_rate
+        self._notify_change()
+
+    def set_change_callback(self, callback):
+        """
+        Set the function called after each edit of the mode, the value, the duration, the easing or the frame rate.
+
+        Args:
+            callback (Callable[[], None] | None): Called without argument.
+        """
+        self._change_callback = callback
+
+    def _notify_change(self):
+        if self._change_callback is not None:
+            self._change_callback()
+
+    @classmethod
+    def check_frame_rate(clc, frame_rate: float | int | None):
+        """Raises a ValueError if frame_rate is neither None nor a positive number"""
+        if frame_rate is not None and (
+            not isinstance(frame_rate, (float, int)) or frame_rate <= 0
+        ):
+            raise ValueError("The frame rate must be a positive numeric value.")
+
+    @classmethod
+    def check_keyframes(clc, keyframes: list):
+        """
+        Raises a ValueError if keyframes is not a non-empty list of [time, value] pairs of numbers,
+        with positive times in strictly increasing order
+        """
+        if (
+            not isinstance(keyframes, list)
+            or not keyframes
+            or not all(
+                isinstance(keyframe, list)
+                and len(keyframe) == 2
+                and all(isinstance(v, (float, int)) for v in keyframe)
+                for keyframe in keyframes
+            )
+        ):
+            raise ValueError(
+                "For envelope control, value should be a non-empty list of [time, value] keyframes of integers or floats."
+            )
+        times = [keyframe[0] for keyframe in keyframes]
+        if times[0] < 0 or any(t1 <= t0 for t0, t1 in zip(times, times[1:])):
+            raise ValueError(
+                "The times of the keyframes should be positive and strictly increasing."
+            )
+
+    @classmethod
+    def check_easing(clc, easing: str | list):
+        """
+        Raises a ValueError if easing is neither the name of an Easing
+        nor the control points [x1, y1, x2, y2] of a cubic Bezier with x1 and x2 in [0, 1]
+        """
+        if isinstance(easing, str):
+            if easing not in [member.value for member in Easing]:
+                raise ValueError(f"Unknown easing {easing}.")
+        elif (
+            not isinstance(easing, list)
+            or len(easing) != 4
+            or not all(isinstance(v, (float, int)) for v in easing)
+            or not (0 <= easing[0] <= 1 and 0 <= easing[2] <= 1)
+        ):
+            raise ValueError(
+                "A Bezier easing should be a list [x1, y1, x2, y2] of numbers, with x1 and x2 between 0 and 1."
+            )
 
     # Control methods
+    def get_curve(self, frame_rate: float = DEFAULT_FRAME_RATE):
+        """
+        Returns the animated control compiled into frames at frame_rate frames per second.
+        The curve is compiled once and cached until the control is edited.
+
+        Args:
+            frame_rate (float): Number of frames per second.
+
+        Returns:
+            Curve: The compiled curve.
+        """
+        if not self.is_animated:
+            raise Exception("Only an animated control can be compiled into a curve")
+
+        curve = self._curves.get(frame_rate)
+        if curve is None:
+            if self.mode == ControlMode.ENVELOPE:
+                curve = Curve.envelope(self.value, frame_rate)
+            else:
+                initial_value, final_value = self.value
+                curve = Curve.fade(
+                    initial_value, final_value, self.duration, frame_rate, self.easing
+                )
+            self._curves[frame_rate] = curve
+        return curve
+
+    def value_at(self, elapsed_time: float | int):
+        """
+        Returns the value of the control after elapsed_time seconds of playback.
+
+        Args:
+            elapsed_time (float | int): Time elapsed since the control started, in seconds.
+        """
+        if self.mode == ControlMode.UNIQUE:
+            return self.value
+
+        if self.mode == ControlMode.ENVELOPE:
+            # Binary search of the segment of the envelope: O(log k) with k keyframes
+            keyframes = self.value
+            index = bisect.bisect_right(self._keyframe_times, elapsed_time)
+            if index == 0:
+                return float(keyframes[0][1])
+            if index == len(keyframes):
+                return float(keyframes[-1][1])
+            (time0, value0), (time1, value1) = keyframes[index - 1], keyframes[index]
+            return value0 + (value1 - value0) * (elapsed_time - time0) / (time1 - time0)
+
+        # Always a float, so that all the messages of a fade have the same OSC type
+        initial_value, final_value = self.value
+        progress = elapsed_time / self.duration
+        if progress >= 1.0:
+            return float(final_value)
+        if progress <= 0.0:
+            return float(initial_value)
+        if self.easing != DEFAULT_EASING:
+            progress = float(ease(progress, self.easing))
+        return initial_value + (final_value - initial_value) * progress
+
     def run(self, client: SimpleUDPClient, command: str):
         if self.mode == ControlMode.UNIQUE:
             self._send_unique_control(client, command)
         elif self.mode == ControlMode.ANIMATED:
             self._send_animated_control(client, command)
+        elif self.mode == ControlMode.ENVELOPE:
+            self._send_envelope_control(client, command)
 
     def _send_unique_control(self, client: SimpleUDPClient, command: str):
         """
@@ -157,6 +374,27 @@ class Control:
         client.send_message(command, final_value)
         print(f"OSC Command sent : {command} {self.value}")
 
+    def _send_envelope_control(
+        self, client: SimpleUDPClient, command: str, delay: float = 10
+    ):
+        """
+        Sends the values of the envelope through the provided client every delay milliseconds.
+
+        Args:
+            client: The client object with a `send_message` method to send commands.
+            command (str): The command to be sent with each value.
+            delay (float): The delay between each update.
+        """
+        start_time = time.time()
+        delay = delay / 1000
+
+        while time.time() - start_time < self.duration:
+            client.send_message(command, self.value_at(time.time() - start_time))
+            time.sleep(delay)
+
+        # Ensure that the last value is sent before exiting
+        client.send_message(command, self.value_at(self.duration))
+
     def to_dict(self):
         """
         Converts the control object to a dictionary representation for serialization.
@@ -170,6 +408,14 @@ class Control:
         elif self._mode == ControlMode.ANIMATED:
             control_dict[ControlModelAnimated.VALUE.value["name"]] = self.value
             control_dict[ControlModelAnimated.DURATION.value["name"]] = self.duration
+            if self.easing != DEFAULT_EASING:
+                control_dict[ControlModelAnimated.EASING.value["name"]] = self.easing
+            if self.frame_rate is not None:
+                control_dict[ControlModelAnimated.FRAME_RATE.value["name"]] = self.frame_rate
+        elif self._mode == ControlMode.ENVELOPE:
+            control_dict[ControlModelEnvelope.VALUE.value["name"]] = self.value
+            if self.frame_rate is not None:
+                control_dict[ControlModelEnvelope.FRAME_RATE.value["name"]] = self.frame_rate
         else:
             raise Exception("Unknown control mode")
 
@@ -193,7 +439,20 @@ class Control:
             return Control(mode=_mode, value=_value)
         elif _mode == ControlMode.ANIMATED:
             _duration = control_dict["duration"]
-            return Control(mode=_mode, value=_value, duration=_duration)
+            _easing = control_dict.get(
+                ControlModelAnimated.EASING.value["name"], DEFAULT_EASING
+            )
+            _frame_rate = control_dict.get(ControlModelAnimated.FRAME_RATE.value["name"])
+            return Control(
+                mode=_mode,
+                value=_value,
+                duration=_duration,
+                easing=_easing,
+                frame_rate=_frame_rate,
+            )
+        elif _mode == ControlMode.ENVELOPE:
+            _frame_rate = control_dict.get(ControlModelEnvelope.FRAME_RATE.value["name"])
+            return Control(mode=_mode, value=_value, frame_rate=_frame_rate)
 
     @classmethod
     def convert_mode_str_to_enum(clc, mode_str: str):
@@ -210,6 +469,8 @@ class Control:
             return ControlMode.UNIQUE
         elif mode_str == "animated":
             return ControlMode.ANIMATED
+        elif mode_str == "envelope":
+            return ControlMode.ENVELOPE
         else:
             raise Exception("Incorrect mode value")
 
@@ -219,5 +480,7 @@ class Control:
                 self._mode == other._mode
                 and self._value == other._value
                 and self._duration == other._duration
+                and self._easing == other._easing
+                and self._frame_rate == other._frame_rate
             )
         return False
@@ -0,0 +1,182 @@
+import numpy as np
+
+from Model import Easing
+
+EASING_TABLE_SIZE = 4097
+
+# Vectorized easing functions: progress in [0, 1] -> eased progress in [0, 1]
+EASING_FUNCTIONS = {
+    Easing.LINEAR.value: lambda progress: progress,
+    Easing.EASE_IN.value: lambda progress: progress**3,
+    Easing.EASE_OUT.value: lambda progress: 1 - (1 - progress) ** 3,
+    Easing.EASE_IN_OUT.value: lambda progress: np.where(
+        progress < 0.5, 4 * progress**3, 1 - (2 - 2 * progress) ** 3 / 2
+    ),
+    Easing.EXPONENTIAL.value: lambda progress: (2 ** (10 * progress) - 1) / (2**10 - 1),
+    Easing.STEP.value: lambda progress: np.where(progress < 1, 0.0, 1.0),
+}
+
+# Lookup tables already computed, by easing name or Bezier control points
+_easing_tables: dict[str | tuple, np.ndarray] = {}
+
+
+def bezier_table(x1: float, y1: float, x2: float, y2: float) -> np.ndarray:
+    """
+    Samples the cubic Bezier easing (0, 0), (x1, y1), (x2, y2), (1, 1) on EASING_TABLE_SIZE uniform progress steps
+    """
+    t = np.linspace(0, 1, EASING_TABLE_SIZE * 4)
+    bezier_x = 3 * (1 - t) ** 2 * t * x1 + 3 * (1 - t) * t**2 * x2 + t**3
+    bezier_y = 3 * (1 - t) ** 2 * t * y1 + 3 * (1 - t) * t**2 * y2 + t**3
+    # x(t) is monotonic because x1 and x2 are in [0, 1]: y can be interpolated as a function of x
+    return np.interp(np.linspace(0, 1, EASING_TABLE_SIZE), bezier_x, bezier_y)
+
+
+def easing_table(easing: str | list) -> np.ndarray:
+    """
+    Returns the lookup table of an easing: its value on EASING_TABLE_SIZE uniform progress steps.
+    Each table is computed once.
+
+    Args:
+        easing (str | list): Name of the easing (see Model.Easing) or control points [x1, y1, x2, y2] of a cubic Bezier.
+    """
+    key = easing if isinstance(easing, str) else tuple(easing)
+    table = _easing_tables.get(key)
+    if table is None:
+        if isinstance(easing, str):
+            table = EASING_FUNCTIONS[easing](np.linspace(0, 1, EASING_TABLE_SIZE))
+        else:
+            table = bezier_table(*easing)
+        table = _easing_tables[key] = np.asarray(table, dtype=float)
+    return table
+
+
+def ease(progress, easing: str | list):
+    """
+    Applies an easing to progress (a float or an array of floats in [0, 1]) through its lookup table
+    """
+    if easing == Easing.LINEAR.value:
+        return progress
+    table = easing_table(easing)
+    return np.interp(progress, np.linspace(0, 1, len(table)), table)
+
+
+class Curve:
+    """
+    The Curve class is an animated control compiled into NumPy arrays:
+    the time of each frame since the start of the animation, and the value sent at this frame.
+    Playing the animation only indexes the precomputed frames, there is no per-frame math.
+    The arrays can also be used to preview or analyse the animation.
+
+    Examples of use:
+    - Compiling a fade from 0 to 1 in 2 seconds at 50 frames per second:
+        curve = Curve.fade(0, 1, duration=2, frame_rate=50)
+        curve.times, curve.values   # 101 frames
+
+    - Compiling a fade with an easing (see Model.Easing) or a cubic Bezier:
+        curve = Curve.fade(0, 1, duration=2, frame_rate=50, easing="ease_in_out")
+        curve = Curve.fade(0, 1, duration=2, frame_rate=50, easing=[0.25, 0.1, 0.25, 1])
+
+    - Compiling an envelope from its [time, value] keyframes:
+        curve = Curve.envelope([[0, 0], [2, 1], [5, 1], [6, 0]], frame_rate=50)
+
+    - Getting the value to send 0.5 second after the start of the animation:
+        curve.value_at(0.5)
+    """
+
+    def __init__(self, times: np.ndarray, values: np.ndarray, frame_rate: float) -> None:
+        """
+        Initialize the Curve object.
+
+        Args:
+            times (np.ndarray): Time of each frame since the start of the animation, in seconds.
+            values (np.ndarray): Value of each frame.
+            frame_rate (float): Number of frames per second.
+        """
+        self.times = times
+        self.values = values
+        self.frame_rate = frame_rate
+        # Python floats: indexing a list is faster than a NumPy array, and the values are sent as is
+        self._frame_values: list[float] = values.tolist()
+
+    def __len__(self):
+        return len(self._frame_values)
+
+    @property
+    def duration(self) -> float:
+        return float(self.times[-1])
+
+    @classmethod
+    def frame_times(clc, duration: float | int, frame_rate: float) -> np.ndarray:
+        """
+        Returns the time of each frame of an animation: one every 1/frame_rate second,
+        the last one being exactly at the end of the animation
+        """
+        number_frames = int(np.ceil(duration * frame_rate)) + 1
+        return np.minimum(np.arange(number_frames) / frame_rate, duration)
+
+    @classmethod
+    def fade(
+        clc,
+        initial_value: float | int,
+        final_value: float | int,
+        duration: float | int,
+        frame_rate: float,
+        easing: str | list = Easing.LINEAR.value,
+    ):
+        """
+        Compiles an interpolation from initial_value to final_value during duration seconds.
+        The easing is applied to all the frames at once through its lookup table.
+        """
+        times = Curve.frame_times(duration, frame_rate)
+        progress = ease(times / duration, easing)
+        values = initial_value + (final_value - initial_value) * progress
+        return Curve(times, values, frame_rate)
+
+    @classmethod
+    def envelope(clc, keyframes: list, frame_rate: float):
+        """
+        Compiles a linear interpolation between the [time, value] keyframes of an envelope,
+        from time 0 to the time of the last keyframe. The first value is held before the first keyframe.
+        The segment of each frame is found by binary search on the keyframe times.
+        """
+        keyframe_times, keyframe_values = np.array(keyframes, dtype=float).T
+        times = Curve.frame_times(keyframe_times[-1], frame_rate)
+        segments = np.searchsorted(keyframe_times, times, side="right")
+        previous = np.clip(segments - 1, 0, len(keyframes) - 1)
+        following = np.clip(segments, 0, len(keyframes) - 1)
+        spans = keyframe_times[following] - keyframe_times[previous]
+        progress = np.divide(
+            times - keyframe_times[previous],
+            spans,
+            out=np.zeros_like(times),
+            where=spans > 0,
+        )
+        values = keyframe_values[previous] + (
+            keyframe_values[following] - keyframe_values[previous]
+        ) * np.clip(progress, 0, 1)
+        return Curve(times, values, frame_rate)
+
+    def frame_index(self, elapsed_time: float) -> int:
+        """
+        Returns the index of the last frame reached after elapsed_time seconds of animation.
+
+        Args:
+            elapsed_time (float): Time elapsed since the start of the animation, in seconds.
+        """
+        index = int(elapsed_time * self.frame_rate)
+        if index <= 0:
+            return 0
+        return min(index, len(self._frame_values) - 1)
+
+    def frame_value(self, index: int) -> float:
+        """Returns the value of the frame number index"""
+        return self._frame_values[index]
+
+    def value_at(self, elapsed_time: float) -> float:
+        """
+        Returns the value of the last frame reached after elapsed_time seconds of animation.
+
+        Args:
+            elapsed_time (float): Time elapsed since the start of the animation, in seconds.
+        """
+        return self._frame_values[self.frame_index(elapsed_time)]
@@ -1,17 +1,33 @@
 """
 Custom exceptions used in the JSON parsing fonction (Timeline.py)
+Both report the path of the wrong value in the JSON (e.g. "timeline[3].control") and the index
+of its event in the timeline list when they are known.
 """
 
 
+def format_location(path: str = None, event_index: int = None) -> str:
+    """Returns the location of an error in the JSON, appended to the error texts"""
+    location = ""
+    if path is not None:
+        location += f" in {path}"
+    if event_index is not None:
+        location += f" (event {event_index})"
+    return location
+
+
 class ParseExceptionKey(Exception):
     """Raised when a key is missing in the JSON"""
 
-    def __init__(self, missing_key: str) -> None:
+    def __init__(self, missing_key: str, path: str = None, event_index: int = None) -> None:
         self.missing_key = missing_key
+        self.path = path
+        self.event_index = event_index
         super().__init__(self.create_error_text())
 
     def create_error_text(self):
-        return f"The key {self.missing_key} is missing"
+        return f"The key {self.missing_key} is missing" + format_location(
+            self.path, self.event_index
+        )
 
 
 class ParseExceptionType(Exception):
@@ -20,11 +36,22 @@ class ParseExceptionType(Exception):
     It shows the parent key, the current type and the expected type
     """
 
-    def __init__(self, wrong_value, expected_type, parent_key: str) -> None:
+    def __init__(
+        self,
+        wrong_value,
+        expected_type,
+        parent_key: str,
+        path: str = None,
+        event_index: int = None,
+    ) -> None:
         self.wrong_value = wrong_value
         self.expected_type = expected_type
         self.parent_key = parent_key
+        self.path = path
+        self.event_index = event_index
         super().__init__(self.create_error_text())
 
     def create_error_text(self):
-        return f"The value {self.wrong_value} (type: {type(self.wrong_value)}) for the key {self.parent_key} has a wrong type. It should be {self.expected_type}"
+        return f"The value {self.wrong_value} (type: {type(self.wrong_value)}) for the key {self.parent_key} has a wrong type. It should be {self.expected_type}" + format_location(
+            self.path, self.event_index
+        )
@@ -0,0 +1,168 @@
+import json
+import os
+import threading
+import time
+import zlib
+
+JOURNAL_EXTENSION = ".journal"
+DEFAULT_SYNC_INTERVAL = 0.2  # s
+DEFAULT_COMPACT_THRESHOLD = 1000  # entries
+
+# Operations of the journal entries
+BASE = "base"
+ADD = "add"
+REMOVE = "remove"
+CHANGE = "change"
+
+
+def file_checksum(path: str) -> int:
+    """Returns the CRC32 of the content of a file"""
+    checksum = 0
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            checksum = zlib.crc32(chunk, checksum)
+    return checksum
+
+
+def replace_file(tmp_path: str, path: str):
+    """Replaces path by tmp_path atomically, once the content of tmp_path is on disk"""
+    with open(tmp_path, "rb+") as file:
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+class EditJournal:
+    """
+    The EditJournal class is an append-only journal of the edits of a timeline since it was last saved,
+    one JSON entry per line: events added, removed, and changes of their time, command, control or destination.
+    The entries are written as the edits happen, and synced to disk at most every sync_interval seconds,
+    so that a burst of edits costs a single fsync.
+
+    The first entry (base) identifies the main file the edits apply to, by its checksum, and lists
+    the ids of its events in file order. The journal is reset with a new base each time the main file is saved
+    (compaction), so a journal left by a save interrupted before its reset does not match the main file anymore.
+
+    Examples of use:
+        journal = EditJournal("show.json.journal")
+        journal.reset(file_checksum("show.json"), ids=[1, 2, 3])
+        journal.record(ADD, 4, event.to_dict())
+        journal.record(CHANGE, 2, 1.5, attribute="time")
+        journal.record(REMOVE, 1)
+        journal.close()
+
+    - Reading the entries left by a crashed session:
+        entries = EditJournal.read("show.json.journal")
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sync_interval: float = DEFAULT_SYNC_INTERVAL,
+        compact_threshold: int = DEFAULT_COMPACT_THRESHOLD,
+    ) -> None:
+        """
+        Initialize the EditJournal object, appending to the journal at path.
+
+        Args:
+            path (str): Path of the journal.
+            sync_interval (float): Maximum time an entry waits before being synced to disk, in seconds.
+            compact_threshold (int): Number of entries from which the timeline compacts its journal.
+        """
+        self.path = path
+        self.sync_interval = sync_interval
+        self.compact_threshold = compact_threshold
+        self.entries = 0
+        self._file = open(path, "a")
+        self._last_sync = time.perf_counter()
+        self._lock = threading.Lock()
+        self._timer = None
+
+    @classmethod
+    def read(clc, path: str) -> list[dict]:
+        """
+        Returns the entries of a journal, empty if there is none.
+        A last entry cut by a crash while it was written is ignored.
+        """
+        if not os.path.exists(path):
+            return []
+        entries = []
+        with open(path, "r") as journal_file:
+            for line in journal_file:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+        return entries
+
+    def record(self, operation: str, id: int, value=None, attribute: str = None):
+        """
+        Appends an entry, synced to disk within sync_interval seconds.
+
+        Args:
+            operation (str): ADD, REMOVE or CHANGE.
+            id (int): The id of the event in the timeline.
+            value: The event dict for ADD, the new value of the attribute for CHANGE.
+            attribute (str, optional): The attribute changed: time, command, control or destination.
+        """
+        entry = {"op": operation, "id": id}
+        if attribute is not None:
+            entry["attribute"] = attribute
+        if value is not None or operation == CHANGE:
+            entry["value"] = value
+        with self._lock:
+            self._file.write(json.dumps(entry) + "\n")
+            self.entries += 1
+            if time.perf_counter() - self._last_sync >= self.sync_interval:
+                self._sync()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.sync_interval, self.sync)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def sync(self):
+        """Writes the pending entries to disk"""
+        with self._lock:
+            self._sync()
+
+    def _sync(self):
+        """Called with the lock held"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._file.closed:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._last_sync = time.perf_counter()
+
+    def reset(self, checksum: int, ids: list[int]):
+        """
+        Replaces the journal by a single base entry, once the main file is saved.
+
+        Args:
+            checksum (int): The checksum of the main file (see file_checksum).
+            ids (list[int]): The ids of the events of the main file, in file order.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._file.close()
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as journal_file:
+                journal_file.write(json.dumps({"op": BASE, "checksum": checksum, "ids": ids}) + "\n")
+            replace_file(tmp_path, self.path)
+            self._file = open(self.path, "a")
+            self.entries = 0
+            self._last_sync = time.perf_counter()
+
+    def close(self):
+        """Syncs the pending entries and closes the journal"""
+        with self._lock:
+            self._sync()
+            self._file.close()
+
+    def remove(self):
+        """Closes and deletes the journal"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -1,8 +1,10 @@
+from functools import partial
 from typing import Union
 from Control import Control, ControlMode
-from pythonosc.udp_client import SimpleUDPClient
+from OscOutput import ARGUMENT_ENCODERS, INT32_MAX, INT32_MIN, OscClient, encode_string
+from pythonosc.osc_message_builder import build_msg
 
-from Model import EventModel
+from Model import EventModel, DestinationModel
 
 
 class Event:
@@ -19,16 +21,30 @@ class Event:
     animated_control = Control(mode=ControlMode.ANIMATED, value=[0, 100], duration=5)
     event_animated = Event(time=1, command="/osc/address/animated", control=animated_control)
 
+    - Creating an event sent to its own destination instead of the one of the timeline
+    event = Event(time=2, command="/lights/1", destination=("192.168.0.12", 9000))
+
     - Setting an OSC client for the event:
-        osc_client = SimpleUDPClient("localhost", 8000)
+        osc_client = OscClient("localhost", 8000)
         event.set_osc_client(osc_client)
 
     - Triggering the event:
         event.trigger()
+
+    - Triggering the event without blocking during its animation:
+        event.trigger(animation_engine=AnimationEngine())
+
+    - Being notified when the time, the command or the control of the event is edited,
+      including the edits made on the control itself (e.g. event.control.value = 0.5):
+        event.set_change_callback(lambda event, attribute: print(attribute))
     """
 
     def __init__(
-        self, time: Union[float, int], command: str, control: Control = None
+        self,
+        time: Union[float, int],
+        command: str,
+        control: Control = None,
+        destination: tuple[str, int] = None,
     ) -> None:
         """
         Initialize the Event object.
@@ -38,32 +54,136 @@ class Event:
             command (str): The command to be executed as part of the event.
             control (Control, optional): The control associated with the event.
                                          If not provided, a default control will be created.
+            destination (tuple[str, int], optional): The (ip, port) to which the event is sent.
+                                                     If not provided, the destination of the timeline is used.
         """
         self.client = None
-        self.time = time
-        self.command = command
+        self._change_callback = None
+        # Encoded address + type tag of the OSC messages of the event, by argument type
+        self._encoded_prefixes: dict[type, bytes] = {}
+        self._time = time
+        self._command = command
         if control is None:
-            self.control = Control(mode=ControlMode.UNIQUE, value=1)
+            self._control = Control(mode=ControlMode.UNIQUE, value=1)
         else:
-            self.control = control
+            self._control = control
+        # The edits made on the control itself are edits of the event
+        self._control.set_change_callback(partial(self._notify_change, "control"))
+        self._destination = destination
+
+    # Setter / getter
+    @property
+    def time(self):
+        return self._time
+
+    @time.setter
+    def time(self, new_time: Union[float, int]):
+        self._time = new_time
+        self._notify_change("time")
+
+    @property
+    def command(self):
+        return self._command
+
+    @command.setter
+    def command(self, new_command: str):
+        self._command = new_command
+        self._encoded_prefixes = {}
+        self._notify_change("command")
+
+    @property
+    def control(self):
+        return self._control
+
+    @control.setter
+    def control(self, new_control: Control):
+        self._control.set_change_callback(None)
+        self._control = new_control
+        self._control.set_change_callback(partial(self._notify_change, "control"))
+        self._notify_change("control")
+
+    @property
+    def destination(self):
+        return self._destination
+
+    @destination.setter
+    def destination(self, new_destination: tuple[str, int] | None):
+        self._destination = new_destination
+        self._notify_change("destination")
+
+    def set_change_callback(self, callback):
+        """
+        Set the function called after each edit of the time, the command, the control or the destination of the event.
 
-    def set_osc_client(self, osc_client: SimpleUDPClient):
+        Args:
+            callback (Callable[[Event, str], None] | None): Called with the event and the name of the edited attribute.
+        """
+        self._change_callback = callback
+
+    def _notify_change(self, attribute: str):
+        if self._change_callback is not None:
+            self._change_callback(self, attribute)
+
+    def set_osc_client(self, osc_client: OscClient):
         """
         Set the OSC client for the event.
 
         Args:
-            osc_client (SimpleUDPClient): The OSC client to be associated with the event.
+            osc_client (OscClient): The OSC client to be associated with the event.
         """
         self.client = osc_client
 
-    def trigger(self):
+    def encode(self, value) -> bytes:
+        """
+        Encode the OSC message sending value to the command of the event.
+        The address and the type tag are encoded once and cached until the command is edited,
+        so only the argument is packed on each call.
+
+        Args:
+            value (float | int | str): The argument of the message.
+
+        Returns:
+            bytes: The encoded OSC message.
+        """
+        value_type = type(value)
+        if value_type is int and not INT32_MIN <= value <= INT32_MAX:
+            # Sent as an int64 by python-osc
+            return build_msg(self.command, value).dgram
+        prefix = self._encoded_prefixes.get(value_type)
+        if prefix is None:
+            if value_type not in ARGUMENT_ENCODERS:
+                # Unusual argument type: let python-osc encode the whole message
+                return build_msg(self.command, value).dgram
+            type_tag = ARGUMENT_ENCODERS[value_type][0]
+            prefix = self._encoded_prefixes[value_type] = encode_string(self.command) + type_tag
+        return prefix + ARGUMENT_ENCODERS[value_type][1](value)
+
+    def trigger(self, animation_engine=None, batch=None, timetag: float = None, delay: float = 0):
         """
         Trigger the event: send the command over network
+
+        Args:
+            animation_engine (AnimationEngine, optional): If provided, an animated control is registered
+                                                          in the engine and the call returns immediately.
+                                                          A unique control releases the fades of its address.
+            batch (OscBatch, optional): If provided, a unique control is added to the batch
+                                        and sent when the batch is flushed.
+            timetag (float, optional): Execution time of a unique control added to the batch,
+                                       as a system time in seconds since the epoch.
+            delay (float, optional): Time until the timetag, in seconds: the fades released by
+                                     a unique control keep running until it takes effect.
         """
         if self.client is None:
             raise Exception("No OSC Client specified for the event")
 
-        self.control.run(client=self.client, command=self.command)
+        if animation_engine is not None and self.control.is_animated:
+            animation_engine.add(self)
+        elif batch is not None and self.control.mode == ControlMode.UNIQUE:
+            if animation_engine is not None:
+                animation_engine.release(self, delay=delay)
+            batch.add(self.client, self.encode(self.control.value), timetag=timetag)
+        else:
+            self.control.run(client=self.client, command=self.command)
 
     def to_dict(self):
         """
@@ -72,11 +192,17 @@ class Event:
         Returns:
             dict: The dictionary representation of the event.
         """
-        return {
+        event_dict = {
             EventModel.TIME.value["name"]: self.time,
             EventModel.COMMAND.value["name"]: self.command,
             EventModel.CONTROL.value["name"]: self.control.to_dict(),
         }
+        if self.destination is not None:
+            event_dict[EventModel.DESTINATION.value["name"]] = {
+                DestinationModel.IP.value["name"]: self.destination[0],
+                DestinationModel.PORT.value["name"]: self.destination[1],
+            }
+        return event_dict
 
     @classmethod
     def from_dict(clc, event_dict: dict):
@@ -92,8 +218,18 @@ class Event:
         _time = event_dict[EventModel.TIME.value["name"]]
         _command = event_dict[EventModel.COMMAND.value["name"]]
         _control_dict = event_dict[EventModel.CONTROL.value["name"]]
+        _destination = None
+        if EventModel.DESTINATION.value["name"] in event_dict:
+            _destination_dict = event_dict[EventModel.DESTINATION.value["name"]]
+            _destination = (
+                _destination_dict[DestinationModel.IP.value["name"]],
+                _destination_dict[DestinationModel.PORT.value["name"]],
+            )
         return Event(
-            time=_time, command=_command, control=Control.from_dict(_control_dict)
+            time=_time,
+            command=_command,
+            control=Control.from_dict(_control_dict),
+            destination=_destination,
         )
 
     def __eq__(self, other):
@@ -102,5 +238,6 @@ class Event:
                 self.time == other.time
                 and self.command == other.command
                 and self.control == other.control
+                and self.destination == other.destination
             )
         return False
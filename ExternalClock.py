@@ -0,0 +1,244 @@
+from collections import deque
+import threading
+import time
+
+from pythonosc.dispatcher import Dispatcher
+from pythonosc.osc_server import BlockingOSCUDPServer
+
+from TimelineCore import TimelineCore, State
+
+DEFAULT_CLOCK_ADDRESS = "/timeline/time"
+DEFAULT_WINDOW = 32  # samples
+DEFAULT_JUMP_THRESHOLD = 0.5  # s
+DEFAULT_GAIN = 0.2
+DEFAULT_MAX_SLEW = 0.05  # s per s
+DEFAULT_STALL_TIME = 0.2  # s
+
+
+class ClockEstimator:
+    """
+    Estimates the position of a master clock from the positions it sends, received at local times.
+    A line is fitted by least squares on the last samples: its slope is the rate of the master
+    compared to the local clock (the drift), and it smooths the jitter of the network.
+    A sample further than jump_threshold from the estimation is a jump of the master: the samples are dropped.
+
+    Examples of use:
+        estimator = ClockEstimator()
+        estimator.add(time.perf_counter(), master_position)
+        estimator.position(time.perf_counter())
+        estimator.rate   # e.g. 1.0001 if the master runs 0.01 % faster
+    """
+
+    def __init__(
+        self, window: int = DEFAULT_WINDOW, jump_threshold: float = DEFAULT_JUMP_THRESHOLD
+    ) -> None:
+        """
+        Initialize the ClockEstimator object.
+
+        Args:
+            window (int): Number of samples used by the estimation.
+            jump_threshold (float): Distance to the estimation from which a sample is a jump, in seconds.
+        """
+        self.jump_threshold = jump_threshold
+        # (local time, master position) samples
+        self._samples: deque[tuple[float, float]] = deque(maxlen=window)
+        self.rate = 1.0
+        self._local_mean = 0.0
+        self._master_mean = 0.0
+
+    def __len__(self):
+        return len(self._samples)
+
+    def clear(self):
+        """Drops the samples, e.g. when the master stops"""
+        self._samples.clear()
+        self.rate = 1.0
+
+    def add(self, local_time: float, master_position: float) -> bool:
+        """
+        Adds a sample and updates the estimation.
+
+        Args:
+            local_time (float): Local time at which the position was received, in seconds (time.perf_counter).
+            master_position (float): Position sent by the master, in seconds.
+
+        Returns:
+            bool: True if the sample is a jump of the master.
+        """
+        jumped = bool(self._samples) and (
+            abs(master_position - self.position(local_time)) > self.jump_threshold
+        )
+        if jumped:
+            self._samples.clear()
+        self._samples.append((local_time, master_position))
+        self._fit()
+        return jumped
+
+    def _fit(self):
+        """Least squares fit of the master positions against the local times"""
+        count = len(self._samples)
+        self._local_mean = sum(sample[0] for sample in self._samples) / count
+        self._master_mean = sum(sample[1] for sample in self._samples) / count
+        if count < 2:
+            self.rate = 1.0
+            return
+        covariance = variance = 0.0
+        for local_time, master_position in self._samples:
+            local_delta = local_time - self._local_mean
+            covariance += local_delta * (master_position - self._master_mean)
+            variance += local_delta * local_delta
+        self.rate = covariance / variance if variance > 0 else 1.0
+
+    def position(self, local_time: float) -> float:
+        """Returns the estimated position of the master at local_time, in seconds"""
+        return self._master_mean + self.rate * (local_time - self._local_mean)
+
+
+class ExternalClock:
+    """
+    The ExternalClock class slaves a timeline to a master clock, which sends its position in seconds
+    as an OSC message (e.g. "/timeline/time 12.5") on a local UDP port.
+
+    The position of the master is estimated by a ClockEstimator, then the playhead of the timeline
+    (the clock of its scheduler) is slewed towards it: on each message, it is corrected by the drift
+    of the master and by gain times the remaining error, at most max_slew seconds per second,
+    so that the playhead never jumps for the jitter of the network.
+    When the error exceeds jump_threshold, e.g. when the master locates, the timeline is restarted
+    from the position of the master and the state of its animated controls is chased.
+    A stopped timeline is started as soon as the position of the master moves.
+    When the master keeps sending the same position for stall_time seconds, e.g. when it is paused,
+    the timeline is paused at this position, and it is resumed as soon as the position moves again.
+    The fades already running keep their own pace.
+
+    Examples of use:
+    - Following a master sending "/timeline/time" messages on the port 9000:
+        clock = ExternalClock(timeline, port=9000)
+        clock.start()
+        ...
+        clock.stop()
+
+    - Reading the current error of the playhead, in seconds:
+        clock.error
+    """
+
+    def __init__(
+        self,
+        timeline: TimelineCore,
+        port: int,
+        ip: str = "0.0.0.0",
+        address: str = DEFAULT_CLOCK_ADDRESS,
+        jump_threshold: float = DEFAULT_JUMP_THRESHOLD,
+        gain: float = DEFAULT_GAIN,
+        max_slew: float = DEFAULT_MAX_SLEW,
+        stall_time: float = DEFAULT_STALL_TIME,
+    ) -> None:
+        """
+        Initialize the ExternalClock object.
+
+        Args:
+            timeline (TimelineCore): The slave timeline.
+            port (int): Local UDP port receiving the position of the master.
+            ip (str): Local IP on which the port is opened.
+            address (str): OSC address of the position messages.
+            jump_threshold (float): Error from which the timeline restarts at the position of the master, in seconds.
+            gain (float): Part of the error corrected on each message, between 0 and 1.
+            max_slew (float): Maximum correction of the playhead, in seconds per second.
+            stall_time (float): Time after which a master sending the same position is stalled, in seconds.
+        """
+        self.timeline = timeline
+        self.ip = ip
+        self.port = port
+        self.address = address
+        self.gain = gain
+        self.max_slew = max_slew
+        self.stall_time = stall_time
+        self.estimator = ClockEstimator(jump_threshold=jump_threshold)
+        self.error = 0.0
+        self._last_update = None
+        # Last position of the master, and local time at which it changed
+        self._last_position = None
+        self._last_move = None
+        # True while the timeline is paused by a stalled master
+        self.stalled = False
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """Opens the port and follows the master in a daemon thread"""
+        dispatcher = Dispatcher()
+        dispatcher.map(self.address, self.handle_position)
+        self._server = BlockingOSCUDPServer((self.ip, self.port), dispatcher)
+        # The port actually opened, if port 0 was given
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Closes the port. The timeline keeps running on its own clock"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
+
+    def handle_position(self, address: str, *args):
+        """
+        Handler of the position messages of the master. The messages without a numeric position are ignored.
+
+        Args:
+            address (str): The OSC address of the message.
+            args: The position of the master in seconds, as first argument.
+        """
+        if not args or isinstance(args[0], bool) or not isinstance(args[0], (int, float)):
+            return
+        position = float(args[0])
+        local_time = time.perf_counter()
+        timeline = self.timeline
+        scheduler = timeline.scheduler
+
+        moved = self._last_position is not None and position != self._last_position
+        if position != self._last_position:
+            self._last_position = position
+            self._last_move = local_time
+        elif local_time - self._last_move >= self.stall_time:
+            if not self.stalled and timeline.is_running and timeline.state == State.RUNNING:
+                timeline.log_message.emit(f"External clock stopped at {position:.3f} s")
+                timeline.pause_timeline()
+                # The playhead ran on while the master was stopped
+                scheduler.adjust(position - scheduler.elapsed())
+                self.error = 0.0
+                self.stalled = True
+            self.estimator.clear()
+            self._last_update = local_time
+            return
+
+        if self.stalled:
+            self.stalled = False
+            if timeline.state == State.PAUSED:
+                timeline.resume_timeline()
+
+        self.estimator.add(local_time, position)
+        target = self.estimator.position(local_time)
+
+        if not timeline.is_running:
+            if moved and target < timeline.get_max_time():
+                timeline.log_message.emit(f"Following the external clock from {target:.3f} s")
+                timeline.run_timeline(start_at=target)
+            self._last_update = local_time
+            return
+        if timeline.state != State.RUNNING:
+            # Starting, paused or stopping
+            self._last_update = local_time
+            return
+
+        self.error = target - scheduler.elapsed()
+        if abs(self.error) > self.estimator.jump_threshold:
+            timeline.log_message.emit(f"External clock jumped to {target:.3f} s")
+            timeline.seek(target)
+            self.error = 0.0
+        elif self._last_update is not None:
+            delta_time = local_time - self._last_update
+            correction = (self.estimator.rate - 1) * delta_time + self.gain * self.error
+            max_correction = self.max_slew * delta_time
+            scheduler.adjust(min(max(correction, -max_correction), max_correction))
+        self._last_update = local_time
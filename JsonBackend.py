@@ -0,0 +1,99 @@
+"""
+JSON backends of the timelines: the fastest JSON library installed (orjson, then ujson) is used
+to save the timelines and to check them, and the stdlib json module otherwise.
+A backend can also be chosen by name, e.g. to compare them (see benchmark_json.py).
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+DEFAULT_CHUNK_SIZE = 1024  # events
+
+
+class JsonBackend:
+    """
+    A JSON library, seen through two functions working on UTF-8 bytes.
+
+    Args:
+        name (str): Name of the library.
+        dumps (Callable[[object], bytes]): Encodes a Python object into JSON.
+        loads (Callable[[bytes | str], object]): Decodes a JSON document.
+    """
+
+    def __init__(self, name: str, dumps, loads) -> None:
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+
+# Installed backends by name, from the fastest
+BACKENDS: dict[str, JsonBackend] = {}
+if orjson is not None:
+    BACKENDS["orjson"] = JsonBackend("orjson", orjson.dumps, orjson.loads)
+if ujson is not None:
+    BACKENDS["ujson"] = JsonBackend(
+        "ujson", lambda obj: ujson.dumps(obj, ensure_ascii=False).encode("utf-8"), ujson.loads
+    )
+BACKENDS["json"] = JsonBackend(
+    "json", lambda obj: json.dumps(obj, ensure_ascii=False).encode("utf-8"), json.loads
+)
+
+
+def get_backend(name: str = None) -> JsonBackend:
+    """
+    Returns the backend called name, or the fastest backend installed if name is None.
+    Raises a ValueError if the library name is not installed.
+    """
+    if name is None:
+        return next(iter(BACKENDS.values()))
+    if name not in BACKENDS:
+        raise ValueError(f"The JSON backend {name} is not installed ({', '.join(BACKENDS)} are).")
+    return BACKENDS[name]
+
+
+def dump_timeline(
+    file,
+    header: dict,
+    list_key: str,
+    items,
+    backend: JsonBackend = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+):
+    """
+    Writes a JSON object made of header and a list_key list of items, to a file opened in binary mode.
+    The items are consumed from any iterable and encoded chunk_size at a time,
+    so that the whole list is never held in memory.
+
+    Args:
+        file: The file opened in binary mode.
+        header (dict): The other keys of the object.
+        list_key (str): The key of the list.
+        items (Iterable): The items of the list, e.g. a generator of event dicts.
+        backend (JsonBackend, optional): The backend. If None, the fastest backend installed.
+        chunk_size (int): Number of items encoded at once.
+    """
+    backend = backend or get_backend()
+    # Header without its closing brace, followed by the opening of the list
+    encoded_header = backend.dumps(header)
+    file.write(encoded_header[:-1] + b", " if header else b"{")
+    file.write(backend.dumps(list_key) + b": [")
+
+    chunk = []
+    first_chunk = True
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            file.write((b"" if first_chunk else b", ") + backend.dumps(chunk)[1:-1])
+            first_chunk = False
+            chunk = []
+    if chunk:
+        file.write((b"" if first_chunk else b", ") + backend.dumps(chunk)[1:-1])
+    file.write(b"]}")
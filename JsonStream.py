@@ -0,0 +1,135 @@
+import json
+
+DEFAULT_CHUNK_SIZE = 1 << 16  # characters
+WHITESPACE = " \t\n\r"
+# Characters that may follow a complete number, true, false or null
+SCALAR_ENDS = ",]}:" + WHITESPACE
+
+
+class JsonStreamReader:
+    """
+    The JsonStreamReader class reads a JSON object incrementally from a file, in chunks of chunk_size characters.
+    The elements of one of its list values (the stream key) are decoded and yielded one at a time,
+    so that only the current element and the current chunk are held in memory, instead of the whole document.
+    The other values of the object are decoded as a whole and kept in header, whatever their position in the file.
+
+    Examples of use:
+        with open("show.json", "r") as json_file:
+            reader = JsonStreamReader(json_file, "timeline")
+            for event_dict in reader.iter_items():
+                ...
+            reader.header  # {"name": ..., "ip": ..., "listening_port": ...}
+            reader.streamed  # True if the file had a "timeline" list
+    """
+
+    def __init__(self, file, stream_key: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        """
+        Initialize the JsonStreamReader object.
+
+        Args:
+            file: The file opened in text mode.
+            stream_key (str): The key of the list whose elements are streamed.
+            chunk_size (int): Number of characters read at once.
+        """
+        self.file = file
+        self.stream_key = stream_key
+        self.chunk_size = chunk_size
+        self.header = {}
+        self.streamed = False
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Reads the next chunk, dropping the characters already decoded. Returns False at the end of the file"""
+        if self._eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._position :] + chunk
+        self._position = 0
+        return True
+
+    def _error(self, message: str):
+        return json.JSONDecodeError(message, self._buffer, self._position)
+
+    def _peek(self) -> str:
+        """Returns the next character which is not a whitespace, without consuming it"""
+        while True:
+            buffer = self._buffer
+            position = self._position
+            while position < len(buffer) and buffer[position] in WHITESPACE:
+                position += 1
+            self._position = position
+            if position < len(buffer):
+                return buffer[position]
+            if not self._fill():
+                raise self._error("Unexpected end of the JSON file")
+
+    def _expect(self, characters: str) -> str:
+        """Consumes the next character which is not a whitespace, which must be one of characters"""
+        character = self._peek()
+        if character not in characters:
+            raise self._error(f"Expecting one of {characters!r}")
+        self._position += 1
+        return character
+
+    def _decode_value(self):
+        """Decodes the next JSON value, reading more chunks until it is complete"""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                # The value may be cut by the end of the chunk
+                if self._fill():
+                    continue
+                raise
+            if (
+                not isinstance(value, (str, list, dict))
+                and (end == len(self._buffer) or self._buffer[end] not in SCALAR_ENDS)
+                and self._fill()
+            ):
+                # A number may be cut by the end of the chunk, e.g. "12." of "12.5" decoded as 12:
+                # a complete number is followed by a delimiter or a whitespace
+                continue
+            self._position = end
+            return value
+
+    def iter_items(self):
+        """Yields the elements of the stream list, filling header with the other values of the object"""
+        self._expect("{")
+        if self._peek() == "}":
+            self._position += 1
+            return
+        while True:
+            key = self._decode_value()
+            if not isinstance(key, str):
+                raise self._error("Expecting a property name")
+            self._expect(":")
+            if key == self.stream_key and self._peek() == "[":
+                self._position += 1
+                self.streamed = True
+                if self._peek() == "]":
+                    self._position += 1
+                else:
+                    while True:
+                        yield self._decode_value()
+                        if self._expect(",]") == "]":
+                            break
+            else:
+                self.header[key] = self._decode_value()
+            if self._expect(",}") == "}":
+                break
+        if self._peek_end() is not None:
+            raise self._error("Extra data")
+
+    def _peek_end(self) -> str | None:
+        """Returns the next character which is not a whitespace, or None at the end of the file"""
+        try:
+            return self._peek()
+        except json.JSONDecodeError:
+            return None
@@ -1,10 +1,12 @@
+import json
 import os
 from PyQt6.QtWidgets import QMainWindow, QFileDialog, QMessageBox
 from PyQt6.QtGui import QIcon
 from PyQt6.QtCore import QObject, pyqtSlot, QTimer
 
 # Model Classes
-from Timeline import Timeline, State
+from Timeline import Timeline
+from TimelineCore import State
 from Event import Event
 from Control import Control
 from Model import ControlMode
@@ -152,6 +154,10 @@ class MainWindow(QMainWindow, Ui_MainWindow, QObject):
                 print("Selected file:", file_path)
                 self.reset_timeline()
                 self.timeline.from_json(file_path)
+                # Edits are journaled next to the file, and those left by a crash are recovered
+                recovered = self.timeline.open_journal(file_path)
+                if recovered:
+                    self.status_bar.showMessage(f"{recovered} unsaved edits recovered")
 
                 # Set OSC server attributes
                 self.ip_edit.setText(self.timeline.ip)
@@ -190,7 +196,9 @@ class MainWindow(QMainWindow, Ui_MainWindow, QObject):
         if file_path:
             try:
                 print("Timeline saved to:", file_path)
-                self.timeline.to_json(file_path)
+                self.timeline.save(file_path)
+                if self.timeline.journal is None:
+                    self.timeline.open_journal(file_path, recover=False)
                 self.status_bar.showMessage("Timeline successfully saved")
             except Exception as e:
                 error_window = QMessageBox(
@@ -301,20 +309,27 @@ class MainWindow(QMainWindow, Ui_MainWindow, QObject):
         self.control_mode_box.blockSignals(False)
 
         is_unique_mode = event.control.mode == ControlMode.UNIQUE
-
-        self.value_label.setHidden(not is_unique_mode)
-        self.value_edit.setHidden(not is_unique_mode)
-        self.value1_label.setHidden(is_unique_mode)
-        self.value1_edit.setHidden(is_unique_mode)
-        self.value2_label.setHidden(is_unique_mode)
-        self.value2_edit.setHidden(is_unique_mode)
-        self.duration_label.setHidden(is_unique_mode)
-        self.duration_edit.setHidden(is_unique_mode)
+        # The keyframes of an envelope are edited as JSON text in the value edit
+        is_envelope_mode = event.control.mode == ControlMode.ENVELOPE
+        is_text_value = is_unique_mode or is_envelope_mode
+
+        self.value_label.setHidden(not is_text_value)
+        self.value_edit.setHidden(not is_text_value)
+        self.value1_label.setHidden(is_text_value)
+        self.value1_edit.setHidden(is_text_value)
+        self.value2_label.setHidden(is_text_value)
+        self.value2_edit.setHidden(is_text_value)
+        self.duration_label.setHidden(is_text_value)
+        self.duration_edit.setHidden(is_text_value)
 
         if is_unique_mode:
             self.value_edit.blockSignals(True)
             self.value_edit.setText(str(event.control.value))
             self.value_edit.blockSignals(False)
+        elif is_envelope_mode:
+            self.value_edit.blockSignals(True)
+            self.value_edit.setText(json.dumps(event.control.value))
+            self.value_edit.blockSignals(False)
         else:
             self.value1_edit.blockSignals(True)
             self.value2_edit.blockSignals(True)
@@ -345,7 +360,14 @@ class MainWindow(QMainWindow, Ui_MainWindow, QObject):
         """
         print(f"Value edit changed: {new_value}")
         event = self.timeline.timeline[self.scroll_area.selected_id]
-        event.control.value = new_value
+        if event.control.mode == ControlMode.ENVELOPE:
+            # Keep the previous keyframes until the text is a valid envelope
+            try:
+                event.control.value = json.loads(new_value)
+            except ValueError:
+                pass
+        else:
+            event.control.value = new_value
 
     @pyqtSlot(float)
     def value1_edit_changed(self, new_value: float):
@@ -381,20 +403,26 @@ class MainWindow(QMainWindow, Ui_MainWindow, QObject):
     @pyqtSlot()
     def update_server(self):
         """
-        Slot called when the value of ip_edit or port_edit changes, in option tab
+        Slot called when the edit of ip_edit or port_edit is finished, in option tab.
+        The client is only changed for a valid destination different from the current one.
         Widget: self.ip_edit | self.port_edit
         """
+        ip = port = None
         if self.sender() == self.ip_edit:
-            if self.ip_edit.check_value():
-                new_value = self.ip_edit.text()
-                self.timeline.ip = new_value
-                print(f"updated ip to {new_value}")
+            ip = self.ip_edit.text()
+            if not self.ip_edit.check_value() or ip == self.timeline.ip:
+                return
+            print(f"updated ip to {ip}")
         elif self.sender() == self.port_edit:
-            new_value = self.port_edit.value()
-            print(f"updated port to {new_value}")
-            self.timeline.port = new_value
-
-        self.timeline.init_client()
+            port = self.port_edit.value()
+            if port == self.timeline.port:
+                return
+            print(f"updated port to {port}")
+
+        try:
+            self.timeline.init_client(ip=ip, port=port)
+        except OSError as error:
+            print(f"OSC client not created: {error}")
 
     @pyqtSlot()
     def handle_timeline_state_changed(self):
@@ -1,7 +1,8 @@
 """
 Each Enum specify the key name in the json file of the global key (JsonModel)
-or for the event (EventModel) or the control (ControlModel and ControlModelUnique
-or COntrolModelAnimated depending of the case)
+or for the event (EventModel) or the control (ControlModel and ControlModelUnique,
+COntrolModelAnimated or ControlModelEnvelope depending of the case)
+A key with "required": False may be missing from the json
 """
 from enum import Enum
 
@@ -17,11 +18,29 @@ class EventModel(Enum):
     TIME = {"name": "time", "type": (int, float)}
     COMMAND = {"name": "command", "type": str}
     CONTROL = {"name": "control", "type": dict}
+    DESTINATION = {"name": "destination", "type": dict, "required": False}
+
+
+class DestinationModel(Enum):
+    IP = {"name": "ip", "type": str}
+    PORT = {"name": "port", "type": int}
 
 
 class ControlMode(Enum):
     UNIQUE = "unique"
     ANIMATED = "animated"
+    ENVELOPE = "envelope"
+
+
+class Easing(Enum):
+    """Named easing curves of the animated controls. A list [x1, y1, x2, y2] is a cubic Bezier curve"""
+
+    LINEAR = "linear"
+    EASE_IN = "ease_in"
+    EASE_OUT = "ease_out"
+    EASE_IN_OUT = "ease_in_out"
+    EXPONENTIAL = "exponential"
+    STEP = "step"
 
 
 class ControlModel(Enum):
@@ -35,3 +54,12 @@ class ControlModelUnique(Enum):
 class ControlModelAnimated(Enum):
     VALUE = {"name": "value", "type": (list)}
     DURATION = {"name": "duration", "type": (int, float)}
+    EASING = {"name": "easing", "type": (str, list), "required": False}
+    FRAME_RATE = {"name": "frame_rate", "type": (int, float), "required": False}
+
+
+class ControlModelEnvelope(Enum):
+    """The value of an envelope is a list of [time, value] keyframes, times in seconds since the event"""
+
+    VALUE = {"name": "value", "type": (list)}
+    FRAME_RATE = {"name": "frame_rate", "type": (int, float), "required": False}
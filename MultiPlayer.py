@@ -0,0 +1,284 @@
+import bisect
+import itertools
+import math
+import threading
+
+from AnimationEngine import AnimationEngine
+from OscOutput import OscBatch
+from Scheduler import Scheduler
+from TimelineCore import TimelineCore, State
+
+
+class MultiPlayer:
+    """
+    The MultiPlayer class plays several timelines together, e.g. the video, light and audio cues of a show,
+    on one shared scheduler and clock, with a single thread and a single animation engine.
+
+    The event streams of the timelines are merged lazily, as a k-way merge: the scheduler holds only the
+    next group of co-timed events of each timeline, keyed by the index of the timeline, and the following
+    group is scheduled when it is delivered. Each timeline can be paused, resumed and stopped on its own:
+    a paused timeline keeps its next events on hold and is shifted by the paused time on resume.
+
+    Examples of use:
+    - Playing several timelines until the end of the last one:
+        player = MultiPlayer.from_json(["video.json", "lights.json", "audio.json"])
+        player.run()
+        player.wait()
+
+    - Pausing, resuming and stopping the second timeline only, or every timeline:
+        player.pause(1)
+        player.resume(1)
+        player.stop(1)
+        player.stop()
+    """
+
+    def __init__(self, timelines: list[TimelineCore]) -> None:
+        """
+        Initialize the MultiPlayer object.
+
+        Args:
+            timelines (list[TimelineCore]): The timelines played together.
+        """
+        self.timelines = timelines
+        self.scheduler = Scheduler()
+        self.animation_engine = AnimationEngine()
+        # Own engines of the timelines, replaced by the engine of the player during a run
+        self._timeline_engines = [timeline.animation_engine for timeline in timelines]
+        self._thread = None
+        self._streams = {}
+        # Next group of co-timed events of each timeline: (deadline of the timeline, events)
+        self._pending: dict[int, tuple[float, list]] = {}
+        # Paused time of each timeline, and the elapsed time at which each paused timeline was paused
+        self._offsets: dict[int, float] = {}
+        self._pause_times: dict[int, float] = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_json(clc, json_paths: list[str]):
+        """Creates a player of the timelines saved in json_paths"""
+        return MultiPlayer([TimelineCore(json_path) for json_path in json_paths])
+
+    @staticmethod
+    def event_groups(timeline: TimelineCore, start_at: float | int):
+        """
+        Yields the events of a timeline from start_at, as (deadline, events) groups sorted by deadline
+
+        Args:
+            timeline (TimelineCore): The timeline.
+            start_at (float | int): The time from which the timeline starts, in seconds.
+        """
+        times, sorted_events = timeline.get_sorted_events()
+        first_index = bisect.bisect_left(times, start_at)
+        # The look-ahead moves the deadlines of some events earlier than their time
+        scheduled_events = sorted(
+            (
+                (max(timeline.get_deadline(event), start_at), event)
+                for _, event in sorted_events[first_index:]
+            ),
+            key=lambda item: item[0],
+        )
+        for deadline, group in itertools.groupby(scheduled_events, key=lambda item: item[0]):
+            yield deadline, [event for _, event in group]
+
+    def _schedule_next(self, index: int):
+        """Schedules the next group of events of a timeline, or ends its stream"""
+        with self._lock:
+            next_group = next(self._streams[index], None)
+            if next_group is None:
+                self._pending.pop(index, None)
+                return
+
+            self._pending[index] = next_group
+            if index in self._pause_times:
+                deadline = math.inf
+            else:
+                deadline = next_group[0] + self._offsets[index]
+            self.scheduler.schedule(deadline, index, key=index)
+
+    def run(self, start_at: float | int = 0):
+        """
+        Runs every timeline from start_at, in one thread.
+
+        Args:
+            start_at (float | int): The time from which the timelines start, in seconds.
+                                    The state of the animated controls at this time is chased.
+        """
+        start_at = max(start_at, 0)
+        self.scheduler.clear()
+        # The clock is started before the events are scheduled, like in TimelineCore.run_timeline.
+        # It stays frozen at start_at until the thread runs.
+        self.scheduler.start(offset=start_at, paused=True)
+        self._pending = {}
+        self._pause_times = {}
+        self._offsets = {index: 0 for index in range(len(self.timelines))}
+        self._streams = {
+            index: MultiPlayer.event_groups(timeline, start_at)
+            for index, timeline in enumerate(self.timelines)
+        }
+        for index in self._streams:
+            self._schedule_next(index)
+        # The fades of every timeline are played by the engine of the player
+        for timeline in self.timelines:
+            timeline.animation_engine = self.animation_engine
+
+        def thread_func():
+            try:
+                play_timelines()
+            finally:
+                # The timelines can be played on their own again
+                for timeline, animation_engine in zip(self.timelines, self._timeline_engines):
+                    timeline.animation_engine = animation_engine
+
+        def play_timelines():
+            self.scheduler.resume()
+            for index, timeline in enumerate(self.timelines):
+                timeline.log_message.emit("Timeline started")
+                timeline.state = State.RUNNING
+                times, sorted_events = timeline.get_sorted_events()
+                first_index = bisect.bisect_left(times, start_at)
+                if first_index:
+                    timeline.chase_state(
+                        [event for _, event in sorted_events[:first_index]],
+                        start_at,
+                        group=index,
+                    )
+
+            for indexes in iter(self.scheduler.next_batch, None):
+                # Co-timed events of every timeline, sent as one OSC bundle per destination
+                batch = OscBatch()
+                with self._lock:
+                    for index in indexes:
+                        if index not in self._pending:
+                            # Stopped since the delivery
+                            continue
+                        if index in self._pause_times:
+                            # Paused since the delivery
+                            self.scheduler.schedule(math.inf, index, key=index)
+                            continue
+                        try:
+                            self._trigger_events(index, batch)
+                        except Exception as error:
+                            self.timelines[index].log_message.emit(
+                                f"Error while sending events: {error}"
+                            )
+                        self._schedule_next(index)
+                try:
+                    batch.flush()
+                except Exception as error:
+                    # A failed send must not stop the timelines: the next events are still played
+                    for timeline in self.timelines:
+                        timeline.log_message.emit(f"Error while sending events: {error}")
+
+            # The last fades are still running in the animation engine
+            self.animation_engine.join()
+
+            for timeline in self.timelines:
+                timeline.log_message.emit(self.scheduler.stats.to_string())
+                timeline.state = State.NOT_RUNNING
+
+        self._thread = threading.Thread(target=thread_func)
+        self._thread.start()
+
+    def _trigger_events(self, index: int, batch: OscBatch):
+        """Triggers the pending events of a timeline, the unique controls being added to batch"""
+        timeline = self.timelines[index]
+        _, events = self._pending[index]
+        for event in events:
+            if event.control.is_animated:
+                self.animation_engine.add(event, group=index)
+                continue
+
+            lookahead = timeline.get_lookahead(event)
+            timetag = None
+            remaining_time = 0
+            if lookahead is not None:
+                remaining_time = event.time + self._offsets[index] - self.scheduler.elapsed()
+                timetag = lookahead.timetag(remaining_time)
+            event.trigger(
+                animation_engine=self.animation_engine,
+                batch=batch,
+                timetag=timetag,
+                delay=remaining_time,
+            )
+        timeline.elapsed_time = self.scheduler.elapsed() - self._offsets[index]
+
+    def wait(self):
+        """Blocks until the end of the current run"""
+        if self._thread is not None:
+            self._thread.join()
+
+    def pause(self, index: int = None):
+        """
+        Pauses a timeline, or every timeline.
+
+        Args:
+            index (int, optional): Index of the timeline in timelines. If None, the shared clock is paused.
+        """
+        if index is None:
+            self.scheduler.pause()
+            self.animation_engine.pause()
+            for timeline in self.timelines:
+                timeline.state = State.PAUSED
+            return
+
+        with self._lock:
+            if index in self._pause_times:
+                return
+            self._pause_times[index] = self.scheduler.elapsed()
+            if index in self._pending:
+                # Held in the scheduler, so that the run does not end while the timeline is paused
+                self.scheduler.schedule(math.inf, index, key=index)
+            self.animation_engine.pause(group=index)
+        self.timelines[index].log_message.emit("Timeline paused")
+        self.timelines[index].state = State.PAUSED
+
+    def resume(self, index: int = None):
+        """
+        Resumes a timeline, or every timeline.
+
+        Args:
+            index (int, optional): Index of the timeline in timelines. If None, the shared clock is resumed.
+        """
+        if index is None:
+            self.scheduler.resume()
+            self.animation_engine.resume()
+            for index, timeline in enumerate(self.timelines):
+                if index not in self._pause_times:
+                    timeline.state = State.RUNNING
+            return
+
+        with self._lock:
+            pause_time = self._pause_times.pop(index, None)
+            if pause_time is None:
+                return
+            self._offsets[index] += self.scheduler.elapsed() - pause_time
+            if index in self._pending:
+                deadline = self._pending[index][0] + self._offsets[index]
+                self.scheduler.schedule(deadline, index, key=index)
+            self.animation_engine.resume(group=index)
+        self.timelines[index].log_message.emit("Timeline resumed")
+        self.timelines[index].state = State.RUNNING
+
+    def stop(self, index: int = None):
+        """
+        Stops a timeline, or every timeline.
+
+        Args:
+            index (int, optional): Index of the timeline in timelines. If None, the whole run is stopped.
+        """
+        if index is None:
+            self.scheduler.stop()
+            self.animation_engine.stop()
+            for timeline in self.timelines:
+                timeline.log_message.emit("Timeline stopped")
+                timeline.state = State.NOT_RUNNING
+            return
+
+        with self._lock:
+            self._streams[index] = iter(())
+            self._pending.pop(index, None)
+            self._pause_times.pop(index, None)
+            self.scheduler.cancel(index)
+            self.animation_engine.stop(group=index)
+        self.timelines[index].log_message.emit("Timeline stopped")
+        self.timelines[index].state = State.NOT_RUNNING
@@ -0,0 +1,430 @@
+import logging
+import socket
+import struct
+import threading
+import time
+import weakref
+
+from pythonosc.parsing.osc_types import write_date
+from pythonosc.udp_client import SimpleUDPClient
+
+BUNDLE_PREFIX = b"#bundle\x00"
+IMMEDIATELY_TIMETAG = struct.pack(">Q", 1)
+DEFAULT_BURST_WINDOW = 0.1  # s
+# Largest bundle sent at once: bigger datagrams are fragmented by IP, or refused by the OS
+MAX_DATAGRAM_SIZE = 8192  # bytes
+BUNDLE_HEADER_SIZE = len(BUNDLE_PREFIX) + len(IMMEDIATELY_TIMETAG)
+
+logger = logging.getLogger(__name__)
+
+
+def encode_string(string: str) -> bytes:
+    """Encodes an OSC string: UTF-8 bytes padded with at least one null byte to a multiple of 4 bytes"""
+    encoded = string.encode("utf-8")
+    return encoded + b"\x00" * (4 - len(encoded) % 4)
+
+
+# Range of the ints encoded as OSC int32 ("i"), the larger ones being left to python-osc (int64 "h")
+INT32_MIN, INT32_MAX = -(2**31), 2**31 - 1
+# Type tag and argument encoder of the values sent by the controls, by Python type
+ARGUMENT_ENCODERS = {
+    float: (encode_string(",f"), struct.Struct(">f").pack),
+    int: (encode_string(",i"), struct.Struct(">i").pack),
+    str: (encode_string(",s"), encode_string),
+}
+
+
+def encode_bundle(dgrams: list[bytes], timetag: float = None) -> bytes:
+    """
+    Encodes an OSC bundle containing encoded messages.
+
+    Args:
+        dgrams (list[bytes]): The encoded messages.
+        timetag (float, optional): Execution time of the bundle, as a system time in seconds since the epoch.
+                                   If None, the bundle is executed immediately.
+    """
+    encoded_timetag = IMMEDIATELY_TIMETAG if timetag is None else write_date(timetag)
+    return b"".join(
+        [BUNDLE_PREFIX, encoded_timetag]
+        + [struct.pack(">i", len(dgram)) + dgram for dgram in dgrams]
+    )
+
+
+def encode_bundles(
+    dgrams: list[bytes], timetag: float = None, max_size: int = MAX_DATAGRAM_SIZE
+) -> list[bytes]:
+    """
+    Encodes messages into as few OSC bundles as possible, each of them at most max_size bytes long.
+    A message too long for a bundle of max_size bytes is bundled alone.
+
+    Args:
+        dgrams (list[bytes]): The encoded messages.
+        timetag (float, optional): Execution time of the bundles, as a system time in seconds since the epoch.
+        max_size (int): Maximum size of a bundle, in bytes.
+    """
+    bundles = []
+    bundle_dgrams = []
+    size = BUNDLE_HEADER_SIZE
+    for dgram in dgrams:
+        dgram_size = 4 + len(dgram)
+        if bundle_dgrams and size + dgram_size > max_size:
+            bundles.append(encode_bundle(bundle_dgrams, timetag))
+            bundle_dgrams = []
+            size = BUNDLE_HEADER_SIZE
+        bundle_dgrams.append(dgram)
+        size += dgram_size
+    if bundle_dgrams:
+        bundles.append(encode_bundle(bundle_dgrams, timetag))
+    return bundles
+
+
+def send_dgrams(client, dgrams: list[bytes], timetag: float = None):
+    """
+    Sends encoded messages to a destination: a single message without timetag is sent as is,
+    anything else in bundles of at most MAX_DATAGRAM_SIZE bytes.
+    """
+    if len(dgrams) == 1 and timetag is None:
+        client.send_dgram(dgrams[0])
+    else:
+        for bundle in encode_bundles(dgrams, timetag):
+            client.send_dgram(bundle)
+
+
+def message_address(dgram: bytes) -> bytes:
+    """Returns the encoded OSC address of an encoded message"""
+    return dgram[: dgram.index(b"\x00")]
+
+
+class TokenBucket:
+    """
+    Budget of messages refilled at rate tokens per second, up to burst tokens.
+    The balance may go negative when messages that cannot be delayed are sent anyway.
+    """
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._refill_time = time.perf_counter()
+
+    def refill(self):
+        now = time.perf_counter()
+        self.tokens = min(self.tokens + (now - self._refill_time) * self.rate, self.burst)
+        self._refill_time = now
+
+    def wait_time(self) -> float:
+        """Returns the time until the next token is available, in seconds"""
+        return max(1 - self.tokens, 0) / self.rate
+
+
+class RateLimiter:
+    """
+    The RateLimiter class limits the number of messages per second sent to a destination with a token bucket.
+    The unique controls are never dropped nor delayed: they are sent immediately and consume the budget.
+    The animation frames over budget are coalesced by address: only the latest pending value of each
+    address is kept, and sent as soon as the budget allows it.
+
+    Examples of use:
+        client.set_rate_limit(200)           # 200 messages per second at most
+        limiter = client.limiter
+        limiter.send([dgram], coalesce=True)  # animation frame
+        limiter.send([dgram])                 # unique control
+    """
+
+    def __init__(self, client, rate: float, burst: float = None) -> None:
+        """
+        Initialize the RateLimiter object.
+
+        Args:
+            client (OscClient): The client of the destination.
+            rate (float): Number of messages per second.
+            burst (float, optional): Number of messages that can be sent at once after an idle period.
+                                     DEFAULT_BURST_WINDOW seconds of budget by default.
+        """
+        if not isinstance(rate, (float, int)) or rate <= 0:
+            raise ValueError("The rate limit must be a positive numeric value.")
+        if burst is None:
+            burst = max(rate * DEFAULT_BURST_WINDOW, 1)
+        self.client = client
+        self.bucket = TokenBucket(rate, burst)
+        # Latest frame over budget of each address
+        self._pending: dict[bytes, bytes] = {}
+        self._lock = threading.Lock()
+        self._timer = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def send(self, dgrams: list[bytes], timetag: float = None, coalesce: bool = False):
+        """
+        Sends encoded messages within the budget of the destination.
+
+        Args:
+            dgrams (list[bytes]): The encoded messages.
+            timetag (float, optional): Execution time of the messages, as a system time in seconds since the epoch.
+            coalesce (bool): True for animation frames, which may be delayed and replaced by a newer value.
+                             Other messages are always sent immediately.
+        """
+        with self._lock:
+            self.bucket.refill()
+            if coalesce:
+                for dgram in dgrams:
+                    self._pending[message_address(dgram)] = dgram
+                self._send_pending()
+            else:
+                # A pending frame must not overwrite a control sent after it
+                for dgram in dgrams:
+                    self._pending.pop(message_address(dgram), None)
+                self.bucket.tokens -= len(dgrams)
+                send_dgrams(self.client, dgrams, timetag)
+
+    def _send_pending(self):
+        """Sends as many pending frames as the budget allows, called with the lock held"""
+        count = min(int(self.bucket.tokens), len(self._pending))
+        if count > 0:
+            addresses = list(self._pending)[:count]
+            dgrams = [self._pending.pop(address) for address in addresses]
+            self.bucket.tokens -= count
+            send_dgrams(self.client, dgrams)
+
+        if self._pending and self._timer is None:
+            self._timer = threading.Timer(self.bucket.wait_time(), self._drain)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _drain(self):
+        """Called by the timer when the budget allows to send the pending frames"""
+        with self._lock:
+            self._timer = None
+            self.bucket.refill()
+            self._send_pending()
+
+
+class OscClient(SimpleUDPClient):
+    """
+    The OscClient class is a SimpleUDPClient that can also send already encoded OSC datagrams,
+    e.g. the messages pre-encoded by Event.encode.
+    Its UDP socket is connected to the destination, so the address is not resolved on each send.
+    A broadcast destination enables SO_BROADCAST. If the socket cannot be connected,
+    e.g. while the network is down, each datagram is sent with sendto like SimpleUDPClient does.
+    The messages sent through OscBatch can be limited with set_rate_limit (see RateLimiter).
+    """
+
+    def __init__(self, address: str, port: int, allow_broadcast: bool = False) -> None:
+        super().__init__(address, port, allow_broadcast)
+        self.limiter: RateLimiter | None = None
+        self._connected = False
+        try:
+            try:
+                self._sock.connect((self._address, self._port))
+            except PermissionError:
+                # A broadcast address
+                self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+                self._sock.connect((self._address, self._port))
+            self._connected = True
+        except OSError as error:
+            logger.warning(
+                "OSC client of %s:%s not connected, sending with sendto: %s", address, port, error
+            )
+
+    def set_rate_limit(self, rate: float | None, burst: float = None):
+        """
+        Limits the number of messages per second sent to the destination.
+
+        Args:
+            rate (float | None): Number of messages per second. None removes the limit.
+            burst (float, optional): Number of messages that can be sent at once after an idle period.
+        """
+        self.limiter = None if rate is None else RateLimiter(self, rate, burst)
+
+    def close(self):
+        """Closes the socket of the client"""
+        self._sock.close()
+
+    def send(self, content):
+        """Sends an OscMessage or an OscBundle built by python-osc"""
+        self.send_dgram(content.dgram)
+
+    def send_dgram(self, dgram: bytes):
+        """
+        Sends an encoded OSC message or bundle.
+
+        Args:
+            dgram (bytes): The encoded datagram.
+        """
+        try:
+            if self._connected:
+                self._sock.send(dgram)
+            else:
+                self._sock.sendto(dgram, (self._address, self._port))
+        except ConnectionRefusedError:
+            # The destination reported that nothing listens yet: UDP messages are not acknowledged anyway
+            pass
+        except OSError as error:
+            # e.g. a datagram too long or an unreachable network: the message is lost, not the playback
+            logger.warning("OSC message to %s:%s not sent: %s", self._address, self._port, error)
+
+
+class ClientPool:
+    """
+    The ClientPool class shares one OscClient, i.e. one connected socket, per destination (ip, port).
+    The events with the same destination use the same client, whatever their timeline.
+    The owners of the clients (e.g. the timelines) declare the destinations they use with retain():
+    the clients that no owner uses any more are closed and removed.
+    The rate limits are kept by destination: a client created again gets the limit of its destination.
+
+    Examples of use:
+        client = SHARED_CLIENT_POOL.get("127.0.0.1", 7000)
+        client is SHARED_CLIENT_POOL.get("127.0.0.1", 7000)  # True
+        SHARED_CLIENT_POOL.retain(timeline, {("127.0.0.1", 7000)})
+        SHARED_CLIENT_POOL.set_rate_limit("127.0.0.1", 7000, rate=200)
+    """
+
+    def __init__(self) -> None:
+        self._clients: dict[tuple[str, int], OscClient] = {}
+        self._lock = threading.Lock()
+        # Destinations used by each owner, forgotten with the owner
+        self._owners: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        # Destinations retained by an owner at least once: only those are closed once unused
+        self._retained: set[tuple[str, int]] = set()
+        # (rate, burst) of the destinations limited by set_rate_limit
+        self._rate_limits: dict[tuple[str, int], tuple[float, float | None]] = {}
+
+    def __len__(self):
+        return len(self._clients)
+
+    def __contains__(self, destination: tuple[str, int]):
+        return destination in self._clients
+
+    def get(self, ip: str, port: int) -> OscClient:
+        """Returns the client of the destination, created on first use"""
+        client = self._clients.get((ip, port))
+        if client is None:
+            with self._lock:
+                client = self._clients.get((ip, port))
+                if client is None:
+                    client = self._clients[(ip, port)] = OscClient(ip, port)
+                    rate_limit = self._rate_limits.get((ip, port))
+                    if rate_limit is not None:
+                        client.set_rate_limit(*rate_limit)
+        return client
+
+    def set_rate_limit(self, ip: str, port: int, rate: float | None, burst: float = None):
+        """
+        Limits the number of messages per second sent to a destination, see OscClient.set_rate_limit.
+        The limit is kept for the clients created later for the destination.
+        """
+        with self._lock:
+            if rate is None:
+                self._rate_limits.pop((ip, port), None)
+            else:
+                self._rate_limits[(ip, port)] = (rate, burst)
+        self.get(ip, port).set_rate_limit(rate, burst)
+
+    def retain(self, owner, destinations: set[tuple[str, int]]):
+        """
+        Sets the destinations used by owner, then closes and removes the clients
+        that were retained before but that no owner uses any more.
+        The clients never retained, e.g. created by get() for a setting, are kept.
+
+        Args:
+            owner: Any object holding clients of the pool, e.g. a timeline.
+            destinations (set[tuple[str, int]]): The destinations (ip, port) used by owner.
+        """
+        with self._lock:
+            self._owners[owner] = set(destinations)
+            used = set().union(*self._owners.values())
+            for destination in self._retained - used:
+                client = self._clients.pop(destination, None)
+                if client is not None:
+                    client.close()
+            self._retained = used
+
+
+# Pool used by every timeline of the process
+SHARED_CLIENT_POOL = ClientPool()
+
+
+class Lookahead:
+    """
+    Look-ahead dispatch settings of a destination whose receiver honours the timetags of OSC bundles.
+    The events are sent window seconds early, in bundles timetagged with their execution time,
+    so that the timing precision is given by the receiver instead of the timeline thread.
+
+    Args:
+        window (float): How early the events are sent, in seconds.
+        ntp_offset (float): Correction added to the local system time to obtain the NTP time of the receiver
+                            (e.g. the clock offset between both machines), in seconds.
+    """
+
+    def __init__(self, window: float, ntp_offset: float = 0) -> None:
+        if not isinstance(window, (float, int)) or window < 0:
+            raise ValueError("The look-ahead window must be a positive numeric value.")
+        self.window = window
+        self.ntp_offset = ntp_offset
+
+    def timetag(self, remaining_time: float) -> float:
+        """
+        Returns the timetag of a message executed in remaining_time seconds,
+        as a system time in seconds since the epoch (converted to NTP when the bundle is built)
+        """
+        return time.time() + remaining_time + self.ntp_offset
+
+
+class OscBatch:
+    """
+    The OscBatch class collects the OSC messages sent at the same moment (co-timed events,
+    frames of the same animation tick) and sends them as a single OSC bundle per destination.
+    It cuts the number of datagrams, and the receiver applies all the messages of a bundle at once.
+    The messages are added already encoded (see Event.encode).
+
+    Examples of use:
+        batch = OscBatch()
+        batch.add(client, event1.encode(0.5))
+        batch.add(client, event2.encode(1))
+        batch.flush()
+
+    - Adding a message executed by the receiver at a given time (system time in seconds since the epoch):
+        batch.add(client, event.encode(1), timetag=time.time() + 0.5)
+
+    - Adding an animation frame, which a rate limited destination may coalesce with the next frames:
+        batch.add(client, event.encode(0.3), coalesce=True)
+    """
+
+    def __init__(self) -> None:
+        # Encoded messages grouped by destination, timetag and coalescing
+        self._messages: dict[tuple[OscClient, float | None, bool], list[bytes]] = {}
+
+    def __len__(self):
+        return sum(len(messages) for messages in self._messages.values())
+
+    def add(
+        self, client: OscClient, dgram: bytes, timetag: float = None, coalesce: bool = False
+    ):
+        """
+        Adds a message to the batch.
+
+        Args:
+            client (OscClient): The client of the destination.
+            dgram (bytes): The encoded message.
+            timetag (float, optional): Execution time of the message, as a system time in seconds since the epoch.
+                                       If None, the message is executed immediately.
+            coalesce (bool): True for an animation frame, which a rate limited destination may delay
+                             and replace by a newer frame sent to the same address.
+        """
+        self._messages.setdefault((client, timetag, coalesce), []).append(dgram)
+
+    def flush(self):
+        """
+        Sends the collected messages and empties the batch.
+        A destination with a single message without timetag receives it without bundle.
+        The messages to a rate limited destination go through its limiter.
+        """
+        for (client, timetag, coalesce), dgrams in self._messages.items():
+            limiter = getattr(client, "limiter", None)
+            if limiter is not None:
+                limiter.send(dgrams, timetag, coalesce)
+            else:
+                send_dgrams(client, dgrams, timetag)
+        self._messages = {}
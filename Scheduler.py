@@ -0,0 +1,329 @@
+import heapq
+import itertools
+import math
+import threading
+import time
+
+DEFAULT_SPIN_THRESHOLD = 2  # ms
+HISTOGRAM_BUCKETS = [0.1, 0.5, 1, 2, 5, 10]  # ms
+
+
+class LatencyStats:
+    """
+    Collects the lateness of every item delivered by the scheduler during a run,
+    i.e. the time between the deadline of the item and the moment it was delivered.
+
+    Examples of use:
+        stats = LatencyStats()
+        stats.record(0.0004)
+        stats.p99          # in seconds
+        stats.histogram()  # {"<0.1 ms": 0, "<0.5 ms": 1, ...}
+        stats.to_string()
+    """
+
+    def __init__(self):
+        self.samples: list[float] = []
+
+    def record(self, lateness: float):
+        """Adds the lateness of a delivered item, in seconds"""
+        self.samples.append(lateness)
+
+    @property
+    def count(self) -> int:
+        return len(self.samples)
+
+    @property
+    def min(self) -> float:
+        return min(self.samples, default=0)
+
+    @property
+    def max(self) -> float:
+        return max(self.samples, default=0)
+
+    @property
+    def mean(self) -> float:
+        return sum(self.samples) / len(self.samples) if self.samples else 0
+
+    @property
+    def p99(self) -> float:
+        return self.percentile(99)
+
+    def percentile(self, percent: float | int) -> float:
+        """Returns the lateness below which percent % of the samples fall, in seconds"""
+        if not self.samples:
+            return 0
+        sorted_samples = sorted(self.samples)
+        index = min(int(len(sorted_samples) * percent / 100), len(sorted_samples) - 1)
+        return sorted_samples[index]
+
+    def histogram(self) -> dict[str, int]:
+        """Returns the number of samples in each bucket of HISTOGRAM_BUCKETS (upper bounds in ms)"""
+        histogram = {f"<{bucket} ms": 0 for bucket in HISTOGRAM_BUCKETS}
+        histogram[f">={HISTOGRAM_BUCKETS[-1]} ms"] = 0
+        for sample in self.samples:
+            for bucket in HISTOGRAM_BUCKETS:
+                if sample * 1000 < bucket:
+                    histogram[f"<{bucket} ms"] += 1
+                    break
+            else:
+                histogram[f">={HISTOGRAM_BUCKETS[-1]} ms"] += 1
+        return histogram
+
+    def to_string(self) -> str:
+        """Returns the summary of the lateness in milliseconds"""
+        return (
+            f"Trigger lateness over {self.count} events: "
+            f"min {self.min * 1000:.3f} ms, mean {self.mean * 1000:.3f} ms, "
+            f"p99 {self.p99 * 1000:.3f} ms, max {self.max * 1000:.3f} ms"
+        )
+
+
+class Scheduler:
+    """
+    The Scheduler class delivers items at their deadline, expressed in seconds since the start of the run.
+    Deadlines are kept in a min-heap and the consumer thread sleeps on a condition variable until the
+    next one is due, instead of polling. Pausing, resuming or stopping the scheduler wakes it immediately.
+
+    In precision mode, the thread sleeps until spin_threshold milliseconds before the deadline,
+    then spins on time.perf_counter for the last stretch to get rid of the OS timer slack.
+    The lateness of every delivered item is recorded in stats, reset on each start().
+
+    Items scheduled with a key can be cancelled or rescheduled while the scheduler runs, in O(log n).
+    The heap is invalidated lazily: the replaced entries stay in the heap and are skipped when they reach the top.
+
+    Examples of use:
+    - Scheduling items and consuming them in a thread:
+        scheduler = Scheduler()
+        scheduler.schedule(1.5, "first item")
+        scheduler.schedule(3, "second item")
+        scheduler.start()
+        for item in iter(scheduler.next, None):
+            print(item)
+
+    - Pausing, resuming and stopping from another thread:
+        scheduler.pause()
+        scheduler.resume()
+        scheduler.stop()
+
+    - Consuming the items sharing the same deadline together:
+        for items in iter(scheduler.next_batch, None):
+            print(items)
+
+    - Rescheduling and cancelling an item identified by a key:
+        scheduler.schedule(10, event, key=event_id)
+        scheduler.schedule(12, event, key=event_id)
+        scheduler.cancel(event_id)
+
+    - Using the precision mode and reading the lateness statistics of the run:
+        scheduler = Scheduler(precision=True)
+        ...
+        print(scheduler.stats.to_string())
+    """
+
+    def __init__(
+        self, precision: bool = False, spin_threshold: float = DEFAULT_SPIN_THRESHOLD
+    ):
+        """
+        Initialize the Scheduler object.
+
+        Args:
+            precision (bool): Spin on time.perf_counter before each deadline instead of only sleeping.
+            spin_threshold (float): Duration of the spin before each deadline, in milliseconds.
+        """
+        self.precision = precision
+        self.spin_threshold = spin_threshold
+        self.stats = LatencyStats()
+        self._heap: list[tuple[float, int, object, object]] = []
+        # Tie-breaker: items sharing a deadline are delivered in insertion order
+        self._counter = itertools.count()
+        # Sequence number of the valid heap entry of each key
+        self._entries: dict[object, int] = {}
+        self._condition = threading.Condition()
+        self._start_time = 0
+        self._last_deadline = None
+        self._pause_time = None
+        self._stopped = True
+
+    @property
+    def is_paused(self):
+        return self._pause_time is not None
+
+    @property
+    def is_running(self):
+        """True between start() and the end of the run"""
+        return not self._stopped
+
+    def schedule(self, deadline: float | int, item, key=None):
+        """
+        Adds an item to deliver when the elapsed time reaches deadline.
+
+        Args:
+            deadline (float | int): The time, in seconds since the start of the run.
+                                    math.inf holds the item, and the run, until it is rescheduled or cancelled.
+            item: The object returned by next() when the deadline is reached.
+            key (optional): Hashable identifier of the item. A pending item with the same key is replaced.
+        """
+        with self._condition:
+            sequence = next(self._counter)
+            if key is not None:
+                self._entries[key] = sequence
+            heapq.heappush(self._heap, (deadline, sequence, key, item))
+            self._condition.notify_all()
+
+    def __contains__(self, key):
+        """True if an item identified by key is pending"""
+        with self._condition:
+            return key in self._entries
+
+    def cancel(self, key):
+        """
+        Cancels the pending item identified by key, if any.
+
+        Args:
+            key: The identifier given to schedule().
+        """
+        with self._condition:
+            if self._entries.pop(key, None) is not None:
+                self._condition.notify_all()
+
+    def clear(self):
+        """Removes every pending item"""
+        with self._condition:
+            self._heap = []
+            self._entries = {}
+            self._condition.notify_all()
+
+    def _discard_invalid_entries(self):
+        """Pops the cancelled or replaced entries from the top of the heap"""
+        while self._heap:
+            _, sequence, key, _ = self._heap[0]
+            if key is None or self._entries.get(key) == sequence:
+                return
+            heapq.heappop(self._heap)
+
+    def elapsed(self) -> float:
+        """Returns the elapsed time of the run in seconds, paused time excluded"""
+        if self._pause_time is not None:
+            return self._pause_time - self._start_time
+        return time.perf_counter() - self._start_time
+
+    def adjust(self, delta: float):
+        """
+        Moves the clock of the run forward by delta seconds (backward if negative),
+        e.g. to follow an external clock. A waiting thread computes its deadline again.
+        """
+        with self._condition:
+            self._start_time -= delta
+            self._condition.notify_all()
+
+    def start(self, offset: float | int = 0, paused: bool = False):
+        """
+        Starts the clock of the run.
+
+        Args:
+            offset (float | int): Elapsed time at which the run starts, in seconds.
+            paused (bool): Starts the run with its clock frozen at offset until resume() is called,
+                           e.g. while the items are being scheduled.
+        """
+        with self._condition:
+            now = time.perf_counter()
+            self._start_time = now - offset
+            self._pause_time = now if paused else None
+            self._stopped = False
+            self.stats = LatencyStats()
+            self._condition.notify_all()
+
+    def pause(self):
+        """Freezes the clock of the run. next() keeps waiting until resume() or stop() is called"""
+        with self._condition:
+            if not self._stopped and self._pause_time is None:
+                self._pause_time = time.perf_counter()
+                self._condition.notify_all()
+
+    def resume(self):
+        """Restarts the clock from the elapsed time at which it was paused"""
+        with self._condition:
+            if self._pause_time is not None:
+                self._start_time += time.perf_counter() - self._pause_time
+                self._pause_time = None
+                self._condition.notify_all()
+
+    def stop(self):
+        """Stops the run. Any thread waiting in next() returns None"""
+        with self._condition:
+            self._stopped = True
+            self._pause_time = None
+            self._condition.notify_all()
+
+    def next(self):
+        """
+        Blocks until the next item is due and returns it.
+
+        Returns:
+            The next due item, or None when the scheduler is stopped or has no item left.
+            The run ends when there is no item left.
+        """
+        with self._condition:
+            return self._wait_next()
+
+    def next_batch(self):
+        """
+        Blocks until the next item is due and returns it with every other item sharing its deadline.
+
+        Returns:
+            The list of due items, or None when the scheduler is stopped or has no item left.
+        """
+        with self._condition:
+            item = self._wait_next()
+            if item is None:
+                return None
+
+            items = [item]
+            self._discard_invalid_entries()
+            while self._heap and self._heap[0][0] == self._last_deadline:
+                _, _, key, item = heapq.heappop(self._heap)
+                if key is not None:
+                    del self._entries[key]
+                self.stats.record(self.elapsed() - self._last_deadline)
+                items.append(item)
+                self._discard_invalid_entries()
+            return items
+
+    def _wait_next(self):
+        """Body of next(), called with the lock of the condition held"""
+        while True:
+            self._discard_invalid_entries()
+            if not self._heap:
+                self._stopped = True
+            if self._stopped:
+                return None
+
+            if self._pause_time is not None:
+                self._condition.wait()
+                continue
+
+            deadline = self._heap[0][0]
+            remaining_time = deadline - self.elapsed()
+            if remaining_time <= 0:
+                self.stats.record(-remaining_time)
+                self._last_deadline = deadline
+                _, _, key, item = heapq.heappop(self._heap)
+                if key is not None:
+                    del self._entries[key]
+                return item
+
+            spin_threshold = self.spin_threshold / 1000 if self.precision else 0
+            if remaining_time == math.inf:
+                self._condition.wait()
+            elif remaining_time > spin_threshold:
+                # Woken up earlier by schedule(), cancel(), pause(), resume() or stop()
+                self._condition.wait(remaining_time - spin_threshold)
+            else:
+                # Spin without holding the lock, the state is checked again afterwards
+                target_time = self._start_time + deadline
+                self._condition.release()
+                try:
+                    while time.perf_counter() < target_time:
+                        pass
+                finally:
+                    self._condition.acquire()
@@ -0,0 +1,47 @@
+class BoundSignal:
+    """
+    Signal of an object instance: keeps the connected callbacks and calls them on emit()
+    """
+
+    def __init__(self):
+        self._slots = []
+
+    def connect(self, slot):
+        self._slots.append(slot)
+
+    def disconnect(self, slot=None):
+        if slot is None:
+            self._slots = []
+        else:
+            self._slots.remove(slot)
+
+    def emit(self, *args):
+        for slot in list(self._slots):
+            slot(*args)
+
+
+class Signal:
+    """
+    Minimal replacement of pyqtSignal for the code that must run without PyQt.
+    Declared as a class attribute, it gives each instance its own BoundSignal.
+    Unlike Qt signals, the slots are called directly in the thread that emits the signal.
+
+    Examples of use:
+        class Player:
+            finished = Signal()
+
+        player = Player()
+        player.finished.connect(print)
+        player.finished.emit("done")
+    """
+
+    def __set_name__(self, owner, name):
+        self._attribute_name = f"_signal_{name}"
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        bound_signal = instance.__dict__.get(self._attribute_name)
+        if bound_signal is None:
+            bound_signal = instance.__dict__[self._attribute_name] = BoundSignal()
+        return bound_signal
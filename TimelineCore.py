@@ -0,0 +1,720 @@
+from enum import Enum, auto
+from functools import partial
+import bisect
+import threading
+from Model import JsonModel, ControlMode
+from Event import Event
+from Control import Control
+from EditJournal import (
+    ADD,
+    BASE,
+    CHANGE,
+    DEFAULT_COMPACT_THRESHOLD,
+    DEFAULT_SYNC_INTERVAL,
+    JOURNAL_EXTENSION,
+    REMOVE,
+    EditJournal,
+    file_checksum,
+    replace_file,
+)
+from BinaryShow import BinaryShow, BinaryShowWriter, is_binary_path
+from JsonBackend import dump_timeline, get_backend
+from JsonStream import JsonStreamReader
+from Validation import validate_json, validate_event
+from Scheduler import Scheduler
+from AnimationEngine import AnimationEngine
+from OscOutput import OscBatch, OscClient, Lookahead, SHARED_CLIENT_POOL
+from Signal import Signal
+
+DEFAULT_IP = "127.0.0.1"
+DEFAULT_PORT = 7000
+DEFAULT_NAME = "Unknown name"
+
+
+class State(Enum):
+    RUNNING = auto()
+    NOT_RUNNING = auto()
+    PAUSED = auto()
+
+
+class TimelineCore:
+    """
+    The TimelineCore class represents a timeline of events.
+    It manages the execution and control of events based on their specified times.
+    It does not depend on PyQt: its signals are plain Python callbacks (see Signal.py), emitted in
+    the thread of the caller. The Qt application uses its subclass Timeline, which replaces them by pyqtSignal.
+
+    Examples of use:
+    - Creating a timeline and adding events:
+        timeline = TimelineCore()
+        event1 = Event(time=0, command="/composition/add")
+        event2 = Event(time=1, command="/opacity/1", control=Control(mode=ControlMode.UNIQUE, value=1))
+        timeline.add_event(event1)
+        timeline.add_event(event2)
+
+    - Running the timeline:
+        timeline.run_timeline()
+
+    - Running the timeline from 1 minute:
+        timeline.run_timeline(start_at=60)
+
+    - Pausing and resuming the timeline:
+        timeline.pause_timeline()
+        timeline.resume_timeline()
+
+    - Stopping the timeline:
+        timeline.stop_timeline()
+
+    - Sending the unique controls 200 ms early, in bundles timetagged with their execution time:
+        timeline.set_lookahead(0.2)
+
+    - Sending at most 500 messages per second to the destination of the timeline:
+        timeline.set_rate_limit(500)
+
+    - Sending the fades at 30 frames per second, skipping the frames that change by 0.001 or less:
+        timeline.animation_engine.frame_rate = 30
+        timeline.animation_engine.min_delta = 0.001
+
+    - Loading and saving a JSON timeline or a binary show, depending on the extension of the path:
+        timeline = TimelineCore("show.oscb")
+        timeline.save("show.json")
+
+    - Journaling the edits as they happen, and recovering the edits not saved before a crash:
+        timeline = TimelineCore("show.json")
+        timeline.open_journal("show.json")
+
+    - Enabling the precision mode of the scheduler and reading the lateness of the last run:
+        timeline.scheduler.precision = True
+        timeline.latency_stats.p99
+    """
+
+    state_changed = Signal()
+    progress = Signal()
+    log_message = Signal()
+
+    def __init__(self, json_path: str = None, **kwargs):
+        super().__init__(**kwargs)
+        self._state = State.NOT_RUNNING
+        self.elapsed_time = 0
+        self.client_pool = SHARED_CLIENT_POOL
+        self.scheduler = Scheduler()
+        self.animation_engine = AnimationEngine()
+        self._thread = None
+        # Look-ahead dispatch settings of each destination (ip, port)
+        self.lookahead: dict[tuple[str, int], Lookahead] = {}
+        # Destinations used by the timeline when the clients were last released
+        self._destinations: set[tuple[str, int]] = set()
+        # JSON library used to save and check the timeline, the fastest installed by default
+        self.json_backend = get_backend()
+        self.last_id: int = 0
+        self.timeline: dict[int, Event] = {}
+        # Journal of the edits made since the file at path was loaded or saved
+        self.journal: EditJournal | None = None
+        self.path: str | None = None
+        if json_path is not None:
+            self.load(json_path)
+        else:
+            self.name = DEFAULT_NAME
+            self.init_client(DEFAULT_IP, DEFAULT_PORT)
+
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, new_state: State):
+        self._state = new_state
+        self.state_changed.emit()
+
+    @property
+    def is_running(self):
+        """True while the thread of a run is alive, paused or not"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def reset(self):
+        """Reset timeline attributes"""
+        self.elapsed_time = 0
+        self.scheduler.stop()
+        self.scheduler.clear()
+        self.animation_engine.stop()
+        self.state = State.NOT_RUNNING
+        self.close_journal()
+        self.last_id = 0
+        self.name = DEFAULT_NAME
+        self.timeline = {}
+        self.init_client(DEFAULT_IP, DEFAULT_PORT)
+
+    def init_client(self, ip: str = None, port: int = None):
+        """
+        Sets the default destination of the timeline, used by the events without destination.
+        The clients come from the shared pool: no socket is created if the destination was already used.
+        """
+        if ip is not None:
+            self.ip: str = ip
+        if port is not None:
+            self.port: int = port
+
+        self.client = self.client_pool.get(self.ip, self.port)
+        for event in self.timeline.values():
+            if event.destination is None:
+                event.set_osc_client(self.client)
+        self.release_clients()
+
+    def release_clients(self):
+        """
+        Called when the destinations of the timeline change: the look-ahead settings of the destinations
+        no longer used are dropped, and their clients are closed unless another timeline uses them.
+        """
+        destinations = {self.get_destination(event) for event in self.timeline.values()}
+        destinations.add((self.ip, self.port))
+        for destination in self._destinations - destinations:
+            self.lookahead.pop(destination, None)
+        self._destinations = destinations
+        self.client_pool.retain(self, destinations)
+
+    def get_destination(self, event: Event) -> tuple[str, int]:
+        """Returns the destination (ip, port) of an event: its own one, or the one of the timeline"""
+        if event.destination is None:
+            return (self.ip, self.port)
+        return event.destination
+
+    def get_client(self, event: Event) -> OscClient:
+        """Returns the client of the destination of an event, from the shared pool"""
+        if event.destination is None:
+            return self.client
+        return self.client_pool.get(*event.destination)
+
+    def set_lookahead(
+        self, window: float | None, ntp_offset: float = 0, ip: str = None, port: int = None
+    ):
+        """
+        Enables the look-ahead dispatch for a destination whose receiver honours the OSC bundle timetags.
+        Its unique controls are sent window seconds early, in bundles timetagged with their execution time.
+        The animated controls are still played at their time.
+
+        Args:
+            window (float | None): How early the events are sent, in seconds. None disables the look-ahead.
+            ntp_offset (float): Correction added to the local system time to obtain the NTP time of the receiver.
+            ip (str, optional): IP of the destination, the ip of the timeline by default.
+            port (int, optional): Port of the destination, the port of the timeline by default.
+        """
+        destination = (self.ip if ip is None else ip, self.port if port is None else port)
+        if window is None:
+            self.lookahead.pop(destination, None)
+        else:
+            self.lookahead[destination] = Lookahead(window, ntp_offset)
+
+    def set_rate_limit(self, rate: float | None, ip: str = None, port: int = None):
+        """
+        Limits the number of messages per second sent to a destination (see OscOutput.RateLimiter).
+        The unique controls are always sent, the animation frames over budget are coalesced.
+
+        Args:
+            rate (float | None): Number of messages per second. None removes the limit.
+            ip (str, optional): IP of the destination, the ip of the timeline by default.
+            port (int, optional): Port of the destination, the port of the timeline by default.
+        """
+        destination = (self.ip if ip is None else ip, self.port if port is None else port)
+        self.client_pool.set_rate_limit(*destination, rate)
+
+    def get_lookahead(self, event: Event) -> Lookahead | None:
+        """Returns the look-ahead settings applied to an event, None if it is sent at its time"""
+        if event.control.mode != ControlMode.UNIQUE:
+            return None
+        return self.lookahead.get(self.get_destination(event))
+
+    def get_deadline(self, event: Event) -> float | int:
+        """Returns the time at which the scheduler dispatches an event"""
+        lookahead = self.get_lookahead(event)
+        if lookahead is None:
+            return event.time
+        return event.time - lookahead.window
+
+    # JSON Saver / Loader
+    def from_json(self, json_path: str):
+        """
+        Loads the timeline saved in json_path, in a single pass over the file:
+        each event of the timeline list is read, validated and built one at a time (see JsonStreamReader),
+        so that the whole JSON document is never held in memory next to the events.
+        The timeline is only modified once the whole file is valid, and a single log message is emitted.
+        """
+        events = []
+        with open(json_path, "r", encoding="utf-8") as json_file:
+            reader = JsonStreamReader(json_file, JsonModel.TIMELINE.value["name"])
+            for event_index, event_dict in enumerate(reader.iter_items()):
+                validate_event(event_dict, event_index)
+                events.append(Event.from_dict(event_dict))
+            json_dict = reader.header
+
+        # Check global structure according to JsonModel, the timeline list being already streamed
+        if reader.streamed:
+            json_dict[JsonModel.TIMELINE.value["name"]] = []
+        validate_json(json_dict)
+
+        # Parse OSC client attributes
+        self.init_client(
+            json_dict[JsonModel.IP.value["name"]],
+            json_dict[JsonModel.PORT.value["name"]],
+        )
+
+        # Add the events to the dictionary of {id:Event}
+        self.add_events(events)
+
+        # Config's name
+        self.name = json_dict[JsonModel.NAME.value["name"]]
+
+    def to_json(self, json_path: str):
+        """
+        Saves the timeline as JSON with its JSON backend (see JsonBackend.py).
+        The event dicts are streamed to the file instead of being gathered in a list first.
+        """
+        header = {
+            JsonModel.NAME.value["name"]: self.name,
+            JsonModel.IP.value["name"]: self.ip,
+            JsonModel.PORT.value["name"]: self.port,
+        }
+        with open(json_path, "wb") as json_file:
+            dump_timeline(
+                json_file,
+                header,
+                JsonModel.TIMELINE.value["name"],
+                (event.to_dict() for event in self.timeline.values()),
+                self.json_backend,
+            )
+
+    # Binary Saver / Loader
+    def from_binary(self, binary_path: str):
+        """
+        Loads the timeline saved in the binary show binary_path (see BinaryShow.py),
+        without parsing: each event is materialized from its record and added, with a single log message.
+        """
+        with BinaryShow(binary_path) as show:
+            self.init_client(show.ip, show.port)
+            self.add_events(list(show))
+            self.name = show.name
+
+    def to_binary(self, binary_path: str):
+        writer = BinaryShowWriter(binary_path)
+        for event in self.timeline.values():
+            writer.add(event)
+        writer.close(self.name, self.ip, self.port)
+
+    def load(self, path: str):
+        """Loads a binary show if path ends with BINARY_EXTENSION (.oscb), a JSON timeline otherwise"""
+        if is_binary_path(path):
+            self.from_binary(path)
+        else:
+            self.from_json(path)
+
+    def save(self, path: str):
+        """
+        Saves a binary show if path ends with BINARY_EXTENSION (.oscb), a JSON timeline otherwise.
+        The file is replaced atomically, then the journal is compacted: it restarts from the saved file.
+        """
+        tmp_path = path + ".tmp"
+        if is_binary_path(path):
+            self.to_binary(tmp_path)
+        else:
+            self.to_json(tmp_path)
+        replace_file(tmp_path, path)
+
+        if self.journal is not None:
+            if path == self.path:
+                self.journal.reset(file_checksum(path), list(self.timeline))
+            else:
+                # Saved as another file: its journal follows the new file
+                self.open_journal(
+                    path,
+                    sync_interval=self.journal.sync_interval,
+                    compact_threshold=self.journal.compact_threshold,
+                    recover=False,
+                )
+
+    # Edit journal
+    def open_journal(
+        self,
+        path: str,
+        sync_interval: float = DEFAULT_SYNC_INTERVAL,
+        compact_threshold: int = DEFAULT_COMPACT_THRESHOLD,
+        recover: bool = True,
+    ) -> int:
+        """
+        Journals the edits of the timeline in path + JOURNAL_EXTENSION (see EditJournal.py),
+        the timeline having just been loaded from path or saved to it.
+        The journal is compacted into path each time it reaches compact_threshold entries.
+
+        Args:
+            path (str): Path of the main file of the timeline.
+            sync_interval (float): Maximum time an edit waits before being synced to disk, in seconds.
+            compact_threshold (int): Number of edits from which the journal is compacted into the main file.
+            recover (bool): If True, the edits left in the journal by a previous session, e.g. after a crash,
+                            are replayed first. They are only replayed if the journal matches the main file.
+
+        Returns:
+            int: The number of edits replayed.
+        """
+        self.close_journal()
+        journal_path = path + JOURNAL_EXTENSION
+        checksum = file_checksum(path)
+        entries = EditJournal.read(journal_path) if recover else []
+        replayed = 0
+        if entries and entries[0]["op"] == BASE and entries[0]["checksum"] == checksum:
+            replayed = self.replay_journal(entries)
+            if replayed:
+                self.log_message.emit(f"{replayed} edits recovered from {journal_path}")
+        elif entries:
+            self.log_message.emit(f"Journal {journal_path} ignored: it does not match {path}")
+
+        self.path = path
+        self.journal = EditJournal(journal_path, sync_interval, compact_threshold)
+        if not replayed:
+            self.journal.reset(checksum, list(self.timeline))
+        return replayed
+
+    def close_journal(self):
+        """Stops journaling the edits. The journal is kept on disk with the edits not saved yet"""
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def compact(self):
+        """Saves the timeline to its main file, which empties its journal"""
+        if self.path is not None:
+            self.save(self.path)
+
+    def replay_journal(self, entries: list[dict]) -> int:
+        """
+        Applies the edits of a journal read by EditJournal.read to the timeline loaded from its main file
+
+        Returns:
+            int: The number of edits replayed.
+        """
+        journal, self.journal = self.journal, None
+        try:
+            # The ids of the events of the main file when it was saved
+            ids = entries[0]["ids"]
+            events = list(self.timeline.values())
+            if len(ids) != len(events):
+                raise Exception("The journal does not match the events of the timeline")
+            self.timeline = {}
+            for index, event in zip(ids, events):
+                self.timeline[index] = event
+                event.set_change_callback(partial(self.handle_event_changed, index))
+            self.last_id = max(ids, default=0)
+
+            for entry in entries[1:]:
+                operation, index = entry["op"], entry["id"]
+                if operation == ADD:
+                    self.last_id = index
+                    self._insert_event(Event.from_dict(entry["value"]))
+                elif operation == REMOVE:
+                    self.remove_event(index)
+                elif operation == CHANGE:
+                    event = self.timeline[index]
+                    attribute, value = entry["attribute"], entry["value"]
+                    if attribute == "control":
+                        event.control = Control.from_dict(value)
+                    elif attribute == "destination":
+                        event.destination = None if value is None else tuple(value)
+                    else:
+                        setattr(event, attribute, value)
+            return len(entries) - 1
+        finally:
+            self.journal = journal
+
+    def _record(self, operation: str, index: int, value=None, attribute: str = None):
+        """Appends an edit to the journal, if any, and compacts the journal when it is too long"""
+        if self.journal is None:
+            return
+        self.journal.record(operation, index, value, attribute)
+        if self.journal.entries >= self.journal.compact_threshold:
+            self.compact()
+
+    def check_json(self, json_path: str):
+        """
+        Check the JSON file according to the specified models in Model.py
+        First, check the global structure of the json according to JsonModel
+        Then, check the structure (key name and value type) of the event
+        Finally, check the structure of the control belonging to the event
+        """
+        with open(json_path, "rb") as json_file:
+            json_dict = self.json_backend.loads(json_file.read())
+
+        # Check global structure according to JsonModel
+        validate_json(json_dict)
+
+        for event_index, event_dict in enumerate(json_dict[JsonModel.TIMELINE.value["name"]]):
+            validate_event(event_dict, event_index)
+
+        return json_dict
+
+    # Add / Remove timeline events
+    def add_event(self, event: Event):
+        """
+        Adds an event to the timeline dict and increase the event's id
+        If the timeline is running, the event is scheduled without restarting it.
+
+        Args:
+            event: The event object to be added to the timeline.
+        """
+        self.last_id += 1
+        self.log_message.emit(f"New event added to the timeline: ID = {self.last_id}")
+        self._insert_event(event)
+        if event.destination is not None:
+            self.release_clients()
+        self._record(ADD, self.last_id, event.to_dict())
+        return self.last_id
+
+    def add_events(self, events: list[Event]):
+        """
+        Adds several events to the timeline, e.g. when a file is loaded, with a single log message
+        instead of one per event.
+
+        Args:
+            events (list[Event]): The event objects to be added to the timeline.
+        """
+        for event in events:
+            self.last_id += 1
+            self._insert_event(event)
+        self.release_clients()
+        self.log_message.emit(f"{len(events)} events added to the timeline")
+
+    def _insert_event(self, event: Event):
+        """Stores an event under the id last_id, and prepares it for playback"""
+        self.timeline[self.last_id] = event
+        event.set_osc_client(self.get_client(event))
+        if event.control.is_animated:
+            # Compile the animation at load time instead of when the event is triggered
+            self.animation_engine.get_curve(event.control)
+        event.set_change_callback(partial(self.handle_event_changed, self.last_id))
+        self.reschedule_event(self.last_id)
+        return self.last_id
+
+    def remove_event(self, index):
+        """
+        Removes an event from the timeline based on its index.
+        If the timeline is running, the event is cancelled.
+
+        Args:
+            index (int): The index of the event to be removed.
+        """
+        self.log_message.emit(f"Event removed from the timeline: ID = {index}")
+        event = self.timeline.pop(index)
+        event.set_change_callback(None)
+        self.scheduler.cancel(index)
+        if event.destination is not None:
+            self.release_clients()
+        self._record(REMOVE, index)
+
+    def reschedule_event(self, index):
+        """
+        Updates the scheduler of a running timeline after the time, the control or the destination
+        of an event changed.
+        The event is triggered at its new time if it is still ahead of the playhead, otherwise it is cancelled.
+
+        Args:
+            index (int): The index of the event to reschedule.
+        """
+        if not self.scheduler.is_running:
+            return
+
+        event = self.timeline[index]
+        if event.time >= self.scheduler.elapsed():
+            self.scheduler.schedule(self.get_deadline(event), event, key=index)
+        else:
+            self.scheduler.cancel(index)
+
+    def handle_event_changed(self, index: int, event: Event, attribute: str):
+        """
+        Called after each edit of an event of the timeline (see Event.set_change_callback)
+        """
+        if attribute == "time":
+            self.reschedule_event(index)
+        elif attribute == "destination":
+            event.set_osc_client(self.get_client(event))
+            self.release_clients()
+        if attribute == "control" and event.control.is_animated:
+            # The curve dropped by the edit is compiled again before the event is triggered
+            self.animation_engine.get_curve(event.control)
+        if attribute in ("control", "destination") and index in self.scheduler:
+            # The look-ahead, thus the deadline, depends on the mode of the control and on the destination
+            self.reschedule_event(index)
+
+        if self.journal is not None:
+            if attribute == "control":
+                value = event.control.to_dict()
+            elif attribute == "destination":
+                value = None if event.destination is None else list(event.destination)
+            else:
+                value = getattr(event, attribute)
+            self._record(CHANGE, index, value, attribute)
+
+    def get_max_time(self) -> int | float:
+        """Get the total time of the timeline = the time of the last event"""
+        if len(self.timeline.values()):
+            return max([event.time for event in self.timeline.values()])
+        else:
+            # Empty timeline
+            return 0
+
+    @property
+    def latency_stats(self):
+        """Lateness statistics of the events triggered during the last run (see Scheduler.LatencyStats)"""
+        return self.scheduler.stats
+
+    # Timeline controller
+    def get_sorted_events(self) -> tuple[list[float | int], list[tuple[int, Event]]]:
+        """
+        Returns the index of the timeline sorted by time: the list of times and the corresponding (id, event).
+        The list of times can be searched with bisect.
+        """
+        sorted_events = sorted(self.timeline.items(), key=lambda item: item[1].time)
+        return [event.time for _, event in sorted_events], sorted_events
+
+    def chase_state(self, past_events: list[Event], start_at: float | int, group=None):
+        """
+        Sends the state that each animated control would have at start_at,
+        so that the receiver matches the playhead when the timeline starts from an offset.
+        Only the last event sent to each address of each destination before start_at is chased.
+        A fade still running at start_at keeps playing from the seek point.
+
+        Args:
+            past_events (list[Event]): The events before start_at, sorted by time.
+            start_at (float | int): The time from which the timeline starts, in seconds.
+            group (optional): Group of the chased fades in the animation engine.
+        """
+        batch = OscBatch()
+        chased_addresses = set()
+        for event in reversed(past_events):
+            address = (self.get_destination(event), event.command)
+            if address in chased_addresses:
+                continue
+            chased_addresses.add(address)
+
+            if event.control.is_animated:
+                offset = start_at - event.time
+                if offset < event.control.duration:
+                    self.animation_engine.add(event, offset=offset, group=group)
+                else:
+                    batch.add(event.client, event.encode(event.control.value_at(offset)))
+        batch.flush()
+
+    def run_timeline(self, start_at: float | int = 0):
+        """
+        Runs the timeline and triggers the events at their specified times.
+        The events are handed to the scheduler, which wakes the thread up exactly when the next one is due.
+        The unique controls of co-timed events are sent as one OSC bundle per destination.
+        For the destinations with a look-ahead (see set_lookahead), they are sent early in timetagged bundles.
+
+        Args:
+            start_at (float | int): The time from which the timeline starts, in seconds.
+                                    The state of the animated controls at this time is chased.
+        """
+        start_at = max(start_at, 0)
+        times, sorted_events = self.get_sorted_events()
+        first_index = bisect.bisect_left(times, start_at)
+
+        self.scheduler.clear()
+        # The clock is started before the events are scheduled, so that the edits made until the thread
+        # runs are rescheduled. It stays frozen at start_at until then.
+        self.scheduler.start(offset=start_at, paused=True)
+        for index, event in sorted_events[first_index:]:
+            deadline = max(self.get_deadline(event), start_at)
+            self.scheduler.schedule(deadline, event, key=index)
+
+        def thread_func():
+            self.log_message.emit("Timeline started")
+            self.state = State.RUNNING
+            self.elapsed_time = start_at
+            max_time = self.get_max_time()
+            self.progress.emit(min(int(start_at / max_time * 100), 100) if max_time else 0)
+            self.scheduler.resume()
+            if first_index:
+                self.chase_state(
+                    [event for _, event in sorted_events[:first_index]], start_at
+                )
+
+            for events in iter(self.scheduler.next_batch, None):
+                # Trigger the events here. Animated controls are played by the animation engine
+                batch = OscBatch()
+                try:
+                    for event in events:
+                        lookahead = self.get_lookahead(event)
+                        timetag = None
+                        remaining_time = 0
+                        if lookahead is not None:
+                            remaining_time = event.time - self.scheduler.elapsed()
+                            timetag = lookahead.timetag(remaining_time)
+                        event.trigger(
+                            animation_engine=self.animation_engine,
+                            batch=batch,
+                            timetag=timetag,
+                            delay=remaining_time,
+                        )
+                    batch.flush()
+                except Exception as error:
+                    # A failed send must not stop the timeline: the next events are still played
+                    self.log_message.emit(f"Error while sending events: {error}")
+                self.elapsed_time = self.scheduler.elapsed()
+                if max_time > 0:
+                    self.progress.emit(min(int(self.elapsed_time / max_time * 100), 100))
+
+            # The last fades are still running in the animation engine
+            self.animation_engine.join()
+
+            if self.state != State.NOT_RUNNING:
+                self.progress.emit(100)
+
+            self.log_message.emit(self.latency_stats.to_string())
+
+            self.state = State.NOT_RUNNING
+
+        self._thread = threading.Thread(target=thread_func)
+        self._thread.start()
+
+    def wait_timeline(self):
+        """
+        Blocks until the end of the current run of the timeline.
+        """
+        if self._thread is not None:
+            self._thread.join()
+
+    def pause_timeline(self):
+        """
+        Pauses the timeline execution by freezing the scheduler clock.
+        """
+        self.log_message.emit("Timeline paused")
+        self.scheduler.pause()
+        self.animation_engine.pause()
+        self.state = State.PAUSED
+
+    def stop_timeline(self):
+        """
+        Stops the timeline execution and wakes the scheduler up.
+        """
+        self.log_message.emit("Timeline stopped")
+        self.state = State.NOT_RUNNING
+        self.scheduler.stop()
+        self.animation_engine.stop()
+
+    def seek(self, position: float | int):
+        """
+        Restarts the timeline from position, chasing the state of its animated controls.
+
+        Args:
+            position (float | int): The time from which the timeline restarts, in seconds.
+        """
+        if self.state != State.NOT_RUNNING:
+            self.stop_timeline()
+        self.wait_timeline()
+        self.run_timeline(start_at=position)
+
+    def resume_timeline(self):
+        """
+        Resumes the timeline execution from the elapsed time at which it was paused.
+        """
+        self.log_message.emit("Timeline started again")
+        self.scheduler.resume()
+        self.animation_engine.resume()
+        self.state = State.RUNNING
+
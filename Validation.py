@@ -0,0 +1,102 @@
+"""
+Validators of the JSON timelines, compiled once at import time from the models of Model.py.
+Each model Enum becomes a tuple of (key name, key type, required) fields, so that validating
+an event is a handful of direct key lookups and isinstance checks, without reading the Enum members.
+"""
+from CustomExceptions import ParseExceptionKey, ParseExceptionType
+from Model import (
+    JsonModel,
+    EventModel,
+    ControlMode,
+    ControlModel,
+    ControlModelUnique,
+    ControlModelAnimated,
+    ControlModelEnvelope,
+    DestinationModel,
+)
+
+
+def compile_model(model_enum) -> tuple[tuple[str, type | tuple, bool], ...]:
+    """Returns the (key name, key type, required) fields of a model Enum"""
+    return tuple(
+        (key.value["name"], key.value["type"], key.value.get("required", True))
+        for key in model_enum
+    )
+
+
+def compile_validator(model_enum):
+    """
+    Returns a function validate(data, path=None, event_index=None) checking each key of the data dictionary
+    based on the key name and key type defined in the model Enum.
+    path is the position of data in the JSON (e.g. "timeline[3].control"), None for the root object,
+    reported by the exceptions with event_index.
+    """
+    fields = compile_model(model_enum)
+
+    def validate(data: dict, path: str = None, event_index: int = None):
+        for key_name, key_type, required in fields:
+            if key_name not in data:
+                if required:
+                    raise ParseExceptionKey(key_name, path=path, event_index=event_index)
+                continue
+            value = data[key_name]
+            if not isinstance(value, key_type):
+                raise ParseExceptionType(
+                    wrong_value=value,
+                    parent_key=key_name,
+                    expected_type=key_type,
+                    path=path,
+                    event_index=event_index,
+                )
+
+    validate.__name__ = f"validate_{model_enum.__name__}"
+    return validate
+
+
+validate_json = compile_validator(JsonModel)
+validate_event_keys = compile_validator(EventModel)
+validate_destination = compile_validator(DestinationModel)
+validate_control = compile_validator(ControlModel)
+
+# Validator of the specific structure of the control, by control_mode string
+CONTROL_MODE_VALIDATORS = {
+    ControlMode.UNIQUE.value: compile_validator(ControlModelUnique),
+    ControlMode.ANIMATED.value: compile_validator(ControlModelAnimated),
+    ControlMode.ENVELOPE.value: compile_validator(ControlModelEnvelope),
+}
+
+TIMELINE_KEY = JsonModel.TIMELINE.value["name"]
+CONTROL_KEY = EventModel.CONTROL.value["name"]
+DESTINATION_KEY = EventModel.DESTINATION.value["name"]
+MODE_KEY = ControlModel.MODE.value["name"]
+
+
+def validate_event(event_dict: dict, event_index: int = None):
+    """
+    Check the structure (key name and value type) of an event of the timeline list,
+    then the structure of the control belonging to the event
+
+    Args:
+        event_dict (dict): The event, as read from the JSON.
+        event_index (int, optional): Index of the event in the timeline list, reported by the exceptions.
+    """
+    path = TIMELINE_KEY if event_index is None else f"{TIMELINE_KEY}[{event_index}]"
+    validate_event_keys(event_dict, path, event_index)
+
+    # Check structure of the optional destination of the event
+    destination_dict = event_dict.get(DESTINATION_KEY)
+    if destination_dict is not None:
+        validate_destination(destination_dict, f"{path}.{DESTINATION_KEY}", event_index)
+
+    # Check general structure of the control in the corresponding event
+    control_dict = event_dict[CONTROL_KEY]
+    control_path = f"{path}.{CONTROL_KEY}"
+    validate_control(control_dict, control_path, event_index)
+
+    # Check specificed structure of the control, depending of the mode
+    validate_mode = CONTROL_MODE_VALIDATORS.get(control_dict[MODE_KEY])
+    if validate_mode is None:
+        raise Exception(
+            f"Unknown control mode {control_dict[MODE_KEY]!r} in {control_path}"
+        )
+    validate_mode(control_dict, control_path, event_index)
@@ -0,0 +1,260 @@
+"""
+Trigger latency benchmark of the OSC Timeline.
+It plays synthetic timelines against a local UDP sink running in the process, and reports
+the latency between the time of each unique control and its reception, the message throughput and the CPU use.
+Run it on an idle machine to compare the scheduler and output changes.
+
+Usage:
+    python -m benchmark [--events 10 1000 100000] [--duration SECONDS] [--animated RATIO]
+                        [--player {thread,async,both}] [--precision]
+"""
+import argparse
+import asyncio
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+
+from AsyncPlayer import AsyncPlayer
+from Control import Control
+from Event import Event
+from Model import ControlMode
+from Scheduler import LatencyStats
+from TimelineCore import TimelineCore
+
+DEFAULT_EVENT_COUNTS = [10, 1000, 100000]
+DEFAULT_DURATION = 10  # s
+DEFAULT_ANIMATED_RATIO = 0.01
+SINK_BUFFER_SIZE = 1 << 24  # bytes
+
+
+def create_timeline(
+    event_count: int, duration: float, animated_ratio: float, seed: int = 0
+) -> TimelineCore:
+    """
+    Creates a synthetic timeline: unique controls spread over duration seconds, with the address /cue/<index>,
+    and short fades gathered in a dense section in the middle of the timeline.
+
+    Args:
+        event_count (int): Number of events.
+        duration (float): Duration of the timeline, in seconds.
+        animated_ratio (float): Part of the events with an animated control.
+        seed (int): Seed of the random times.
+    """
+    rand = random.Random(seed)
+    timeline = TimelineCore()
+    animated_count = int(event_count * animated_ratio)
+    for index in range(event_count - animated_count):
+        timeline.add_event(
+            Event(round(rand.uniform(0, duration), 6), f"/cue/{index}", Control(value=index))
+        )
+    for index in range(animated_count):
+        timeline.add_event(
+            Event(
+                round(rand.uniform(0.4, 0.6) * duration, 6),
+                f"/fade/{index}",
+                Control(ControlMode.ANIMATED, value=[0, 1], duration=rand.uniform(0.1, 1)),
+            )
+        )
+    return timeline
+
+
+class UdpSink:
+    """
+    Local OSC receiver recording the time of reception of each message, read on the clock of the player.
+    It only decodes the addresses, so that it keeps up with the player.
+    """
+
+    def __init__(self, clock) -> None:
+        """
+        Args:
+            clock (callable): Returns the elapsed time of the run, e.g. Scheduler.elapsed.
+        """
+        self.clock = clock
+        self.received: list[tuple[bytes, float]] = []
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SINK_BUFFER_SIZE)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.1)
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self.sock.getsockname()
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped = True
+        self._thread.join()
+        self.sock.close()
+
+    def _run(self):
+        while not self._stopped:
+            try:
+                dgram = self.sock.recv(65536)
+            except socket.timeout:
+                continue
+            received_time = self.clock()
+            for address in UdpSink.addresses(dgram):
+                self.received.append((address, received_time))
+
+    @staticmethod
+    def addresses(dgram: bytes) -> list[bytes]:
+        """Returns the OSC addresses of the messages of a datagram, bundled or not"""
+        if not dgram.startswith(b"#bundle"):
+            return [dgram[: dgram.index(b"\x00")]]
+        addresses = []
+        offset = 16
+        while offset < len(dgram):
+            (size,) = struct.unpack_from(">i", dgram, offset)
+            addresses += UdpSink.addresses(dgram[offset + 4 : offset + 4 + size])
+            offset += 4 + size
+        return addresses
+
+
+class BenchmarkResult:
+    """Latency of the unique controls, throughput and CPU use of a benchmark run"""
+
+    def __init__(
+        self,
+        name: str,
+        expected: int,
+        latency: LatencyStats,
+        messages: int,
+        wall_time: float,
+        cpu_time: float,
+    ) -> None:
+        self.name = name
+        self.expected = expected
+        self.latency = latency
+        self.messages = messages
+        self.wall_time = wall_time
+        self.cpu_time = cpu_time
+
+    @property
+    def lost(self) -> int:
+        """Number of unique controls never received"""
+        return self.expected - self.latency.count
+
+    @property
+    def throughput(self) -> float:
+        """Messages received per second"""
+        return self.messages / self.wall_time if self.wall_time else 0
+
+    @property
+    def cpu_use(self) -> float:
+        """CPU time of the process divided by the wall time, 1 being one core fully used"""
+        return self.cpu_time / self.wall_time if self.wall_time else 0
+
+    def to_string(self) -> str:
+        latency = self.latency
+        return (
+            f"{self.name}: latency p50 {latency.percentile(50) * 1000:.3f} ms, "
+            f"p99 {latency.p99 * 1000:.3f} ms, p99.9 {latency.percentile(99.9) * 1000:.3f} ms, "
+            f"max {latency.max * 1000:.3f} ms, lost {self.lost}/{self.expected}, "
+            f"{self.throughput:.0f} msg/s, CPU {self.cpu_use * 100:.0f} %"
+        )
+
+
+def run_benchmark(timeline: TimelineCore, player: str = "thread", name: str = None) -> BenchmarkResult:
+    """
+    Plays a timeline against a local UDP sink and measures it.
+
+    Args:
+        timeline (TimelineCore): The timeline, whose destination is replaced by the sink.
+        player (str): "thread" for TimelineCore.run_timeline, "async" for AsyncPlayer.
+        name (str, optional): Name of the run in the report.
+    """
+    async_player = AsyncPlayer(timeline) if player == "async" else None
+    clock = async_player.elapsed if async_player else timeline.scheduler.elapsed
+    sink = UdpSink(clock)
+    sink.start()
+    timeline.init_client(*sink.address)
+
+    expected_times = {
+        event.command.encode(): event.time
+        for event in timeline.timeline.values()
+        if not event.control.is_animated
+    }
+
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    if async_player:
+        asyncio.run(async_player.play())
+    else:
+        timeline.run_timeline()
+        timeline.wait_timeline()
+    wall_time, cpu_time = time.perf_counter() - start_wall, time.process_time() - start_cpu
+    # Let the sink read the last datagrams
+    time.sleep(0.2)
+    sink.stop()
+
+    latency = LatencyStats()
+    for address, received_time in sink.received:
+        event_time = expected_times.pop(address, None)
+        if event_time is not None:
+            latency.record(received_time - event_time)
+    return BenchmarkResult(
+        name or player,
+        expected=latency.count + len(expected_times),
+        latency=latency,
+        messages=len(sink.received),
+        wall_time=wall_time,
+        cpu_time=cpu_time,
+    )
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmark", description="Trigger latency benchmark of the OSC Timeline"
+    )
+    parser.add_argument(
+        "--events",
+        type=int,
+        nargs="+",
+        default=DEFAULT_EVENT_COUNTS,
+        help="Number of events of each synthetic timeline",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=DEFAULT_DURATION,
+        help="Duration of the synthetic timelines, in seconds",
+    )
+    parser.add_argument(
+        "--animated",
+        type=float,
+        default=DEFAULT_ANIMATED_RATIO,
+        help="Part of the events with an animated control, played in a dense section",
+    )
+    parser.add_argument(
+        "--player",
+        choices=["thread", "async", "both"],
+        default="thread",
+        help="Playback engine measured",
+    )
+    parser.add_argument(
+        "--precision",
+        action="store_true",
+        help="Enable the precision mode of the scheduler",
+    )
+    return parser
+
+
+def main(argv: list[str] = None):
+    args = create_parser().parse_args(argv)
+    players = ["thread", "async"] if args.player == "both" else [args.player]
+    for event_count in args.events:
+        for player in players:
+            timeline = create_timeline(event_count, args.duration, args.animated)
+            timeline.scheduler.precision = args.precision
+            result = run_benchmark(timeline, player, name=f"{event_count} events, {player}")
+            print(result.to_string())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
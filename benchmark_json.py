@@ -0,0 +1,140 @@
+"""
+Load and save throughput benchmark of the JSON timelines, for each JSON backend installed (see JsonBackend.py).
+It saves synthetic timelines with each backend, then measures:
+- save: TimelineCore.to_json, which streams the event dicts to the file,
+        and "json (list)", the former save building the whole list then calling json.dump;
+- check: TimelineCore.check_json, which decodes the whole file with the backend and validates it;
+- load: TimelineCore.from_json, the single-pass streaming load building the events.
+
+Usage:
+    python -m benchmark_json [--events 1000 100000 1000000] [--backends orjson json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmark import create_timeline
+from JsonBackend import BACKENDS, get_backend
+from Model import JsonModel
+from TimelineCore import TimelineCore
+
+DEFAULT_EVENT_COUNTS = [1000, 100000, 1000000]
+DEFAULT_DURATION = 3600  # s
+DEFAULT_ANIMATED_RATIO = 0.1
+
+
+class SerializationResult:
+    """Duration of a save or load of a timeline, and its throughput"""
+
+    def __init__(self, name: str, event_count: int, size: int, seconds: float) -> None:
+        self.name = name
+        self.event_count = event_count
+        self.size = size
+        self.seconds = seconds
+
+    @property
+    def events_per_second(self) -> float:
+        return self.event_count / self.seconds if self.seconds else 0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.size / 1e6 / self.seconds if self.seconds else 0
+
+    def to_string(self) -> str:
+        return (
+            f"{self.event_count} events, {self.name}: {self.seconds * 1000:.1f} ms, "
+            f"{self.events_per_second:.0f} events/s, {self.megabytes_per_second:.1f} MB/s"
+        )
+
+
+def save_as_list(timeline: TimelineCore, json_path: str):
+    """The former TimelineCore.to_json: the list of every event dict is built, then dumped"""
+    json_dict = {
+        JsonModel.NAME.value["name"]: timeline.name,
+        JsonModel.IP.value["name"]: timeline.ip,
+        JsonModel.PORT.value["name"]: timeline.port,
+        JsonModel.TIMELINE.value["name"]: [event.to_dict() for event in timeline.timeline.values()],
+    }
+    with open(json_path, "w") as json_file:
+        json.dump(json_dict, json_file)
+
+
+def measure(name: str, event_count: int, json_path: str, func) -> SerializationResult:
+    start_time = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start_time
+    return SerializationResult(name, event_count, os.path.getsize(json_path), seconds)
+
+
+def run_benchmark(
+    timeline: TimelineCore, backend_names: list[str], folder: str
+) -> list[SerializationResult]:
+    """
+    Saves and loads a timeline with each backend.
+
+    Args:
+        timeline (TimelineCore): The timeline.
+        backend_names (list[str]): Names of the backends compared.
+        folder (str): Folder of the saved files.
+    """
+    event_count = len(timeline.timeline)
+    json_path = os.path.join(folder, "timeline.json")
+    results = [
+        measure("save json (list)", event_count, json_path, lambda: save_as_list(timeline, json_path))
+    ]
+    for name in backend_names:
+        timeline.json_backend = get_backend(name)
+        results.append(
+            measure(f"save {name}", event_count, json_path, lambda: timeline.to_json(json_path))
+        )
+    for name in backend_names:
+        timeline.json_backend = get_backend(name)
+        results.append(
+            measure(f"check {name}", event_count, json_path, lambda: timeline.check_json(json_path))
+        )
+    results.append(measure("load", event_count, json_path, lambda: TimelineCore(json_path)))
+    return results
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmark_json",
+        description="Load and save throughput benchmark of the JSON timelines",
+    )
+    parser.add_argument(
+        "--events",
+        type=int,
+        nargs="+",
+        default=DEFAULT_EVENT_COUNTS,
+        help="Number of events of each synthetic timeline",
+    )
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=list(BACKENDS),
+        default=list(BACKENDS),
+        help="JSON backends compared, every backend installed by default",
+    )
+    parser.add_argument(
+        "--animated",
+        type=float,
+        default=DEFAULT_ANIMATED_RATIO,
+        help="Part of the events with an animated control",
+    )
+    return parser
+
+
+def main(argv: list[str] = None):
+    args = create_parser().parse_args(argv)
+    with tempfile.TemporaryDirectory() as folder:
+        for event_count in args.events:
+            timeline = create_timeline(event_count, DEFAULT_DURATION, args.animated)
+            for result in run_benchmark(timeline, args.backends, folder):
+                print(result.to_string())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""
+Headless command line player of the OSC Timeline.
+It plays a timeline saved as JSON or as a binary show (.oscb) without importing PyQt,
+e.g. on a show server without display.
+Several timelines given together are played on the same clock (see MultiPlayer.py).
+The convert command converts a timeline between the JSON and the binary formats (see BinaryShow.py).
+
+Usage:
+    python -m headless play show.json [other.json ...] [--start-at SECONDS] [--precision] [--lookahead SECONDS]
+                                      [--frame-rate FPS] [--min-delta DELTA] [--arbitration {last,blend}]
+                                      [--rate-limit MESSAGES] [--async] [--follow PORT]
+    python -m headless convert show.json show.oscb
+    python -m headless convert show.oscb show.json
+"""
+import argparse
+import sys
+import time
+
+from AnimationEngine import AnimationEngine, Arbitration
+from BinaryShow import binary_to_json, is_binary_path, json_to_binary
+from Control import DEFAULT_FRAME_RATE
+from TimelineCore import TimelineCore
+
+
+def configure_engine(engine: AnimationEngine, args: argparse.Namespace):
+    engine.frame_rate = args.frame_rate
+    engine.min_delta = args.min_delta
+    engine.arbitration = Arbitration(args.arbitration)
+
+
+def play(args: argparse.Namespace):
+    """
+    Loads the timelines and plays them until their end, or until Ctrl+C
+    """
+    if args.use_async and len(args.json_paths) > 1:
+        sys.exit("--async plays a single timeline")
+    if args.use_async and args.rate_limit:
+        # The async player sends through its own transports, without the rate limiter of the clients
+        sys.exit("--rate-limit is not supported with --async")
+    if args.follow and len(args.json_paths) > 1:
+        sys.exit("--follow plays a single timeline")
+    if args.follow and args.use_async:
+        # The external clock drives the thread of the timeline, not the async player
+        sys.exit("--follow is not supported with --async")
+
+    timelines = []
+    for json_path in args.json_paths:
+        timeline = TimelineCore(json_path)
+        timeline.log_message.connect(print)
+        timeline.scheduler.precision = args.precision
+        if args.lookahead:
+            timeline.set_lookahead(args.lookahead)
+        if args.rate_limit:
+            timeline.set_rate_limit(args.rate_limit)
+        configure_engine(timeline.animation_engine, args)
+        timelines.append(timeline)
+
+    if len(timelines) > 1:
+        # The players of the other modes are only imported when they are used, for a faster start
+        from MultiPlayer import MultiPlayer
+
+        player = MultiPlayer(timelines)
+        player.scheduler.precision = args.precision
+        configure_engine(player.animation_engine, args)
+        player.run(start_at=args.start_at)
+        try:
+            player.wait()
+        except KeyboardInterrupt:
+            player.stop()
+            player.wait()
+        return
+
+    timeline = timelines[0]
+    if args.follow:
+        from ExternalClock import ExternalClock
+
+        # The master starts, locates and drives the timeline until Ctrl+C
+        clock = ExternalClock(timeline, port=args.follow)
+        clock.start()
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            clock.stop()
+            timeline.stop_timeline()
+            timeline.wait_timeline()
+        return
+
+    if args.use_async:
+        import asyncio
+        from AsyncPlayer import AsyncPlayer
+
+        try:
+            asyncio.run(AsyncPlayer(timeline).play(start_at=args.start_at))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    timeline.run_timeline(start_at=args.start_at)
+    try:
+        timeline.wait_timeline()
+    except KeyboardInterrupt:
+        timeline.stop_timeline()
+        timeline.wait_timeline()
+
+
+def convert(args: argparse.Namespace):
+    """
+    Converts a timeline between the JSON and the binary formats, depending on the extensions of the paths
+    """
+    if is_binary_path(args.input_path) == is_binary_path(args.output_path):
+        sys.exit("convert goes from a JSON timeline to a binary show (.oscb), or the other way")
+    if is_binary_path(args.output_path):
+        json_to_binary(args.input_path, args.output_path)
+    else:
+        binary_to_json(args.input_path, args.output_path)
+    print(f"{args.input_path} converted to {args.output_path}")
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m headless", description="Headless OSC Timeline player"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    play_parser = subparsers.add_parser("play", help="Play timelines together")
+    play_parser.add_argument(
+        "json_paths", nargs="+", help="Paths of the timeline JSON files or binary shows (.oscb)"
+    )
+    play_parser.add_argument(
+        "--start-at",
+        type=float,
+        default=0,
+        help="Time from which the timeline starts, in seconds",
+    )
+    play_parser.add_argument(
+        "--precision",
+        action="store_true",
+        help="Spin before each event instead of only sleeping, for sub-millisecond timing",
+    )
+    play_parser.add_argument(
+        "--lookahead",
+        type=float,
+        default=0,
+        help="Send the unique controls this many seconds early, in timetagged bundles",
+    )
+    play_parser.add_argument(
+        "--frame-rate",
+        type=float,
+        default=DEFAULT_FRAME_RATE,
+        help="Frames per second of the animated controls without their own frame rate",
+    )
+    play_parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=0,
+        help="Skip the animation frames whose value changes by this much or less",
+    )
+    play_parser.add_argument(
+        "--arbitration",
+        choices=[policy.value for policy in Arbitration],
+        default=Arbitration.LAST.value,
+        help="Output of the fades sent to the same address: the last one started, or their average",
+    )
+    play_parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=0,
+        help="Maximum number of messages per second sent to the destination of the timeline",
+    )
+    play_parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Play on an asyncio event loop, each fade being a task instead of running in the engine thread",
+    )
+    play_parser.add_argument(
+        "--follow",
+        type=int,
+        default=0,
+        help="Follow the position of a master clock sent as /timeline/time messages on this UDP port",
+    )
+    play_parser.set_defaults(func=play)
+
+    convert_parser = subparsers.add_parser(
+        "convert", help="Convert a timeline between JSON and the binary show format"
+    )
+    convert_parser.add_argument("input_path", help="Path of the timeline to convert")
+    convert_parser.add_argument(
+        "output_path", help="Path of the converted timeline, a binary show if it ends with .oscb"
+    )
+    convert_parser.set_defaults(func=convert)
+
+    return parser
+
+
+def main(argv: list[str] = None):
+    args = create_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""
+Fakes and helpers shared by the tests sending OSC messages.
+"""
+import time
+from pythonosc.osc_bundle import OscBundle
+from pythonosc.osc_message import OscMessage
+
+
+def decode_dgram(dgram: bytes) -> list[OscMessage]:
+    """Returns the messages of an OSC datagram, a single message or a bundle"""
+    if OscBundle.dgram_is_bundle(dgram):
+        return list(OscBundle(dgram))
+    return [OscMessage(dgram)]
+
+
+class RecordingClient:
+    """
+    Fake OSC client keeping every message sent, instead of sending it.
+
+    Examples of use:
+        client = RecordingClient()
+        event.set_osc_client(client)
+        ...
+        client.messages     # [(address, first argument), ...]
+        client.times        # time.perf_counter() at which each message was sent
+        client.bundles      # OscBundle objects sent
+    """
+
+    def __init__(self):
+        self.messages = []
+        self.times = []
+        self.bundles = []
+        self.limiter = None
+
+    def _record(self, address, value):
+        self.messages.append((address, value))
+        self.times.append(time.perf_counter())
+
+    def send_message(self, address, value):
+        self._record(address, value)
+
+    def send_dgram(self, dgram):
+        if OscBundle.dgram_is_bundle(dgram):
+            self.bundles.append(OscBundle(dgram))
+        for message in decode_dgram(dgram):
+            self._record(message.address, message.params[0])
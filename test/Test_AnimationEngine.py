@@ -0,0 +1,157 @@
+import os
+import sys
+import time
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from Model import ControlMode
+from AnimationEngine import AnimationEngine, Arbitration
+from Event import Event
+from Control import Control
+from OscOutput import OscBatch
+from OscTestTools import RecordingClient
+
+
+@pytest.fixture
+def client():
+    return RecordingClient()
+
+
+@pytest.fixture
+def engine():
+    engine = AnimationEngine()
+    yield engine
+    engine.stop()
+
+
+def create_event(client, command, value, duration, frame_rate=None):
+    event = Event(
+        time=0,
+        command=command,
+        control=Control(
+            ControlMode.ANIMATED, value=value, duration=duration, frame_rate=frame_rate
+        ),
+    )
+    event.set_osc_client(client)
+    return event
+
+
+class TestAnimationEngine:
+    def test_trigger_returns_immediately(self, client, engine):
+        event = create_event(client, "/fade", [0, 1], 10)
+        start = time.perf_counter()
+        event.trigger(animation_engine=engine)
+        assert time.perf_counter() - start < 0.1
+        assert engine.active_fades == 1
+
+    def test_overlapping_fades(self, client, engine):
+        create_event(client, "/fade/1", [0, 1], 0.1).trigger(animation_engine=engine)
+        create_event(client, "/fade/2", [1, 0], 0.1).trigger(animation_engine=engine)
+        engine.join()
+        fade1 = [value for address, value in client.messages if address == "/fade/1"]
+        fade2 = [value for address, value in client.messages if address == "/fade/2"]
+        assert len(fade1) > 2 and len(fade2) > 2
+        assert fade1[-1] == 1 and fade2[-1] == 0
+        assert fade1 == sorted(fade1)
+        assert client.bundles
+
+    def test_stop_drops_fades(self, client, engine):
+        create_event(client, "/fade", [0, 1], 10).trigger(animation_engine=engine)
+        engine.stop()
+        engine.join()
+        assert engine.active_fades == 0
+
+    def test_offset(self, client, engine):
+        engine.add(create_event(client, "/fade", [0, 10], 10), offset=5)
+        time.sleep(0.05)
+        assert client.messages[0][1] >= 5
+
+    def test_constant_fade_sent_once(self, client, engine):
+        create_event(client, "/fade", [0.5, 0.5], 0.1).trigger(animation_engine=engine)
+        engine.join()
+        assert client.messages == [("/fade", 0.5)]
+
+    def test_control_frame_rate(self, client, engine):
+        create_event(client, "/slow", [0, 1], 0.1, frame_rate=20).trigger(
+            animation_engine=engine
+        )
+        create_event(client, "/fast", [0, 1], 0.1).trigger(animation_engine=engine)
+        engine.join()
+        slow = [value for address, value in client.messages if address == "/slow"]
+        fast = [value for address, value in client.messages if address == "/fast"]
+        assert len(slow) == 3
+        assert len(fast) > len(slow)
+        assert slow[-1] == fast[-1] == 1
+
+    def test_min_delta(self, client):
+        engine = AnimationEngine(min_delta=0.25)
+        create_event(client, "/fade", [0, 1], 0.1).trigger(animation_engine=engine)
+        engine.join()
+        values = [value for _, value in client.messages]
+        assert values[0] == 0 and values[-1] == 1
+        assert len(values) <= 5
+        assert all(b - a > 0.25 or b == 1 for a, b in zip(values, values[1:]))
+
+    def test_stop_group_forgets_values(self, client):
+        engine = AnimationEngine(min_delta=0.25)
+        engine.add(create_event(client, "/fade", [0, 1], 10), group=1)
+        time.sleep(0.05)
+        engine.stop(group=1)
+        # The first frame of the next fade is sent, even if close to the last value of the stopped one
+        engine.add(create_event(client, "/fade", [0.1, 1], 10), group=2)
+        time.sleep(0.05)
+        engine.stop()
+        assert len(client.messages) == 2
+        assert client.messages[1][1] == pytest.approx(0.1, abs=0.01)
+
+    def test_last_writer_wins(self, client, engine):
+        engine.pause()
+        create_event(client, "/fade", [0, 1], 0.1).trigger(animation_engine=engine)
+        create_event(client, "/fade", [5, 5], 0.1).trigger(animation_engine=engine)
+        assert engine.active_fades == 1
+        engine.resume()
+        engine.join()
+        assert client.messages == [("/fade", 5)]
+
+    def test_unique_releases_fade(self, client, engine):
+        create_event(client, "/fade", [0, 1], 10).trigger(animation_engine=engine)
+        unique_event = Event(time=0, command="/fade", control=Control(value=0.5))
+        unique_event.set_osc_client(client)
+        unique_event.trigger(animation_engine=engine, batch=OscBatch())
+        assert engine.active_fades == 0
+
+    def test_delayed_release(self, client, engine):
+        create_event(client, "/fade", [0, 1], 10).trigger(animation_engine=engine)
+        unique_event = Event(time=0, command="/fade", control=Control(value=0.5))
+        unique_event.set_osc_client(client)
+        unique_event.trigger(animation_engine=engine, batch=OscBatch(), delay=0.1)
+        assert engine.active_fades == 1
+        time.sleep(0.15)
+        assert engine.active_fades == 0
+
+        # A fade added after the time of the release keeps running
+        unique_event.trigger(animation_engine=engine, batch=OscBatch(), delay=0.05)
+        time.sleep(0.1)
+        create_event(client, "/fade", [0, 1], 10).trigger(animation_engine=engine)
+        time.sleep(0.05)
+        assert engine.active_fades == 1
+
+    def test_blend(self, client):
+        engine = AnimationEngine(arbitration=Arbitration.BLEND)
+        engine.pause()
+        create_event(client, "/fade", [0, 1], 0.1).trigger(animation_engine=engine)
+        create_event(client, "/fade", [1, 0], 0.1).trigger(animation_engine=engine)
+        engine.resume()
+        engine.join()
+        assert [value for _, value in client.messages] == [0.5]
+        assert not client.bundles
+
+    def test_pause_group(self, client, engine):
+        engine.add(create_event(client, "/paused", [0, 1], 0.05), group=1)
+        engine.add(create_event(client, "/running", [0, 1], 0.05), group=2)
+        engine.pause(group=1)
+        time.sleep(0.1)
+        assert engine.active_fades == 1
+        engine.resume(group=1)
+        engine.join()
+        assert client.messages[-1] == ("/paused", 1)
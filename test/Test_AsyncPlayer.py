@@ -0,0 +1,149 @@
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from Model import ControlMode
+from TimelineCore import TimelineCore, State
+from AsyncPlayer import AsyncPlayer
+from Event import Event
+from Control import Control
+from OscTestTools import decode_dgram
+
+
+@pytest.fixture
+def sink():
+    """Local UDP socket receiving the messages of the player"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.setblocking(False)
+    yield sock
+    sock.close()
+
+
+def received_messages(sock):
+    messages = []
+    while True:
+        try:
+            dgram = sock.recv(65536)
+        except BlockingIOError:
+            return messages
+        messages += [(message.address, message.params[0]) for message in decode_dgram(dgram)]
+
+
+@pytest.fixture
+def timeline(sink):
+    timeline = TimelineCore()
+    timeline.init_client(*sink.getsockname())
+    return timeline
+
+
+def add_event(timeline, time, command, control):
+    timeline.add_event(Event(time=time, command=command, control=control))
+
+
+class TestAsyncPlayer:
+    def test_play(self, timeline, sink):
+        add_event(timeline, 0.02, "/cue", Control(value=1))
+        add_event(timeline, 0, "/fade", Control(ControlMode.ANIMATED, value=[0, 1], duration=0.05))
+        add_event(timeline, 0.02, "/cue/2", Control(value="go"))
+        start = time.perf_counter()
+        asyncio.run(AsyncPlayer(timeline).play())
+        assert time.perf_counter() - start >= 0.05
+        assert timeline.state == State.NOT_RUNNING
+
+        messages = received_messages(sink)
+        fade = [value for address, value in messages if address == "/fade"]
+        assert fade[0] == 0 and fade[-1] == 1 and fade == sorted(fade)
+        assert ("/cue", 1) in messages and ("/cue/2", "go") in messages
+
+    def test_many_fades_one_thread(self, timeline, sink):
+        # Few frames per fade, so that the sink does not drop the datagrams
+        timeline.animation_engine.min_delta = 0.5
+        sink.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        for idx in range(500):
+            add_event(
+                timeline, 0, f"/fade/{idx}", Control(ControlMode.ANIMATED, value=[0, 1], duration=0.05)
+            )
+        final_values = {}
+
+        async def run():
+            # Read the sink on the loop of the player, so that its buffer does not overflow
+            loop = asyncio.get_running_loop()
+            loop.add_reader(
+                sink, lambda: final_values.update(received_messages(sink))
+            )
+            await AsyncPlayer(timeline).play()
+            await asyncio.sleep(0.05)
+            loop.remove_reader(sink)
+            final_values.update(received_messages(sink))
+
+        threads = threading.active_count()
+        asyncio.run(run())
+        assert threading.active_count() == threads
+        assert len(final_values) == 500
+        assert all(value == 1 for value in final_values.values())
+
+    def test_start_at_and_stop(self, timeline, sink):
+        add_event(timeline, 0, "/fade", Control(ControlMode.ANIMATED, value=[0, 10], duration=10))
+        add_event(timeline, 60, "/cue", Control(value=1))
+        player = AsyncPlayer(timeline)
+
+        async def run():
+            task = asyncio.create_task(player.play(start_at=5))
+            await asyncio.sleep(0.05)
+            assert player.active_fades == 1
+            player.stop()
+            await task
+
+        start = time.perf_counter()
+        asyncio.run(run())
+        assert time.perf_counter() - start < 1
+        messages = received_messages(sink)
+        assert messages[0][1] >= 5
+        assert ("/cue", 1) not in messages
+
+    def test_concurrent_sends_share_endpoint(self, timeline, sink):
+        player = AsyncPlayer(timeline)
+        dgram = Event(time=0, command="/cue", control=Control(value=1)).encode(1)
+        transports = []
+
+        async def run():
+            # Count the endpoints opened by the loop
+            loop = asyncio.get_running_loop()
+            create_datagram_endpoint = loop.create_datagram_endpoint
+
+            async def counted(*args, **kwargs):
+                endpoint = await create_datagram_endpoint(*args, **kwargs)
+                transports.append(endpoint[0])
+                return endpoint
+
+            loop.create_datagram_endpoint = counted
+            await asyncio.gather(*(player._send(sink.getsockname(), [dgram]) for _ in range(3)))
+            await asyncio.sleep(0.01)
+            player._close_transports()
+
+        asyncio.run(run())
+        assert len(transports) == 1
+        assert received_messages(sink) == [("/cue", 1)] * 3
+
+    def test_lookahead_releases_fade_at_cue(self, timeline, sink):
+        add_event(timeline, 0, "/fade", Control(ControlMode.ANIMATED, value=[0, 1], duration=1))
+        add_event(timeline, 0.4, "/fade", Control(value=5))
+        timeline.set_lookahead(0.25)
+        player = AsyncPlayer(timeline)
+
+        async def run():
+            task = asyncio.create_task(player.play())
+            # The cue is sent ahead at 0.15 s, the fade runs until 0.4 s
+            await asyncio.sleep(0.3)
+            assert player.active_fades == 1
+            await asyncio.sleep(0.2)
+            assert player.active_fades == 0
+            await task
+
+        asyncio.run(run())
@@ -0,0 +1,23 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from benchmark import create_timeline, run_benchmark, UdpSink
+from OscOutput import encode_bundle
+
+
+class TestBenchmark:
+    def test_sink_addresses(self):
+        message = b"/cue/1\x00\x00,i\x00\x00\x00\x00\x00\x01"
+        assert UdpSink.addresses(message) == [b"/cue/1"]
+        assert UdpSink.addresses(encode_bundle([message, message])) == [b"/cue/1", b"/cue/1"]
+
+    def test_run(self):
+        timeline = create_timeline(100, duration=0.2, animated_ratio=0.1)
+        assert len(timeline.timeline) == 100
+        result = run_benchmark(timeline, "thread")
+        assert result.expected == 90
+        assert result.lost == 0
+        assert result.messages > 90
+        assert 0 <= result.latency.min <= result.latency.p99 < 0.1
+        assert "lost 0/90" in result.to_string()
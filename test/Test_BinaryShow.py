@@ -0,0 +1,126 @@
+import json
+import os
+import sys
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from BinaryShow import BinaryShow, BinaryShowWriter, binary_to_json, json_to_binary
+from Control import Control
+from Event import Event
+from headless import main
+from Model import ControlMode
+from TimelineCore import TimelineCore
+
+JSON_FOLDER = "test/json_config"
+
+
+@pytest.fixture
+def valid_json_paths(folder_path=JSON_FOLDER):
+    return [
+        os.path.join(folder_path, file)
+        for file in os.listdir(folder_path)
+        if file.startswith("valid_")
+    ]
+
+
+class TestBinaryShow:
+    def test_round_trip(self, tmp_path):
+        events = [
+            Event(1, "/unique/int", Control(value=3)),
+            Event(1.25, "/unique/float", Control(value=0.5)),
+            Event(2, "/unique/str", Control(value="clip"), destination=("10.0.0.2", 9000)),
+            Event(
+                3,
+                "/animated",
+                Control(ControlMode.ANIMATED, value=[0, 1], duration=2, easing="ease_in", frame_rate=25),
+            ),
+            Event(
+                4.5,
+                "/animated",
+                Control(ControlMode.ANIMATED, value=[1, 0.5], duration=1.5, easing=[0.42, 0, 0.58, 1]),
+            ),
+            Event(6, "/envelope", Control(ControlMode.ENVELOPE, value=[[0, 0], [1, 1], [1.5, 0.25]])),
+        ]
+        binary_path = tmp_path / "show.oscb"
+        writer = BinaryShowWriter(binary_path)
+        for event in events:
+            writer.add(event)
+        writer.close("Show", "127.0.0.1", 7000)
+
+        with BinaryShow(binary_path) as show:
+            assert (show.name, show.ip, show.port) == ("Show", "127.0.0.1", 7000)
+            assert len(show) == len(events)
+            assert [show.time(index) for index in range(len(show))] == [1, 1.25, 2, 3, 4.5, 6]
+            assert isinstance(show.time(0), int)
+            assert list(show) == events
+            assert show[-1] == events[-1]
+            # The unique values keep their type, since it is their OSC type tag
+            assert isinstance(show[0].control.value, int)
+            assert isinstance(show[1].control.value, float)
+            with pytest.raises(IndexError):
+                show[len(events)]
+
+    def test_strings_interned(self, tmp_path):
+        binary_path = tmp_path / "show.oscb"
+        writer = BinaryShowWriter(binary_path)
+        for index in range(100):
+            writer.add(Event(index, "/same/command/for/every/event"))
+        writer.close("Show", "127.0.0.1", 7000)
+        # One record per event, the command being stored once
+        assert os.path.getsize(binary_path) < 100 * 64 + 200
+
+    def test_json_conversion(self, valid_json_paths, tmp_path):
+        for json_path in valid_json_paths:
+            binary_path = tmp_path / "show.oscb"
+            json_to_binary(json_path, binary_path)
+            expected = TimelineCore(json_path)
+            timeline = TimelineCore(str(binary_path))
+            assert (timeline.name, timeline.ip, timeline.port) == (
+                expected.name,
+                expected.ip,
+                expected.port,
+            )
+            assert timeline.timeline == expected.timeline
+
+            converted_path = tmp_path / "show.json"
+            binary_to_json(binary_path, converted_path)
+            assert TimelineCore(str(converted_path)).timeline == expected.timeline
+
+    def test_save(self, tmp_path):
+        timeline = TimelineCore()
+        timeline.add_event(Event(1, "/cue", Control(value=1)))
+        binary_path = str(tmp_path / "show.oscb")
+        timeline.save(binary_path)
+        assert TimelineCore(binary_path).timeline == timeline.timeline
+
+    def test_invalid_file(self, tmp_path):
+        json_path = os.path.join(JSON_FOLDER, "valid_1.json")
+        with pytest.raises(ValueError):
+            BinaryShow(json_path)
+        with pytest.raises(Exception):
+            json_to_binary(os.path.join(JSON_FOLDER, "invalid_key2.json"), tmp_path / "show.oscb")
+        # No truncated show is left behind
+        assert os.listdir(tmp_path) == []
+
+    def test_failed_conversion_keeps_show(self, tmp_path):
+        binary_path = tmp_path / "show.oscb"
+        json_to_binary(os.path.join(JSON_FOLDER, "valid_1.json"), binary_path)
+        content = binary_path.read_bytes()
+        with pytest.raises(Exception):
+            json_to_binary(os.path.join(JSON_FOLDER, "invalid_key2.json"), binary_path)
+        assert binary_path.read_bytes() == content
+        with BinaryShow(binary_path) as show:
+            assert show.name == "MyTimeline"
+
+    def test_convert_command(self, tmp_path):
+        json_path = os.path.join(JSON_FOLDER, "valid_2.json")
+        binary_path = str(tmp_path / "show.oscb")
+        converted_path = str(tmp_path / "show.json")
+        main(["convert", json_path, binary_path])
+        main(["convert", binary_path, converted_path])
+        with open(json_path, "r") as json_file, open(converted_path, "r") as converted_file:
+            expected_dict, converted_dict = json.load(json_file), json.load(converted_file)
+        assert converted_dict["name"] == expected_dict["name"]
+        assert len(converted_dict["timeline"]) == len(expected_dict["timeline"])
+        with pytest.raises(SystemExit):
+            main(["convert", json_path, converted_path])
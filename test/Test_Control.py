@@ -14,6 +14,7 @@ def valid_controls():
         Control(ControlMode.UNIQUE, value="add"),
         Control(ControlMode.ANIMATED, value=[1, 2], duration=2),
         Control(ControlMode.ANIMATED, value=10, duration=4),
+        Control(ControlMode.ENVELOPE, value=[[0, 0], [1, 1], [3, 0]]),
     ]
 
 
@@ -24,6 +25,7 @@ def valid_controls_dict():
         {"control_mode": "unique", "value": "add"},
         {"control_mode": "animated", "value": [1, 2], "duration": 2},
         {"control_mode": "animated", "value": [10, 10], "duration": 4},
+        {"control_mode": "envelope", "value": [[0, 0], [1, 1], [3, 0]]},
     ]
 
 
@@ -36,6 +38,9 @@ def invalid_controls_dict():
         {"control_mode": "animated", "value": ["str", "str2"], "duration": 2},
         {"control_mode": "animated", "value": "str", "duration": 2},
         {"control_mode": "unique", "value": [2, 3]},
+        {"control_mode": "envelope", "value": []},
+        {"control_mode": "envelope", "value": [[0, 1], [0, 2]]},
+        {"control_mode": "envelope", "value": [[0, 1, 2]]},
     ]
 
 
@@ -82,3 +87,20 @@ class TestControl:
         """
         with pytest.raises(Exception):
             Control.from_dict({"control_mode": "invalid", "value": 2})
+
+    def test_envelope_value_at(self):
+        control = Control(ControlMode.ENVELOPE, value=[[1, 0], [2, 1], [5, 1], [6, -1]])
+        assert control.duration == 6
+        assert control.value_at(0) == 0
+        assert control.value_at(1.5) == pytest.approx(0.5)
+        assert control.value_at(3) == 1
+        assert control.value_at(5.75) == pytest.approx(-0.5)
+        assert control.value_at(10) == -1
+
+    def test_envelope_mode_change(self):
+        control = Control(ControlMode.UNIQUE, value=1)
+        control.mode = ControlMode.ENVELOPE
+        assert control.is_animated
+        assert control.duration == control.value[-1][0]
+        with pytest.raises(ValueError):
+            control.value = [[1, 0], [0, 1]]
@@ -0,0 +1,79 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from Model import ControlMode
+from Control import Control
+from Curve import Curve, easing_table, ease
+
+
+class TestCurve:
+    def test_linear(self):
+        curve = Curve.fade(0, 1, duration=2, frame_rate=50)
+        assert len(curve) == 101
+        assert curve.times[-1] == 2
+        assert curve.values[0] == 0
+        assert curve.values[-1] == 1
+        assert np.all(np.diff(curve.values) > 0)
+
+    def test_duration_not_multiple_of_frame(self):
+        curve = Curve.fade(0, 10, duration=0.025, frame_rate=100)
+        assert curve.times.tolist() == pytest.approx([0, 0.01, 0.02, 0.025])
+        assert curve.values[-1] == 10
+
+    def test_value_at(self):
+        curve = Curve.fade(0, 1, duration=1, frame_rate=10)
+        assert curve.value_at(-1) == 0
+        assert curve.value_at(0.55) == pytest.approx(0.5)
+        assert curve.value_at(5) == 1
+        assert type(curve.value_at(0.55)) is float
+
+    def test_control_curve_cached_until_edit(self):
+        control = Control(ControlMode.ANIMATED, value=[0, 1], duration=1)
+        curve = control.get_curve(100)
+        assert control.get_curve(100) is curve
+        control.value = [1, 0]
+        assert control.get_curve(100) is not curve
+        assert control.get_curve(100).values[-1] == 0
+
+    def test_easings(self):
+        for easing in ["linear", "ease_in", "ease_out", "ease_in_out", "exponential", "step"]:
+            curve = Curve.fade(0, 1, duration=1, frame_rate=100, easing=easing)
+            assert curve.values[0] == pytest.approx(0)
+            assert curve.values[-1] == pytest.approx(1)
+            assert np.all(np.diff(curve.values) >= 0)
+
+        assert Curve.fade(0, 1, 1, 100, easing="ease_in").value_at(0.5) < 0.5
+        assert Curve.fade(0, 1, 1, 100, easing="ease_out").value_at(0.5) > 0.5
+        assert Curve.fade(0, 1, 1, 100, easing="step").value_at(0.99) == 0
+
+    def test_bezier(self):
+        # The Bezier with control points on the diagonal is linear
+        assert ease(0.3, [1 / 3, 1 / 3, 2 / 3, 2 / 3]) == pytest.approx(0.3, abs=1e-4)
+        assert ease(0.5, [0.42, 0, 0.58, 1]) == pytest.approx(0.5, abs=1e-3)
+        assert ease(0.25, [0.42, 0, 0.58, 1]) < 0.25
+
+    def test_easing_table_cached(self):
+        assert easing_table("ease_in") is easing_table("ease_in")
+        assert easing_table([0.42, 0, 0.58, 1]) is easing_table([0.42, 0, 0.58, 1])
+
+    def test_control_easing(self):
+        control = Control(ControlMode.ANIMATED, value=[0, 1], duration=1, easing="ease_in")
+        assert control.value_at(0.5) == pytest.approx(0.125, abs=1e-3)
+        assert control.get_curve(100).value_at(0.5) == pytest.approx(0.125, abs=1e-3)
+        with pytest.raises(ValueError):
+            Control(ControlMode.ANIMATED, value=[0, 1], duration=1, easing="bounce")
+        with pytest.raises(ValueError):
+            Control(ControlMode.ANIMATED, value=[0, 1], duration=1, easing=[2, 0, 0.5, 1])
+
+    def test_envelope(self):
+        keyframes = [[0.5, 0], [1, 1], [1.5, 1], [2, 0]]
+        curve = Curve.envelope(keyframes, frame_rate=20)
+        control = Control(ControlMode.ENVELOPE, value=keyframes)
+        assert len(curve) == 41
+        assert curve.values.tolist() == pytest.approx(
+            [control.value_at(t) for t in curve.times]
+        )
+        assert control.get_curve(20).values[-1] == 0
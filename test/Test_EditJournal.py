@@ -0,0 +1,139 @@
+import json
+import os
+import shutil
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from Control import Control
+from EditJournal import ADD, CHANGE, REMOVE, EditJournal, file_checksum
+from Event import Event
+from Model import ControlMode
+from TimelineCore import TimelineCore
+
+JSON_FOLDER = "test/json_config"
+
+
+def copy_timeline(tmp_path, file="valid_1.json") -> str:
+    json_path = str(tmp_path / file)
+    shutil.copy(os.path.join(JSON_FOLDER, file), json_path)
+    return json_path
+
+
+def journal_entries(json_path: str) -> list[dict]:
+    return EditJournal.read(json_path + ".journal")
+
+
+class TestEditJournal:
+    def test_record(self, tmp_path):
+        journal_path = str(tmp_path / "show.json.journal")
+        journal = EditJournal(journal_path, sync_interval=10)
+        journal.reset(checksum=1, ids=[1, 2])
+        journal.record(ADD, 3, {"time": 1})
+        journal.record(CHANGE, 2, None, attribute="destination")
+        journal.record(REMOVE, 1)
+        assert journal.entries == 3
+        journal.close()
+
+        # A last entry cut by a crash is ignored
+        with open(journal_path, "a") as journal_file:
+            journal_file.write('{"op": "remove", "i')
+        assert EditJournal.read(journal_path) == [
+            {"op": "base", "checksum": 1, "ids": [1, 2]},
+            {"op": "add", "id": 3, "value": {"time": 1}},
+            {"op": "change", "id": 2, "attribute": "destination", "value": None},
+            {"op": "remove", "id": 1},
+        ]
+
+    def test_sync_batching(self, tmp_path):
+        journal_path = str(tmp_path / "show.json.journal")
+        journal = EditJournal(journal_path, sync_interval=10)
+        journal.reset(checksum=1, ids=[])
+        for index in range(10):
+            journal.record(REMOVE, index)
+        # The burst waits for a single sync, by the timer or an explicit call
+        assert journal._timer is not None
+        journal.sync()
+        assert journal._timer is None
+        assert len(EditJournal.read(journal_path)) == 11
+        journal.close()
+
+    def test_control_edit_notified(self):
+        attributes = []
+        event = Event(1, "/fade", Control(ControlMode.ANIMATED, value=[0, 1], duration=1))
+        event.set_change_callback(lambda event, attribute: attributes.append(attribute))
+        event.control.duration = 2
+        event.control.mode = ControlMode.UNIQUE
+        old_control = event.control
+        event.control = Control(value=3)
+        old_control.value = 4
+        assert attributes == ["control", "control", "control"]
+
+
+class TestTimelineJournal:
+    def test_recovery(self, tmp_path):
+        json_path = copy_timeline(tmp_path)
+        timeline = TimelineCore(json_path)
+        assert timeline.open_journal(json_path) == 0
+
+        first_id, second_id = list(timeline.timeline)[:2]
+        new_id = timeline.add_event(Event(12, "/new", Control(value="clip")))
+        timeline.remove_event(first_id)
+        timeline.timeline[second_id].time = 7.5
+        timeline.timeline[second_id].command = "/renamed"
+        timeline.timeline[second_id].destination = ("10.0.0.2", 9000)
+        timeline.timeline[new_id].control.value = "other clip"
+        # Crash: the edits are only in the journal
+        timeline.close_journal()
+
+        recovered = TimelineCore(json_path)
+        assert recovered.timeline != timeline.timeline
+        assert recovered.open_journal(json_path) == 6
+        assert recovered.timeline == timeline.timeline
+        assert recovered.last_id == timeline.last_id
+
+        # The recovered edits are kept until the next save
+        recovered.close_journal()
+        assert TimelineCore(json_path).open_journal(json_path) == 6
+
+    def test_save_compacts(self, tmp_path):
+        json_path = copy_timeline(tmp_path)
+        timeline = TimelineCore(json_path)
+        timeline.open_journal(json_path)
+        index = timeline.add_event(Event(12, "/new"))
+        timeline.remove_event(list(timeline.timeline)[0])
+        timeline.save(json_path)
+        assert [entry["op"] for entry in journal_entries(json_path)] == ["base"]
+
+        # The ids of the events survive the compaction
+        timeline.timeline[index].time = 13
+        timeline.close_journal()
+        recovered = TimelineCore(json_path)
+        assert recovered.open_journal(json_path) == 1
+        assert recovered.timeline == timeline.timeline
+
+    def test_compact_threshold(self, tmp_path):
+        json_path = copy_timeline(tmp_path)
+        timeline = TimelineCore(json_path)
+        timeline.open_journal(json_path, compact_threshold=5)
+        for time in range(5):
+            timeline.add_event(Event(time, "/cue"))
+        assert [entry["op"] for entry in journal_entries(json_path)] == ["base"]
+        assert TimelineCore(json_path).timeline == timeline.timeline
+
+    def test_stale_journal_ignored(self, tmp_path):
+        json_path = copy_timeline(tmp_path)
+        timeline = TimelineCore(json_path)
+        timeline.open_journal(json_path)
+        timeline.add_event(Event(12, "/new"))
+        timeline.close_journal()
+
+        # The main file changed since the journal was started
+        with open(json_path, "r") as json_file:
+            json_dict = json.load(json_file)
+        json_dict["name"] = "Edited elsewhere"
+        with open(json_path, "w") as json_file:
+            json.dump(json_dict, json_file)
+
+        reloaded = TimelineCore(json_path)
+        assert reloaded.open_journal(json_path) == 0
+        assert journal_entries(json_path)[0]["checksum"] == file_checksum(json_path)
@@ -1,6 +1,8 @@
 import os
 import sys
 import pytest
+from pythonosc.osc_message import OscMessage
+from pythonosc.osc_message_builder import build_msg
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from Model import ControlMode, EventModel
@@ -41,10 +43,38 @@ def valid_events_dict():
 
 
 class TestEvent:
+    def test_event_destination_dict(self):
+        event_dict = {
+            "time": 1,
+            "command": "/lights/1",
+            "control": {"control_mode": "unique", "value": 1},
+            "destination": {"ip": "192.168.0.12", "port": 9000},
+        }
+        event = Event.from_dict(event_dict)
+        assert event.destination == ("192.168.0.12", 9000)
+        assert event.to_dict() == event_dict
+
     def test_event_to_dict(self, valid_events, valid_events_dict):
         for event_to_test, expected_event_dict in zip(valid_events, valid_events_dict):
             assert event_to_test.to_dict() == expected_event_dict
 
     def test_event_from_dict(self, valid_events_dict):
         for event_dict in valid_events_dict:
-            event_to_test = Event.from_dict(event_dict)
\ No newline at end of file
+            event_to_test = Event.from_dict(event_dict)
+
+    def test_event_encode(self):
+        event = Event(time=0, command="/layers/1/opacity")
+        for value in [0.5, 3, "connect"]:
+            assert event.encode(value) == build_msg("/layers/1/opacity", value).dgram
+
+    def test_event_encode_int64(self):
+        event = Event(time=0, command="/frame")
+        for value in [2**31, -(2**31) - 1]:
+            assert OscMessage(event.encode(value)).params == [value]
+        assert OscMessage(event.encode(-(2**31))).params == [-(2**31)]
+
+    def test_event_encode_cache_invalidated(self):
+        event = Event(time=0, command="/layers/1/opacity")
+        event.encode(0.5)
+        event.command = "/layers/2/opacity"
+        assert OscMessage(event.encode(0.5)).address == "/layers/2/opacity"
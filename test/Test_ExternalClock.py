@@ -0,0 +1,107 @@
+import os
+import random
+import sys
+import time
+import pytest
+from pythonosc.udp_client import SimpleUDPClient
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from ExternalClock import ClockEstimator, ExternalClock
+from TimelineCore import TimelineCore, State
+from Event import Event
+from Control import Control
+from OscTestTools import RecordingClient
+
+
+class TestClockEstimator:
+    def test_drift_and_jitter(self):
+        estimator = ClockEstimator()
+        random.seed(0)
+        for idx in range(32):
+            local_time = idx * 0.04
+            jitter = random.uniform(-0.002, 0.002)
+            assert not estimator.add(local_time + jitter, 10 + local_time * 1.01)
+        assert estimator.rate == pytest.approx(1.01, abs=0.005)
+        assert estimator.position(2) == pytest.approx(12.02, abs=0.003)
+
+    def test_jump(self):
+        estimator = ClockEstimator(jump_threshold=0.5)
+        estimator.add(0, 0)
+        estimator.add(0.1, 0.1)
+        assert estimator.add(0.2, 30)
+        assert len(estimator) == 1
+        assert estimator.position(0.3) == pytest.approx(30.1)
+
+
+class TestExternalClock:
+    def follow(self, clock, master, positions, period=0.02):
+        for position in positions:
+            master.send_message(clock.address, position)
+            time.sleep(period)
+
+    def test_follow_master(self):
+        timeline = TimelineCore()
+        client = RecordingClient()
+        event = Event(10.3, "/cue", Control(value=1))
+        timeline.add_event(event)
+        event.set_osc_client(client)
+        timeline.add_event(Event(60, "/end", Control(value=1)))
+
+        clock = ExternalClock(timeline, port=0, ip="127.0.0.1")
+        clock.start()
+        master = SimpleUDPClient("127.0.0.1", clock.port)
+        try:
+            # The master starts at 10 s and runs 2 % faster than the local clock
+            start = time.perf_counter()
+            self.follow(clock, master, [10 + 0.02 * idx * 1.02 for idx in range(25)])
+            assert timeline.state == State.RUNNING
+            assert abs(clock.error) < 0.02
+            assert len(client.times) == 1
+            # The cue is sent when the master reaches 10.3 s, not when the local clock does
+            assert client.times[0] - start == pytest.approx(0.3 / 1.02, abs=0.03)
+
+            # The master locates to 30 s
+            self.follow(clock, master, [30, 30.02, 30.04])
+            assert timeline.scheduler.elapsed() == pytest.approx(30.06, abs=0.05)
+        finally:
+            clock.stop()
+            timeline.stop_timeline()
+            timeline.wait_timeline()
+
+    def test_stalled_master(self):
+        timeline = TimelineCore()
+        timeline.add_event(Event(60, "/end", Control(value=1)))
+        messages = []
+        timeline.log_message.connect(messages.append)
+        clock = ExternalClock(timeline, port=0, stall_time=0.1)
+
+        def follow(positions, period=0.02):
+            for position in positions:
+                clock.handle_position(clock.address, position)
+                time.sleep(period)
+
+        try:
+            follow([10 + 0.02 * idx for idx in range(10)])
+            assert timeline.state == State.RUNNING
+            # The master is paused: it keeps sending the same position
+            follow([10.2] * 40)
+            assert timeline.state == State.PAUSED and clock.stalled
+            assert timeline.scheduler.elapsed() == pytest.approx(10.2, abs=0.01)
+            assert not any("jumped" in message for message in messages)
+
+            follow([10.2 + 0.02 * idx for idx in range(1, 10)])
+            assert timeline.state == State.RUNNING and not clock.stalled
+            assert abs(clock.error) < 0.05
+        finally:
+            timeline.stop_timeline()
+            timeline.wait_timeline()
+
+    def test_invalid_messages_ignored(self):
+        timeline = TimelineCore()
+        timeline.add_event(Event(60, "/end", Control(value=1)))
+        clock = ExternalClock(timeline, port=0)
+        clock.handle_position(clock.address)
+        clock.handle_position(clock.address, "12.5")
+        clock.handle_position(clock.address, True)
+        assert len(clock.estimator) == 0
+        assert not timeline.is_running
@@ -0,0 +1,82 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from headless import main
+
+JSON_FOLDER = "test/json_config"
+
+
+def run_python(code: str, *args: str) -> subprocess.CompletedProcess:
+    """Runs code in a new interpreter, from the root of the repository"""
+    return subprocess.run(
+        [sys.executable, "-c", code, *args],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True,
+    )
+
+
+class TestHeadless:
+    def test_players_imported_on_use(self):
+        result = run_python(
+            "import sys; import headless; "
+            "print(sorted({'AsyncPlayer', 'MultiPlayer', 'ExternalClock'} & set(sys.modules)))"
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "[]"
+
+    def test_async_rate_limit_rejected(self):
+        path = os.path.join(JSON_FOLDER, "valid_1.json")
+        with pytest.raises(SystemExit) as error:
+            main(["play", path, "--async", "--rate-limit", "100"])
+        assert "--rate-limit" in str(error.value)
+
+    def test_play_without_qt(self, tmp_path):
+        sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sink.bind(("127.0.0.1", 0))
+        sink.settimeout(1)
+        ip, port = sink.getsockname()
+        json_path = tmp_path / "show.json"
+        json_path.write_text(
+            json.dumps(
+                {
+                    "name": "Show",
+                    "ip": ip,
+                    "listening_port": port,
+                    "timeline": [
+                        {"time": 0, "command": "/cue", "control": {"control_mode": "unique", "value": 1}},
+                        {
+                            "time": 0,
+                            "command": "/fade",
+                            "control": {"control_mode": "animated", "value": [0, 1], "duration": 0.05},
+                        },
+                    ],
+                }
+            )
+        )
+
+        # PyQt6 cannot be imported in the interpreter of the player
+        result = run_python(
+            "import sys; sys.modules['PyQt6'] = None; "
+            "from headless import main; main(['play', sys.argv[1]])",
+            str(json_path),
+        )
+        try:
+            assert result.returncode == 0, result.stderr
+            assert sink.recv(65536)
+        finally:
+            sink.close()
+
+    def test_follow_combinations_rejected(self):
+        path = os.path.join(JSON_FOLDER, "valid_1.json")
+        with pytest.raises(SystemExit) as error:
+            main(["play", path, path, "--follow", "9000"])
+        assert "--follow" in str(error.value)
+        with pytest.raises(SystemExit) as error:
+            main(["play", path, "--async", "--follow", "9000"])
+        assert "--follow" in str(error.value)
@@ -0,0 +1,50 @@
+import io
+import json
+import os
+import sys
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from benchmark import create_timeline
+from benchmark_json import run_benchmark
+from JsonBackend import BACKENDS, dump_timeline, get_backend
+from TimelineCore import TimelineCore
+
+
+class TestJsonBackend:
+    def test_default_backend(self):
+        assert get_backend() is next(iter(BACKENDS.values()))
+        assert get_backend("json").name == "json"
+        with pytest.raises(ValueError):
+            get_backend("unknown")
+
+    @pytest.mark.parametrize("name", list(BACKENDS))
+    @pytest.mark.parametrize("count", [0, 1, 4, 5])
+    def test_dump_timeline(self, name, count):
+        header = {"name": "Scène", "listening_port": 7000}
+        items = [{"time": index, "command": f"/cue/{index}"} for index in range(count)]
+        file = io.BytesIO()
+        dump_timeline(file, header, "timeline", iter(items), get_backend(name), chunk_size=2)
+        assert json.loads(file.getvalue()) == {**header, "timeline": items}
+
+    def test_dump_empty_header(self):
+        file = io.BytesIO()
+        dump_timeline(file, {}, "timeline", [1, 2])
+        assert json.loads(file.getvalue()) == {"timeline": [1, 2]}
+
+    @pytest.mark.parametrize("name", list(BACKENDS))
+    def test_to_json(self, name, tmp_path):
+        timeline = create_timeline(50, duration=10, animated_ratio=0.2)
+        timeline.json_backend = get_backend(name)
+        json_path = str(tmp_path / "timeline.json")
+        timeline.to_json(json_path)
+        assert timeline.check_json(json_path)["timeline"] == [
+            event.to_dict() for event in timeline.timeline.values()
+        ]
+        assert TimelineCore(json_path).timeline == timeline.timeline
+
+    def test_benchmark(self, tmp_path):
+        timeline = create_timeline(20, duration=10, animated_ratio=0.1)
+        results = run_benchmark(timeline, list(BACKENDS), str(tmp_path))
+        assert len(results) == 2 + 2 * len(BACKENDS)
+        assert all(result.event_count == 20 and result.size > 0 for result in results)
@@ -0,0 +1,127 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from Model import ControlMode
+from TimelineCore import TimelineCore, State
+from MultiPlayer import MultiPlayer
+from Event import Event
+from Control import Control
+from OscTestTools import RecordingClient
+
+
+def create_timeline(client, events):
+    timeline = TimelineCore()
+    for event in events:
+        timeline.add_event(event)
+        event.set_osc_client(client)
+    return timeline
+
+
+class TestMultiPlayer:
+    def test_merged_streams(self):
+        client = RecordingClient()
+        video = create_timeline(
+            client, [Event(0.01, "/video", Control(value=1)), Event(0.05, "/video", Control(value=2))]
+        )
+        lights = create_timeline(
+            client, [Event(0.03, "/lights", Control(value=1)), Event(0.05, "/lights", Control(value=2))]
+        )
+        player = MultiPlayer([video, lights])
+        threads = threading.active_count()
+        player.run()
+        player.wait()
+
+        assert client.messages == [
+            ("/video", 1),
+            ("/lights", 1),
+            ("/video", 2),
+            ("/lights", 2),
+        ]
+        assert player.scheduler.stats.count == 4
+        assert video.state == lights.state == State.NOT_RUNNING
+        # One thread for the player, plus the thread of the shared animation engine at most
+        assert threading.active_count() <= threads + 1
+
+    def test_pause_one_timeline(self):
+        client = RecordingClient()
+        paused = create_timeline(client, [Event(0.05, "/paused", Control(value=1))])
+        running = create_timeline(client, [Event(0.05, "/running", Control(value=1))])
+        player = MultiPlayer([paused, running])
+        player.run()
+        start = time.perf_counter()
+        player.pause(0)
+        assert paused.state == State.PAUSED
+        time.sleep(0.1)
+        assert [address for address, _ in client.messages] == ["/running"]
+
+        player.resume(0)
+        player.wait()
+        address, _ = client.messages[-1]
+        sent_time = client.times[-1]
+        assert address == "/paused"
+        assert sent_time - start >= 0.15
+
+    def test_stop_one_timeline(self):
+        client = RecordingClient()
+        stopped = create_timeline(
+            client,
+            [
+                Event(0, "/fade", Control(ControlMode.ANIMATED, value=[0, 1], duration=10)),
+                Event(0.05, "/stopped", Control(value=1)),
+            ],
+        )
+        running = create_timeline(client, [Event(0.05, "/running", Control(value=1))])
+        player = MultiPlayer([stopped, running])
+        player.run()
+        time.sleep(0.02)
+        player.stop(0)
+        player.wait()
+        addresses = {address for address, _ in client.messages}
+        assert "/running" in addresses and "/stopped" not in addresses
+        assert player.animation_engine.active_fades == 0
+
+    def test_engines_restored(self):
+        client = RecordingClient()
+        timeline = create_timeline(
+            client, [Event(0, "/fade", Control(ControlMode.ANIMATED, value=[0, 1], duration=0.02))]
+        )
+        animation_engine = timeline.animation_engine
+        player = MultiPlayer([timeline])
+        player.run()
+        player.wait()
+        assert timeline.animation_engine is animation_engine
+
+        # The timeline is played on its own afterwards
+        client.messages.clear()
+        timeline.run_timeline()
+        time.sleep(0.1)
+        assert client.messages[-1] == ("/fade", 1)
+        assert timeline.state == State.NOT_RUNNING
+
+    def test_pause_before_thread_start(self):
+        client = RecordingClient()
+        paused = create_timeline(client, [Event(0.05, "/paused", Control(value=1))])
+        player = MultiPlayer([paused])
+        # The thread is held before the clock of the scheduler runs
+        resume = player.scheduler.resume
+        timeline_paused = threading.Event()
+
+        def held_resume():
+            timeline_paused.wait(1)
+            resume()
+
+        player.scheduler.resume = held_resume
+        player.run()
+        player.pause(0)
+        timeline_paused.set()
+        start = time.perf_counter()
+        time.sleep(0.1)
+        assert client.messages == []
+
+        player.resume(0)
+        player.wait()
+        assert client.messages == [("/paused", 1)]
+        assert client.times[-1] - start >= 0.15
@@ -0,0 +1,111 @@
+import errno
+import os
+import socket
+import sys
+import time
+import pytest
+from pythonosc.osc_bundle import OscBundle
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from Event import Event
+from Control import Control
+from OscOutput import MAX_DATAGRAM_SIZE, OscBatch, OscClient, RateLimiter, encode_bundles
+from OscTestTools import RecordingClient
+
+
+@pytest.fixture
+def client():
+    client = RecordingClient()
+    client.limiter = RateLimiter(client, rate=20, burst=1)
+    return client
+
+
+def encode(command, value):
+    return Event(time=0, command=command, control=Control(value=value)).encode(value)
+
+
+class TestRateLimiter:
+    def test_frames_coalesced(self, client):
+        for value in [0.1, 0.2, 0.3, 0.4]:
+            batch = OscBatch()
+            batch.add(client, encode("/fade", value), coalesce=True)
+            batch.flush()
+        assert client.messages == [("/fade", pytest.approx(0.1))]
+        assert client.limiter.pending == 1
+
+        time.sleep(0.1)
+        assert client.messages[-1] == ("/fade", pytest.approx(0.4))
+        assert client.limiter.pending == 0
+
+    def test_unique_controls_never_dropped(self, client):
+        batch = OscBatch()
+        batch.add(client, encode("/fade", 0.1), coalesce=True)
+        batch.add(client, encode("/fade", 0.2), coalesce=True)
+        batch.flush()
+        for value in range(5):
+            batch.add(client, encode("/cue", value))
+            batch.flush()
+        batch.add(client, encode("/fade", 1))
+        batch.flush()
+        assert [value for address, value in client.messages if address == "/cue"] == list(range(5))
+
+        # The frame pending before the unique control of its address is discarded
+        time.sleep(0.3)
+        assert client.messages[-1] == ("/fade", 1)
+        assert client.limiter.pending == 0
+
+    def test_invalid_rate(self, client):
+        with pytest.raises(ValueError):
+            RateLimiter(client, rate=0)
+
+
+class TestBundleSize:
+    def test_bundles_split(self):
+        dgrams = [encode(f"/fade/{index}", 0.5) for index in range(4000)]
+        bundles = encode_bundles(dgrams)
+        assert len(bundles) > 1
+        assert all(len(bundle) <= MAX_DATAGRAM_SIZE for bundle in bundles)
+        messages = [message for bundle in bundles for message in OscBundle(bundle)]
+        assert [message.address for message in messages] == [f"/fade/{index}" for index in range(4000)]
+
+    def test_long_message_alone(self):
+        long_dgram = encode("/text", "x" * MAX_DATAGRAM_SIZE)
+        bundles = encode_bundles([encode("/a", 1), long_dgram, encode("/b", 2)])
+        assert len(bundles) == 3
+
+    def test_batch_of_many_fades(self):
+        client = RecordingClient()
+        batch = OscBatch()
+        for index in range(4000):
+            batch.add(client, encode(f"/fade/{index}", 0.5), coalesce=True)
+        batch.flush()
+        assert len(client.messages) == 4000
+
+    def test_send_error_logged(self, caplog):
+        # A datagram longer than UDP allows is lost, without raising
+        client = OscClient("127.0.0.1", 9)
+        client.send_dgram(b"x" * 70000)
+        assert "not sent" in caplog.text
+
+
+class TestOscClient:
+    def test_broadcast(self):
+        client = OscClient("255.255.255.255", 9000)
+        assert client._sock.getsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST)
+
+    def test_not_connected(self, monkeypatch, caplog):
+        receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        receiver.bind(("127.0.0.1", 0))
+        receiver.settimeout(1)
+
+        def unreachable(sock, address):
+            raise OSError(errno.ENETUNREACH, "Network is unreachable")
+
+        monkeypatch.setattr(socket.socket, "connect", unreachable)
+        client = OscClient(*receiver.getsockname())
+        assert "not connected" in caplog.text
+
+        # Each datagram is sent with sendto
+        client.send_dgram(b"/a\x00\x00,\x00\x00\x00")
+        assert receiver.recv(64) == b"/a\x00\x00,\x00\x00\x00"
+        receiver.close()
@@ -0,0 +1,134 @@
+import math
+import os
+import sys
+import threading
+import time
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from Scheduler import Scheduler, LatencyStats
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = Scheduler()
+    yield scheduler
+    scheduler.stop()
+
+
+class TestScheduler:
+    def test_items_delivered_in_deadline_order(self, scheduler):
+        scheduler.schedule(0.03, "third")
+        scheduler.schedule(0.01, "first")
+        scheduler.schedule(0.02, "second")
+        scheduler.schedule(0.01, "first bis")
+        scheduler.start()
+        assert list(iter(scheduler.next, None)) == [
+            "first",
+            "first bis",
+            "second",
+            "third",
+        ]
+
+    def test_item_delivered_on_time(self, scheduler):
+        scheduler.schedule(0.05, "item")
+        scheduler.start()
+        assert scheduler.next() == "item"
+        assert 0.05 <= scheduler.elapsed() < 0.06
+
+    def test_start_offset(self, scheduler):
+        scheduler.schedule(10, "item")
+        scheduler.start(offset=9.99)
+        assert scheduler.next() == "item"
+        assert scheduler.elapsed() < 10.1
+
+    def test_stop_wakes_waiting_thread(self, scheduler):
+        scheduler.schedule(60, "item")
+        scheduler.start()
+        threading.Timer(0.02, scheduler.stop).start()
+        start = time.perf_counter()
+        assert scheduler.next() is None
+        assert time.perf_counter() - start < 1
+
+    def test_pause_holds_clock(self, scheduler):
+        scheduler.schedule(0.05, "item")
+        scheduler.start()
+        scheduler.pause()
+        paused_elapsed = scheduler.elapsed()
+        threading.Timer(0.05, scheduler.resume).start()
+        assert scheduler.next() == "item"
+        assert scheduler.elapsed() - paused_elapsed >= 0.05
+
+    def test_start_paused(self, scheduler):
+        scheduler.start(offset=1, paused=True)
+        scheduler.schedule(1.02, "item", key=1)
+        time.sleep(0.05)
+        assert scheduler.elapsed() == 1
+        assert 1 in scheduler
+        scheduler.resume()
+        assert scheduler.next() == "item"
+        assert 1 not in scheduler
+
+    def test_reschedule_and_cancel(self, scheduler):
+        scheduler.schedule(0.01, "moved", key=1)
+        scheduler.schedule(0.02, "cancelled", key=2)
+        scheduler.schedule(0.03, "kept", key=3)
+        scheduler.start()
+        scheduler.schedule(0.04, "moved", key=1)
+        scheduler.cancel(2)
+        assert list(iter(scheduler.next, None)) == ["kept", "moved"]
+        assert not scheduler.is_running
+
+    def test_schedule_while_waiting(self, scheduler):
+        scheduler.schedule(60, "late", key=1)
+        scheduler.start()
+        threading.Timer(0.01, scheduler.schedule, args=(0.02, "early", 2)).start()
+        assert scheduler.next() == "early"
+        assert scheduler.elapsed() < 1
+
+    def test_held_item(self, scheduler):
+        scheduler.schedule(math.inf, "held", key=1)
+        scheduler.start()
+        threading.Timer(0.02, scheduler.schedule, args=(0.03, "held", 1)).start()
+        assert scheduler.next() == "held"
+        assert 0.03 <= scheduler.elapsed() < 1
+
+    def test_next_batch(self, scheduler):
+        scheduler.schedule(0.01, "first", key=1)
+        scheduler.schedule(0.01, "cancelled", key=2)
+        scheduler.schedule(0.01, "second", key=3)
+        scheduler.schedule(0.02, "third", key=4)
+        scheduler.cancel(2)
+        scheduler.start()
+        assert list(iter(scheduler.next_batch, None)) == [["first", "second"], ["third"]]
+
+    def test_precision_mode(self):
+        scheduler = Scheduler(precision=True)
+        for idx in range(10):
+            scheduler.schedule(0.005 * idx, idx)
+        scheduler.start()
+        assert list(iter(scheduler.next, None)) == list(range(10))
+        assert scheduler.stats.count == 10
+        assert 0 <= scheduler.stats.min <= scheduler.stats.mean <= scheduler.stats.max
+        assert scheduler.stats.p99 < 0.001
+
+
+class TestLatencyStats:
+    def test_statistics(self):
+        stats = LatencyStats()
+        for sample in [0.0001, 0.0002, 0.0003, 0.003]:
+            stats.record(sample)
+        assert stats.min == 0.0001
+        assert stats.max == 0.003
+        assert stats.mean == pytest.approx(0.0009)
+        assert stats.p99 == 0.003
+        histogram = stats.histogram()
+        assert histogram["<0.5 ms"] == 3
+        assert histogram["<5 ms"] == 1
+        assert sum(histogram.values()) == 4
+
+    def test_empty(self):
+        stats = LatencyStats()
+        assert stats.count == 0
+        assert stats.p99 == 0
+        assert "0 events" in stats.to_string()
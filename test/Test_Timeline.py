@@ -1,13 +1,20 @@
+import io
 import json
 import os
 import sys
+import threading
+import time
 import pytest
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from Model import ControlMode
 from Timeline import Timeline
+from TimelineCore import TimelineCore, State
 from Event import Event
 from Control import Control
+from JsonStream import JsonStreamReader
+from CustomExceptions import ParseExceptionKey, ParseExceptionType
+from OscTestTools import RecordingClient
 
 JSON_FOLDER = "test/json_config"
 
@@ -59,6 +66,9 @@ class TestJsonTimeline:
         invalid_control2: control_mode = uniquee (should be unique)
         invalid_key1: missing "ip"
         invalid_key2: missing "value" in the control of the third evend
+        invalid_control4: unknown easing for the animated control
+        invalid_control5: times of the envelope keyframes are not increasing
+        invalid_destination1: port of the destination is a str (should be int)
         """
         for path in invalid_json_paths:
             try:
@@ -133,3 +143,297 @@ class TestJsonTimeline:
             assert json.load(json_file) == expected_json_dict
         if os.path.exists(json_path):
             os.remove(json_path)
+
+    def test_stream_reader(self, valid_json_paths):
+        # The streamed timeline and header match json.load, whatever the chunk size
+        for path in valid_json_paths:
+            with open(path, "r") as json_file:
+                expected_dict = json.load(json_file)
+            for chunk_size in [1, 7, 4096]:
+                with open(path, "r") as json_file:
+                    reader = JsonStreamReader(json_file, "timeline", chunk_size=chunk_size)
+                    items = list(reader.iter_items())
+                assert reader.streamed
+                assert {**reader.header, "timeline": items} == expected_dict
+
+    def test_stream_numbers_cut_by_chunks(self):
+        # The numbers cut by the end of a chunk are read whole, whatever the chunk size
+        content = (
+            '{"name": "Cut", "version": 12.5, "scale": 1e-3, "listening_port": 7000, '
+            '"timeline": [{"time": 123.25, "command": "/a", "control": {"control_mode": "unique", "value": -4.5e2}}], '
+            '"ip": "127.0.0.1", "enabled": true}'
+        )
+        expected_dict = json.loads(content)
+        for chunk_size in range(1, 40):
+            reader = JsonStreamReader(io.StringIO(content), "timeline", chunk_size=chunk_size)
+            items = list(reader.iter_items())
+            assert {**reader.header, "timeline": items} == expected_dict
+
+    def test_stream_key_order(self, tmp_path):
+        # The header may follow the timeline list
+        json_path = tmp_path / "timeline_first.json"
+        json_path.write_text(
+            '{"timeline": [{"time": 1.5, "command": "/a", "control": {"control_mode": "unique", "value": 12345}}],'
+            ' "name": "Reordered", "ip": "127.0.0.2", "listening_port": 7001}'
+        )
+        timeline = Timeline(str(json_path))
+        assert timeline.name == "Reordered"
+        assert timeline.ip == "127.0.0.2"
+        assert timeline.port == 7001
+        assert timeline.timeline == {
+            1: Event(time=1.5, command="/a", control=Control(value=12345))
+        }
+
+    def test_stream_invalid_json(self, tmp_path):
+        json_path = tmp_path / "truncated.json"
+        json_path.write_text('{"name": "Cut", "timeline": [{"time": 1')
+        with pytest.raises(json.JSONDecodeError):
+            Timeline(str(json_path))
+
+    def test_invalid_json_location(self):
+        # The errors report the event index and the path of the wrong value
+        with pytest.raises(ParseExceptionKey) as error:
+            Timeline(os.path.join(JSON_FOLDER, "invalid_control1.json"))
+        assert error.value.missing_key == "duration"
+        assert error.value.event_index == 1
+        assert error.value.path == "timeline[1].control"
+
+        with pytest.raises(ParseExceptionType) as error:
+            Timeline(os.path.join(JSON_FOLDER, "invalid_destination1.json"))
+        assert error.value.parent_key == "port"
+        assert error.value.event_index == 0
+        assert error.value.path == "timeline[0].destination"
+
+        with pytest.raises(ParseExceptionKey) as error:
+            Timeline(os.path.join(JSON_FOLDER, "invalid_key1.json"))
+        assert error.value.missing_key == "ip"
+        assert error.value.event_index is None
+        assert str(error.value) == "The key ip is missing"
+
+    def test_load_single_log(self, valid_json_paths):
+        # Loading a file emits a single log message instead of one per event
+        for path in valid_json_paths:
+            timeline = Timeline()
+            messages = []
+            timeline.log_message.connect(messages.append)
+            timeline.from_json(path)
+            assert len(messages) == 1
+            assert messages[0] == f"{len(timeline.timeline)} events added to the timeline"
+
+
+
+class TestDestinations:
+    def test_event_destination(self):
+        path = os.path.join(JSON_FOLDER, "valid_4.json")
+        timeline = Timeline(path)
+        default_event, routed_event = timeline.timeline.values()
+        assert timeline.get_destination(default_event) == ("192.168.0.140", 7000)
+        assert timeline.get_destination(routed_event) == ("192.168.0.141", 9000)
+        assert routed_event.client is not timeline.client
+
+    def test_clients_reused(self):
+        timeline = Timeline()
+        event1 = Event(1, "/a", destination=("127.0.0.1", 9001))
+        event2 = Event(2, "/b", destination=("127.0.0.1", 9001))
+        timeline.add_event(event1)
+        timeline.add_event(event2)
+        assert event1.client is event2.client
+
+        # The client of a destination is kept while another timeline uses it
+        other_timeline = Timeline()
+        client = timeline.client
+        timeline.init_client(port=7001)
+        timeline.init_client(port=7000)
+        assert timeline.client is client is other_timeline.client
+        assert event1.client is event2.client
+
+    def test_unused_clients_closed(self):
+        timeline = Timeline()
+        timeline.init_client(port=9011)
+        timeline.set_lookahead(0.1)
+        client = timeline.client
+        timeline.init_client(port=9012)
+        assert ("127.0.0.1", 9011) not in timeline.client_pool
+        assert ("127.0.0.1", 9011) not in timeline.lookahead
+        assert client._sock.fileno() == -1
+
+        event = Event(1, "/a", destination=("127.0.0.1", 9013))
+        timeline.add_event(event)
+        event.destination = ("127.0.0.1", 9014)
+        assert ("127.0.0.1", 9013) not in timeline.client_pool
+        assert ("127.0.0.1", 9014) in timeline.client_pool
+
+    def test_rate_limit_kept(self):
+        timeline = Timeline()
+        timeline.init_client(port=9021)
+        timeline.set_rate_limit(50)
+        timeline.init_client(port=9022)
+        assert ("127.0.0.1", 9021) not in timeline.client_pool
+        # The client created again for the destination gets its rate limit
+        timeline.init_client(port=9021)
+        assert timeline.client.limiter.bucket.rate == 50
+        timeline.set_rate_limit(None)
+        assert timeline.client.limiter is None
+
+    def test_edit_destination(self):
+        timeline = Timeline()
+        event = Event(1, "/a")
+        timeline.add_event(event)
+        assert event.client is timeline.client
+        event.destination = ("127.0.0.1", 9002)
+        assert event.client is timeline.client_pool.get("127.0.0.1", 9002)
+
+
+class TestRunTimeline:
+    def wait_end(self, timeline):
+        time.sleep(0.05)
+        while timeline.state != State.NOT_RUNNING:
+            time.sleep(0.01)
+
+    def test_start_at(self):
+        timeline = Timeline()
+        client = RecordingClient()
+        for _time, command in [(1, "/past"), (2, "/past"), (100, "/first"), (101, "/second")]:
+            event_id = timeline.add_event(
+                Event(
+                    time=_time,
+                    command=command,
+                    control=Control(ControlMode.UNIQUE, value=_time),
+                )
+            )
+            timeline.timeline[event_id].set_osc_client(client)
+        timeline.run_timeline(start_at=99.95)
+        self.wait_end(timeline)
+        assert client.messages == [("/first", 100), ("/second", 101)]
+
+    def test_chase_state(self):
+        timeline = Timeline()
+        client = RecordingClient()
+        events = [
+            Event(1, "/opacity", Control(ControlMode.ANIMATED, value=[0, 1], duration=1)),
+            Event(5, "/opacity", Control(ControlMode.ANIMATED, value=[1, 0.5], duration=1)),
+            Event(8, "/fade", Control(ControlMode.ANIMATED, value=[0, 10], duration=4)),
+            Event(50, "/end", Control(ControlMode.UNIQUE, value=1)),
+        ]
+        for event in events:
+            timeline.add_event(event)
+            event.set_osc_client(client)
+        timeline.run_timeline(start_at=49.9)
+        time.sleep(0.02)
+        timeline.stop_timeline()
+        self.wait_end(timeline)
+        assert ("/opacity", 0.5) in client.messages
+        assert ("/fade", 10) in client.messages
+        assert ("/end", 1) not in client.messages
+
+    def test_curves_compiled_at_load(self):
+        timeline = Timeline()
+        fade = Event(
+            time=1, command="/fade", control=Control(ControlMode.ANIMATED, value=[0, 1], duration=1)
+        )
+        timeline.add_event(fade)
+        assert fade.control._curves != {}
+        # Compiled again after an edit, not when the fade is triggered
+        fade.control.duration = 2
+        assert fade.control._curves != {}
+        assert timeline.animation_engine.get_curve(fade.control).times[-1] == 2
+
+    def test_live_edit(self):
+        timeline = Timeline()
+        client = RecordingClient()
+        moved = Event(0.05, "/moved", Control(ControlMode.UNIQUE, value=1))
+        removed = Event(0.1, "/removed", Control(ControlMode.UNIQUE, value=1))
+        for event in [moved, removed]:
+            timeline.add_event(event)
+            event.set_osc_client(client)
+        removed_id = timeline.last_id
+        timeline.run_timeline()
+        time.sleep(0.02)
+
+        moved.time = 0.15
+        timeline.remove_event(removed_id)
+        added = Event(0.12, "/added", Control(ControlMode.UNIQUE, value=1))
+        timeline.add_event(added)
+        added.set_osc_client(client)
+
+        self.wait_end(timeline)
+        assert client.messages == [("/added", 1), ("/moved", 1)]
+
+    def test_edit_before_thread_start(self):
+        timeline = TimelineCore()
+        client = RecordingClient()
+        fade = Event(0.3, "/fade", Control(ControlMode.UNIQUE, value=1))
+        moved = Event(0.3, "/moved", Control(ControlMode.UNIQUE, value=1))
+        for event in [fade, moved]:
+            timeline.add_event(event)
+            event.set_osc_client(client)
+        timeline.set_lookahead(0.25)
+
+        # The thread is held at its start, before the clock of the scheduler runs
+        thread_started = threading.Event()
+        edited = threading.Event()
+
+        def hold(message):
+            if message == "Timeline started":
+                thread_started.set()
+                edited.wait(1)
+
+        timeline.log_message.connect(hold)
+        timeline.run_timeline()
+        thread_started.wait(1)
+        moved.time = 0.1
+        # Animated, the fade is no longer sent ahead by the look-ahead
+        fade.control.mode = ControlMode.ANIMATED
+        fade.control.duration = 0.05
+        edited.set()
+
+        time.sleep(0.2)
+        assert client.messages == [("/moved", 1)]
+        self.wait_end(timeline)
+        assert client.messages[1:] and all(address == "/fade" for address, _ in client.messages[1:])
+
+    def test_lookahead_releases_fade_at_cue(self):
+        timeline = Timeline()
+        client = RecordingClient()
+        fade = Event(0, "/fade", Control(ControlMode.ANIMATED, value=[0, 1], duration=1))
+        cue = Event(0.4, "/fade", Control(ControlMode.UNIQUE, value=5))
+        for event in [fade, cue]:
+            timeline.add_event(event)
+            event.set_osc_client(client)
+        timeline.set_lookahead(0.25)
+
+        timeline.run_timeline()
+        # The cue is sent ahead at 0.15 s, the fade runs until 0.4 s
+        time.sleep(0.3)
+        assert ("/fade", 5) in client.messages
+        assert timeline.animation_engine.active_fades == 1
+        time.sleep(0.2)
+        assert timeline.animation_engine.active_fades == 0
+        self.wait_end(timeline)
+
+    def test_co_timed_events_bundled(self):
+        timeline = Timeline()
+        client = RecordingClient()
+        for command in ["/layer/1", "/layer/2", "/layer/3"]:
+            event = Event(0.01, command, Control(ControlMode.UNIQUE, value=1))
+            timeline.add_event(event)
+            event.set_osc_client(client)
+        timeline.run_timeline()
+        self.wait_end(timeline)
+        assert len(client.bundles) == 1
+        assert client.messages == [("/layer/1", 1), ("/layer/2", 1), ("/layer/3", 1)]
+
+    def test_lookahead(self):
+        timeline = Timeline()
+        client = RecordingClient()
+        event = Event(0.3, "/cue", Control(ControlMode.UNIQUE, value=1))
+        timeline.add_event(event)
+        event.set_osc_client(client)
+        timeline.set_lookahead(0.25)
+
+        start = time.time()
+        timeline.run_timeline()
+        time.sleep(0.15)
+        assert client.messages == [("/cue", 1)]
+        assert client.bundles[0].timestamp == pytest.approx(start + 0.3, abs=0.02)
+        self.wait_end(timeline)